@@ -4,25 +4,32 @@ Portfolio Demo · Flask · Scikit-learn · Plotly
 Deploy on Hugging Face Spaces (Docker) → port 7860
 """
 
-from flask import Flask, render_template_string, jsonify, request
-import numpy as np, pandas as pd, json, plotly, warnings
-import plotly.graph_objects as go
+from flask import Flask, render_template, jsonify, request, g
+from markupsafe import Markup
+import numpy as np, pandas as pd, json, os, time, atexit, shutil, threading, warnings
+from concurrent.futures import Future, ThreadPoolExecutor
+import plotly, plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import StandardScaler
+from urllib.parse import quote
+from risksight import registry, ingest, compiled, downsample, transport, online, explain, metrics, portfolio, stress, transactions, snapshot, drift, journal
+from risksight.asgi import WSGIBridge
+from risksight.cache import LRUCache
+from risksight.sketch import QuantileSketch
+from risksight.market import rolling_risk, parametric_var, monte_carlo_var
+from risksight.data import synthetic, features, market_book
+from risksight.scoring import (parse_batch, BatchError, credit_matrix, fraud_matrix,
+                               underwriting_matrix, predict, aligned, FRAUD_THRESHOLD)
 
 warnings.filterwarnings("ignore")
 app = Flask(__name__)
-np.random.seed(42)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 #  UTILITIES
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def dark_layout(fig):
-    """Apply consistent dark theme to every Plotly figure."""
+    """Apply consistent dark theme to every Plotly figure; returns its transport JSON."""
     fig.update_layout(
         paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
         font=dict(color="#c9d1d9", size=11),
@@ -31,110 +38,404 @@ def dark_layout(fig):
         xaxis=dict(gridcolor="#21262d", zerolinecolor="#30363d"),
         yaxis=dict(gridcolor="#21262d", zerolinecolor="#30363d"),
     )
-    return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+    return transport.figure_json(fig)
 
 def rp(title, active, body, scripts=""):
-    """Render a full page by injecting body into the shell template."""
+    """Render a full page: body and scripts go into the precompiled shell as safe markup
+    (they are never parsed as template source)."""
     now = datetime.now().strftime("%b %d, %Y  %H:%M")
-    html = SHELL.replace("<!-- BODY -->", body).replace("<!-- SCRIPTS -->", scripts)
-    return render_template_string(html, title=title, active=active, now=now)
-
-# ═══════════════════════════════════════════════════════════════════════════════
-#  SYNTHETIC DATA  (realistic enough for a portfolio demo)
-# ═══════════════════════════════════════════════════════════════════════════════
-
-N = 1200  # credit records
-
-# ── Credit / Loan ──────────────────────────────────────────────────────────────
-cr = pd.DataFrame({
-    "age":          np.random.randint(22, 70, N),
-    "income":       np.random.lognormal(10.5, .5, N).astype(int),
-    "debt_ratio":   np.round(np.random.beta(2, 5, N), 3),
-    "credit_score": np.random.randint(300, 850, N),
-    "emp_years":    np.random.randint(0, 30, N),
-    "loan_amt":     np.random.lognormal(10, .8, N).astype(int),
-    "purpose":      np.random.choice(["Mortgage","Auto","Personal","Business"], N,
-                                     p=[.35,.25,.25,.15]),
-    "region":       np.random.choice(["North","South","East","West"], N),
-})
-cr["default_prob"] = np.clip(
-    .3*(1-(cr.credit_score-300)/550) + .2*cr.debt_ratio +
-    .1*(cr.loan_amt/cr.income) + .1*(1-cr.emp_years/30) + np.random.normal(0,.05,N),
-    0, 1)
-cr["default"] = (cr.default_prob > .3).astype(int)
-cr["risk_grade"] = pd.cut(cr.credit_score,[300,580,670,740,800,850],
-                           labels=["F","D","C","B","A"])
-
-# ── Fraud / Transactions ───────────────────────────────────────────────────────
-NF = 3000
-fd = pd.DataFrame({
-    "txn_id":    [f"TXN{i:06d}" for i in range(NF)],
-    "amount":    np.round(np.random.lognormal(5, 1.5, NF), 2),
-    "hour":      np.random.randint(0, 24, NF),
-    "merch_risk":np.random.choice(["Low","Medium","High"], NF, p=[.6,.3,.1]),
-    "foreign":   np.random.choice([0,1], NF, p=[.85,.15]),
-    "velocity":  np.random.randint(1, 20, NF),
-    "channel":   np.random.choice(["Online","POS","ATM","Mobile"], NF),
-    "date":      pd.date_range("2024-01-01", periods=NF, freq="H"),
-})
-fd["fraud_prob"] = np.clip(
-    .10*(fd.amount>1000).astype(float) + .20*fd.foreign +
-    .15*(fd.merch_risk=="High").astype(float) +
-    .10*((fd.hour<5)|(fd.hour>22)).astype(float) +
-    .05*(fd.velocity>15).astype(float) + np.random.uniform(0,.1,NF), 0, 1)
-fd["fraud"] = (fd.fraud_prob > .25).astype(int)
-
-# ── Insurance ──────────────────────────────────────────────────────────────────
-NI = 1000
-ins = pd.DataFrame({
-    "age":         np.random.randint(18, 75, NI),
-    "bmi":         np.round(np.random.normal(27, 5, NI), 1),
-    "smoker":      np.random.choice([0,1], NI, p=[.75,.25]),
-    "region":      np.random.choice(["North","South","East","West"], NI),
-    "children":    np.random.randint(0, 5, NI),
-    "policy_type": np.random.choice(["Basic","Standard","Premium"], NI, p=[.3,.5,.2]),
-    "veh_age":     np.random.randint(0, 20, NI),
-})
-ins["claim_amt"] = np.round(
-    (5000+ins.age*100+ins.bmi*50+ins.smoker*10000+ins.children*500) *
-    np.random.lognormal(0,.3,NI), 2)
-ins["premium"] = np.round(ins.claim_amt * np.random.uniform(.6,1.4,NI), 2)
-ins["loss_ratio"] = np.round(ins.claim_amt/ins.premium, 3)
-ins["high_risk"] = ((ins.smoker==1)|(ins.bmi>35)|(ins.age>60)).astype(int)
-ins["month"] = np.random.randint(1,13,NI)
-
-# ── Market / Portfolio ─────────────────────────────────────────────────────────
-mdt  = pd.date_range(end=datetime.now(), periods=252, freq="B")
-mret = np.random.normal(.0003, .012, 252)
-mpv  = 10_000_000 * np.cumprod(1+mret)
-mkt  = pd.DataFrame({"date":mdt,"ret":mret,"portfolio":mpv})
-mkt["drawdown"] = (mkt.portfolio - mkt.portfolio.cummax()) / mkt.portfolio.cummax()
-
-# ═══════════════════════════════════════════════════════════════════════════════
-#  TRAIN MODELS
-# ═══════════════════════════════════════════════════════════════════════════════
-
-# Credit Risk — Random Forest
-Xcr = cr[["age","income","debt_ratio","credit_score","emp_years","loan_amt"]]
-scr = StandardScaler().fit(Xcr)
-mdl_cr = RandomForestClassifier(100, random_state=42).fit(scr.transform(Xcr), cr.default)
-
-# Fraud Detection — Gradient Boosting
-Xfd   = pd.concat([fd[["amount","hour","foreign","velocity"]].reset_index(drop=True),
-                   pd.get_dummies(fd.merch_risk,prefix="mr").reset_index(drop=True)], axis=1)
-FR_COLS = Xfd.columns.tolist()
-sfr   = StandardScaler().fit(Xfd)
-mdl_fr = GradientBoostingClassifier(n_estimators=100, random_state=42).fit(sfr.transform(Xfd), fd.fraud)
-
-# Underwriting Risk — Logistic Regression
-Xins  = pd.concat([ins[["age","bmi","smoker","children","veh_age"]].reset_index(drop=True),
-                   pd.get_dummies(ins.region,prefix="r").reset_index(drop=True)], axis=1)
-INS_COLS = Xins.columns.tolist()
-sins  = StandardScaler().fit(Xins)
-mdl_ins = LogisticRegression(random_state=42).fit(sins.transform(Xins), ins.high_risk)
-
-# ═══════════════════════════════════════════════════════════════════════════════
-#  SHELL TEMPLATE  (sidebar + topbar, injected with <!-- BODY -->)
+    with STAGE.time("render", request.endpoint or "", ""):
+        return render_template(SHELL_TEMPLATE, title=title, active=active, now=now, plotly_version=PLOTLY_VERSION,
+                               body=Markup(body), scripts=Markup(scripts))
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  DATA & MODELS  (synthetic frames, or files streamed by risksight.ingest when
+#                  RISKSIGHT_{CREDIT,FRAUD,INSURANCE}_PATH is set; models loaded
+#                  from the registry, see `python -m risksight.registry train`)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+DATASETS = {"cr": "credit", "fd": "fraud", "ins": "insurance"}
+cr, fd, ins, mkt = synthetic()
+AGGS, SOURCES = {}, {}          # full-population aggregates; file-backed dataset info
+for _k, _ds in DATASETS.items():
+    _path = os.environ.get(f"RISKSIGHT_{_ds.upper()}_PATH")
+    if _path:                   # frame becomes a bounded reservoir sample of the file
+        _r = ingest.load(_path, _ds)
+        globals()[_k], AGGS[_k] = _r.sample, _r.aggs
+        SOURCES[_ds] = {"path": _path, "rows": _r.rows, "sample": len(_r.sample),
+                        "seconds": round(_r.seconds, 3)}
+    else:
+        AGGS[_k] = ingest.aggregate(globals()[_k], _ds)
+    globals()[_k] = ingest.prepare(globals()[_k], _ds)      # bucket / flag columns computed once
+Xcr, Xfd, Xins   = features(cr, fd, ins)
+
+# The frames are published as a read-only, memory-mapped columnar snapshot (risksight.snapshot)
+# that every forked worker maps instead of copying; a refresh publishes a new one and the other
+# workers switch to it. RISKSIGHT_SNAPSHOT_DIR picks the directory ("off": private frames).
+SNAP_FRAMES = ("cr", "fd", "ins", "mkt", "Xcr", "Xfd", "Xins")
+SNAPSHOT = {"version": None, "generations": {}, "checked": 0.0}
+_SNAPSHOT_LOCK = threading.Lock()
+SNAPSHOT_DIR = os.environ.get("RISKSIGHT_SNAPSHOT_DIR")
+if SNAPSHOT_DIR is None:
+    SNAPSHOT_DIR = snapshot.session_root()
+    _owner = os.getpid()
+    atexit.register(lambda: os.getpid() == _owner and shutil.rmtree(SNAPSHOT_DIR, ignore_errors=True))
+elif SNAPSHOT_DIR == "off":
+    SNAPSHOT_DIR = None
+
+def _map_snapshot(version):
+    """Replace the frames with the mapped ones of `version`; returns the names whose data changed."""
+    m, frames = snapshot.load(SNAPSHOT_DIR, version)
+    changed = [k for k in frames if m["generations"].get(k) != SNAPSHOT["generations"].get(k)]
+    globals().update(frames)
+    SNAPSHOT.update(version=version, generations=m["generations"])
+    return changed
+
+def _publish_snapshot(changed):
+    gens = {k: SNAPSHOT["generations"].get(k, 0) + (k in changed) for k in SNAP_FRAMES}
+    return snapshot.publish({k: globals()[k] for k in SNAP_FRAMES}, SNAPSHOT_DIR, gens)
+
+if SNAPSHOT_DIR:
+    try:
+        _map_snapshot(_publish_snapshot(SNAP_FRAMES))
+    except OSError as e:
+        app.logger.warning("dataset snapshot unavailable in %s (%s); keeping private frames", SNAPSHOT_DIR, e)
+        SNAPSHOT_DIR = None
+
+# Changes accepted after startup (appended records, loan upserts, online feedback) are written to
+# a journal next to the snapshot (risksight.journal) that every worker replays in order, so they
+# all hold the same aggregates, book and learners. Without a snapshot directory changes apply in
+# this process only, so they are refused when gunicorn runs several workers.
+JOURNAL_DIR = os.path.join(SNAPSHOT_DIR, f"journal-{SNAPSHOT['version']}") if SNAPSHOT_DIR else None
+JOURNAL = {"applied": 0}
+_JOURNAL_LOCK = threading.Lock()
+SERVER_WORKERS = int(os.environ.get("RISKSIGHT_WORKERS", os.environ.get("WEB_CONCURRENCY", "1")))
+ADD_ROWS = 128          # appends up to this many rows use AggStore.add (1 ms a record vs 20 ms per update)
+BOOK_RETS, BOOK_POS = market_book()      # multi-asset desks for parametric / Monte Carlo VaR
+
+M = registry.load_or_train(cr, fd, ins)
+scr, mdl_cr   = M["scr"],  M["mdl_cr"]    # Credit Risk — Random Forest
+sfr, mdl_fr   = M["sfr"],  M["mdl_fr"]    # Fraud Detection — (Hist)Gradient Boosting
+sins, mdl_ins = M["sins"], M["mdl_ins"]   # Underwriting Risk — Logistic Regression
+FR_COLS, INS_COLS = M["FR_COLS"], M["INS_COLS"]
+
+def held_out(task, metric):
+    """Test-split metric recorded when the models were trained (None for older artifacts)."""
+    return M["manifest"].get("metrics", {}).get(task, {}).get(metric)
+
+INFERENCE = os.environ.get("RISKSIGHT_INFERENCE", "sklearn")   # "compiled" → flat-array tree kernels
+
+def _engine(scaler, model, X):
+    """(scaler, model) pair the scoring API uses; compiled trees fold the scaler into their thresholds."""
+    if INFERENCE != "compiled":
+        return scaler, model
+    try:
+        return None, compiled.compile_pair(scaler, model, check=X)
+    except (TypeError, ValueError) as e:
+        app.logger.warning("compiled inference unavailable for %s (%s); using sklearn", type(model).__name__, e)
+        return scaler, model
+
+CR_ENGINE = _engine(scr, mdl_cr, Xcr.values)
+FR_ENGINE = _engine(sfr, mdl_fr, Xfd.values)
+
+# RISKSIGHT_ONLINE=fraud,underwriting → those scoring APIs use incremental learners
+# that POST /api/<task>/feedback updates (risksight.online); pages keep the published models
+ONLINE = {}
+for _t in filter(None, os.environ.get("RISKSIGHT_ONLINE", "").split(",")):
+    _X, _y, _s, _m = {"fraud": (Xfd, fd.fraud, sfr, mdl_fr),
+                      "underwriting": (Xins, ins.high_risk, sins, mdl_ins)}[_t.strip()]
+    ONLINE[_t.strip()] = online.OnlineLearner.seed(_t.strip(), _X.values, _y.values, _s, _m, M["version"])
+
+# Whole-book PD / EL / UL / concentration through the credit engine (risksight.portfolio),
+# scored on first use: the full file when credit is file-backed, else the in-memory frame
+PORTFOLIO_WORKERS = int(os.environ.get("RISKSIGHT_PORTFOLIO_WORKERS", "4"))
+_BOOK, _BOOK_LOCK = [], threading.Lock()
+
+def book():
+    with _BOOK_LOCK:
+        if not _BOOK:
+            path = SOURCES.get("credit", {}).get("path")
+            chunks = (ingest.iter_chunks(path, "credit", portfolio.CHUNK) if path else
+                      (cr.iloc[s:s+portfolio.CHUNK] for s in range(0, len(cr), portfolio.CHUNK)))
+            _BOOK.append(portfolio.Book.build(CR_ENGINE, chunks, M["version"], PORTFOLIO_WORKERS))
+        return _BOOK[0]
+
+# Sorted + bitmap indexes over every transaction (risksight.transactions) for the explorer API
+# and the fraud page's table: the full file when fraud is file-backed, built on first use
+_TXNS, _TXNS_LOCK = [], threading.Lock()
+
+def txns():
+    with _TXNS_LOCK:
+        if not _TXNS:
+            path = SOURCES.get("fraud", {}).get("path")
+            _TXNS.append(transactions.TransactionIndex.from_chunks(ingest.iter_chunks(path, "fraud"))
+                         if path else transactions.TransactionIndex.from_frame(fd))
+        return _TXNS[0]
+
+# Input and score drift per scoring API against the frame its model was trained on
+# (risksight.drift): built on first use from at most DRIFT_REF_ROWS reference rows, then fed
+# every record the API scores or rejects. With a snapshot directory the workers pool their windows
+# there (one ring file per worker and reference frame), so every worker reports the whole server.
+DRIFT_WINDOW   = int(os.environ.get("RISKSIGHT_DRIFT_WINDOW", "3600"))     # seconds
+DRIFT_REF_ROWS = 100_000
+DRIFT_TASKS    = {"credit": ("cr", "pd"), "fraud": ("fd", "fraud_prob"), "underwriting": ("ins", "risk_score")}
+_DRIFT, _DRIFT_LOCK = {}, threading.Lock()
+
+def monitor(task):
+    with _DRIFT_LOCK:
+        if task not in _DRIFT:
+            X, cols, engine = {"credit": (Xcr, M["CR_COLS"], CR_ENGINE), "fraud": (Xfd, FR_COLS, FR_ENGINE),
+                               "underwriting": (Xins, INS_COLS, (sins, mdl_ins))}[task]
+            if len(X) > DRIFT_REF_ROWS:
+                X = X.sample(DRIFT_REF_ROWS, random_state=0)
+            X = X.reindex(columns=cols, fill_value=0).to_numpy(np.float64)
+            name = DRIFT_TASKS[task][0]
+            shared = SNAPSHOT_DIR and os.path.join(SNAPSHOT_DIR, "drift", f"{task}-{SNAPSHOT['generations'].get(name, 0)}")
+            _DRIFT[task] = drift.Monitor(cols, X, predict(*engine, X).round(4), DRIFT_WINDOW,   # as the API rounds
+                                         shared=shared or None)
+        return _DRIFT[task]
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  INSTRUMENTATION  (risksight.metrics; Prometheus text at GET /metrics)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+METRICS = metrics.Registry()
+REQUESTS = METRICS.histogram("risksight_request_seconds", "Request latency by route template, method and status.",
+                             ("route", "method", "status"))
+STAGE = METRICS.histogram("risksight_stage_seconds", "Time in a server stage: build (pandas aggregation + "
+                          "figure), serialize (figure JSON), compress, parts (KPIs/tables), render (page "
+                          "template), explain.", ("stage", "route", "name"))
+MODEL = METRICS.histogram("risksight_model_seconds", "Model evaluation (scaler + predict_proba) per call.",
+                          ("model",))
+MODEL_ROWS = METRICS.counter("risksight_model_rows_total", "Rows scored per model.", ("model",))
+
+@app.before_request
+def _start_timer():
+    g.t0 = time.perf_counter()
+
+@app.after_request
+def _observe_request(r):
+    t0 = g.get("t0")
+    if t0 is not None:
+        rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        REQUESTS.observe(time.perf_counter() - t0, rule, request.method, str(r.status_code))
+    return r
+
+def _predict(model, engine, X):
+    """predict() on a scoring engine, timed per model."""
+    with MODEL.time(model):
+        p = predict(*engine, X)
+    MODEL_ROWS.inc(len(X), model)
+    return p
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  FIGURE CACHE  (serialized figure JSON + KPI blocks per route, keyed by the
+#                 version of every dataset the route reads)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+FIGS = LRUCache(int(os.environ.get("RISKSIGHT_FIG_CACHE_MB", "64")) << 20, name="figures")
+# Point budgets for row-level charts (risksight.downsample); RISKSIGHT_CHART_POINTS='{"income_loan": 5000}'
+POINT_BUDGET = int(os.environ.get("RISKSIGHT_POINT_BUDGET", "500"))
+CHART_POINTS = {"income_loan": POINT_BUDGET, "bmi_claim": POINT_BUDGET, "market_ts": 500,
+                "outliers": 50, "kde": 200, **json.loads(os.environ.get("RISKSIGHT_CHART_POINTS", "{}"))}
+MC_WORKERS       = int(os.environ.get("RISKSIGHT_MC_WORKERS", "1"))       # >1 → process pool per request
+MC_MAX_SCENARIOS = int(os.environ.get("RISKSIGHT_MC_MAX_SCENARIOS", "2000000"))
+DATA_VERSION = {"cr": 1, "fd": 1, "ins": 1, "mkt": 1, "book": 1, "drift": "0", "models": M["version"] or "in-process"}
+
+PLOTLY_VERSION = plotly.__version__
+FIG_TEMPLATE   = transport.Payload(transport.template_json())
+FIG_MAX_AGE = int(os.environ.get("RISKSIGHT_FIG_MAX_AGE", "86400"))   # browser/proxy cache for versioned /fig URLs
+CHART_THREADS = int(os.environ.get("RISKSIGHT_CHART_THREADS", "4"))       # background chart builds per worker
+PAGES, CHARTS = {}, {}          # route → (deps, KPI/table builder); (route, chart) → (deps, figure builder)
+
+def parts(route, *deps):
+    """Register a page's KPI/table builder and the DATA_VERSION entries it depends on."""
+    def register(build):
+        PAGES[route] = (deps, build)
+        return build
+    return register
+
+def chart(route, name, *deps):
+    """Register one figure of a page; it is built, cached and served on its own at /fig/<route>/<name>."""
+    def register(build):
+        CHARTS[(route, name)] = (deps, build)
+        return build
+    return register
+
+def chart_version(route, name):
+    return "-".join(str(DATA_VERSION[d]) for d in CHARTS[(route, name)][0])
+
+def page_parts(route):
+    """KPIs/tables for `route` from cache; the builder runs only when a dependency changed.
+    The page's charts are started in the background first, so they build while the shell renders."""
+    prefetch(route)
+    deps, build = PAGES[route]
+    def timed():
+        with STAGE.time("parts", route, ""):
+            return build()
+    return FIGS.get_or_set((route,) + tuple(DATA_VERSION[d] for d in deps), timed, tags=deps)
+
+_BUILDS, _BUILDS_LOCK, _CHART_POOL = {}, threading.Lock(), []
+
+def chart_payload(route, name):
+    """The chart's transport.Payload from cache, or built once — concurrent requests for the
+    same chart and version wait on the build already in flight instead of repeating it."""
+    deps, build = CHARTS[(route, name)]
+    key = ("fig", route, name) + tuple(DATA_VERSION[d] for d in deps)
+    p = FIGS.get(key)
+    if p is not None:
+        return p
+    with _BUILDS_LOCK:
+        fut, mine = _BUILDS.get(key), False
+        if fut is None:
+            fut = _BUILDS[key] = Future()
+            mine = True
+    if not mine:
+        return fut.result()
+    try:
+        with STAGE.time("build", route, name):
+            fig = build()
+        with STAGE.time("serialize", route, name):
+            js = dark_layout(fig)
+        with STAGE.time("compress", route, name):
+            p = FIGS.put(key, transport.Payload(js), tags=deps)
+        fut.set_result(p)
+        return p
+    except BaseException as e:
+        fut.set_exception(e)
+        raise
+    finally:
+        with _BUILDS_LOCK:
+            _BUILDS.pop(key, None)
+
+def prefetch(route):
+    """Build the route's uncached charts on the chart pool (created per process, after any fork)."""
+    with _BUILDS_LOCK:
+        if not _CHART_POOL:
+            _CHART_POOL.append(ThreadPoolExecutor(CHART_THREADS, thread_name_prefix="chart"))
+    for r, name in CHARTS:
+        if r == route:
+            _CHART_POOL[0].submit(chart_payload, r, name)
+
+def reload_data(**frames):
+    """Swap in new cr / fd / ins / mkt frames (as a new snapshot, which the other workers
+    follow) and drop every figure derived from them."""
+    global Xcr, Xfd, Xins
+    for name, df in frames.items():
+        globals()[name] = ingest.prepare(df, DATASETS[name]) if name in DATASETS else df
+    Xcr, Xfd, Xins = features(cr, fd, ins)
+    if SNAPSHOT_DIR:
+        with _SNAPSHOT_LOCK:
+            _map_snapshot(_publish_snapshot(list(frames) + ["Xcr", "Xfd", "Xins"]))
+    _data_changed(frames)
+
+def _data_changed(names):
+    for name in names:
+        if name not in DATA_VERSION:
+            continue                    # feature frames follow their dataset
+        DATA_VERSION[name] += 1
+        FIGS.invalidate(name)
+        if name in DATASETS:
+            AGGS[name] = ingest.aggregate(globals()[name], DATASETS[name])
+            SOURCES.pop(DATASETS[name], None)
+    if "fd" in names:
+        with _TXNS_LOCK:
+            _TXNS.clear()
+    with _DRIFT_LOCK:
+        for task, (name, _) in DRIFT_TASKS.items():
+            if name in names:
+                _DRIFT.pop(task, None)  # new reference frame, new bins
+    if "cr" in names:
+        with _BOOK_LOCK:
+            _BOOK.clear()               # rescored from the new frame on next use
+        DATA_VERSION["book"] += 1
+        FIGS.invalidate("book")
+
+def _follow_snapshot(force=False):
+    """Switch to a snapshot another worker published (checked at most once a second unless forced)."""
+    now = time.monotonic()
+    if not SNAPSHOT_DIR or (now - SNAPSHOT["checked"] < 1 and not force):
+        return
+    SNAPSHOT["checked"] = now
+    v = snapshot.current(SNAPSHOT_DIR)
+    if v and v != SNAPSHOT["version"]:
+        with _SNAPSHOT_LOCK:
+            if v != SNAPSHOT["version"]:
+                _data_changed(_map_snapshot(v))
+
+@app.before_request
+def _sync():
+    """Catch up with the snapshots and journal entries other workers published."""
+    _follow_snapshot()
+    if JOURNAL_DIR and journal.pending(JOURNAL_DIR, JOURNAL["applied"]):
+        _catch_up()
+
+def _entry(kind, data=None, **payload):
+    """A journal entry; one that changes a dataset is stamped with that frame's snapshot generation
+    (after catching up with the latest snapshot), so workers skip it once the frame is replaced."""
+    if data:
+        _follow_snapshot(force=True)
+    return {"kind": kind, "data": data, "gen": SNAPSHOT["generations"].get(data) if data else None, **payload}
+
+def _apply(e):
+    """Apply one validated entry to this worker; returns its result, None if its frame was replaced."""
+    if e["kind"] == "feedback":
+        rec = ONLINE[e["task"]].update(e["X"], e["y"])
+        SCORE_CACHE.invalidate(e["task"])      # the version in the key already moved; free the old entries
+        return rec
+    k = e["data"]
+    if e["gen"] != SNAPSHOT["generations"].get(k):
+        return None
+    if e["kind"] == "append":
+        for df in e["chunks"]:
+            if len(df) <= ADD_ROWS:
+                for rec in df.to_dict("records"):
+                    AGGS[k].add(rec)
+            else:
+                AGGS[k].update(df)
+        for cols in e.get("txns", ()):
+            txns().append(cols)
+        DATA_VERSION[k] += 1
+        FIGS.invalidate(k)
+    res = book().upsert(*e["loans"]) if e.get("loans") else None
+    if res is not None:
+        DATA_VERSION["book"] += 1
+        FIGS.invalidate("book")
+    return {"loans": res}
+
+def _catch_up(until=None):
+    """Apply the journal entries this worker has not applied yet; returns the result of entry `until`."""
+    out = None
+    with _JOURNAL_LOCK:
+        for seq, e in journal.entries(JOURNAL_DIR, JOURNAL["applied"]):
+            if e["gen"] is not None and e["gen"] > SNAPSHOT["generations"].get(e["data"], 0):
+                _follow_snapshot(force=True)   # written against a snapshot this worker has not mapped yet
+            try:
+                r = _apply(e)
+            except Exception:                  # validated before it was written; never retry forever
+                app.logger.exception("journal entry %d (%s) failed", seq, e["kind"])
+                r = None
+            JOURNAL["applied"] = seq
+            if seq == until:
+                out = r
+    return out
+
+def _commit(entry):
+    """Apply a validated change in every worker — through the journal when there is one."""
+    if not JOURNAL_DIR:
+        with _JOURNAL_LOCK:
+            return _apply(entry)
+    return _catch_up(journal.append(JOURNAL_DIR, entry, JOURNAL["applied"]))
+
+def _unshared():
+    """409 when a change would reach only this worker (several workers, no journal), else None."""
+    if not JOURNAL_DIR and SERVER_WORKERS > 1:
+        return jsonify(error=f"{SERVER_WORKERS} workers and no snapshot directory: changes would reach one "
+                             "worker only (set RISKSIGHT_SNAPSHOT_DIR or run a single worker)"), 409
+    return None
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  SHELL TEMPLATE  (sidebar + topbar around {{ body }}; compiled once at import)
 # ═══════════════════════════════════════════════════════════════════════════════
 
 SHELL = """<!DOCTYPE html>
@@ -144,7 +445,22 @@ SHELL = """<!DOCTYPE html>
   <title>{{ title }} | RiskSight Pro</title>
   <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet"/>
   <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" rel="stylesheet"/>
-  <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+  <script src="https://cdn.plot.ly/plotly-2.32.0.min.js"></script>
+  <script>
+    // fetch each chart's figure from /fig/... (typed arrays, compressed, ETag-cached) and draw it
+    // with the shared layout template, fetched once per page from /fig/template
+    var figTemplate = null;
+    function getJSON(url){ return fetch(url).then(function(r){ return r.json(); }); }
+    function loadFigs(urls){
+      figTemplate = figTemplate || getJSON('/fig/template?v=' + '{{ plotly_version }}');
+      Object.keys(urls).forEach(function(id){
+        Promise.all([figTemplate, getJSON(urls[id])]).then(function(a){
+          var f = a[1]; f.layout.template = a[0];
+          Plotly.react(id, f.data, f.layout, {responsive:true, displayModeBar:false});
+        });
+      });
+    }
+  </script>
   <style>
     :root{--sw:252px;--bg:#0d1117;--sf:#161b22;--sf2:#21262d;--bd:#30363d;
           --tx:#c9d1d9;--tm:#8b949e;--ac:#00b0ff;--ok:#3fb950;--er:#f85149;--wa:#d29922}
@@ -228,6 +544,8 @@ SHELL = """<!DOCTYPE html>
     <a href="/insurance/claims"        class="nav-link {{ 'active' if active=='claims'  }}"><i class="fas fa-file-medical"></i>Claims Analytics</a>
     <a href="/insurance/underwriting"  class="nav-link {{ 'active' if active=='uw'      }}"><i class="fas fa-clipboard-check"></i>Underwriting Risk</a>
     <a href="/insurance/loss-ratio"    class="nav-link {{ 'active' if active=='loss'    }}"><i class="fas fa-balance-scale"></i>Loss Ratio</a>
+    <div class="ns">Monitoring</div>
+    <a href="/monitoring/drift"        class="nav-link {{ 'active' if active=='drift'   }}"><i class="fas fa-wave-square"></i>Model Drift</a>
   </nav>
   <div class="p-3"><small style="font-size:10px;color:var(--tm)">Portfolio Demo &bull; Synthetic Data<br>RiskSight Pro v1.0 &bull; 2025</small></div>
 </div>
@@ -241,12 +559,13 @@ SHELL = """<!DOCTYPE html>
     </div>
   </div>
   <div class="pb">
-    <!-- BODY -->
+    {{ body }}
   </div>
 </div>
 <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
-<!-- SCRIPTS -->
+{{ scripts }}
 </body></html>"""
+SHELL_TEMPLATE = app.jinja_env.from_string(SHELL)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 #  PAGE BUILDERS  (small helpers that return chart JSON)
@@ -265,56 +584,145 @@ def kpi_block(label, value, sub, icon, color):
       </div>
     </div>"""
 
-def plotly_div(div_id, fig_json_str, height=320):
+def fig_url(route, name):
+    return f"/fig/{route}/{name}?v={quote(chart_version(route, name))}"
+
+def fig_urls(route, **divs):
+    """JSON {div id: versioned /fig URL} for loadFigs(), from div id=chart name pairs."""
+    return json.dumps({d: fig_url(route, name) for d, name in divs.items()})
+
+def plotly_div(div_id, route, name, height=320):
     return f"""
     <div id="{div_id}" style="height:{height}px"></div>
-    <script>Plotly.react('{div_id}',{fig_json_str}.data,{fig_json_str}.layout,{{responsive:true,displayModeBar:false}})</script>"""
+    <script>loadFigs({{"{div_id}": "{fig_url(route, name)}"}})</script>"""
+
+def _groups(x, by):
+    x = pd.Series(np.asarray(x))
+    return [(None, x)] if by is None else list(x.groupby(np.asarray(by), sort=True))
+
+def hist_bars(x, by=None, nbins=40, colors=None, **bar):
+    """Pre-binned histogram — one go.Bar per `by` group on shared bin edges."""
+    _, edges = downsample.histogram(x, nbins)
+    mid, width = (edges[:-1] + edges[1:]) / 2, np.diff(edges)
+    return [go.Bar(x=mid, y=downsample.histogram(g, edges=edges)[0], width=width,
+                   **{"name": str(k), "marker_color": (colors or {}).get(k), "showlegend": by is not None, **bar})
+            for k, g in _groups(x, by)]
+
+def sketch_bars(sketches, nbins=40, colors=None, **bar):
+    """Histogram bars from quantile sketches ({name: QuantileSketch}) on shared bin edges —
+    counts are rank differences at the edges, so no raw values are needed."""
+    live = {k: s for k, s in sketches.items() if len(s)}
+    lo, hi = min(s.min for s in live.values()), max(s.max for s in live.values())
+    edges = np.linspace(lo, hi, nbins + 1)
+    mid, width = (edges[:-1] + edges[1:]) / 2, np.diff(edges)
+    return [go.Bar(x=mid, y=np.diff(np.r_[0, s.rank(edges[1:-1]), len(s)]), width=width,
+                   **{"name": str(k), "marker_color": (colors or {}).get(k), **bar})
+            for k, s in live.items()]
+
+def box_traces(y, by, colors=None):
+    """Box plots from precomputed quartiles/fences, with a capped outlier set."""
+    traces = []
+    for k, g in _groups(y, by):
+        b = downsample.box_stats(g, CHART_POINTS["outliers"])
+        c = (colors or {}).get(k)
+        traces.append(go.Box(x=[str(k)], q1=[b["q1"]], median=[b["median"]], q3=[b["q3"]], mean=[b["mean"]],
+                             lowerfence=[b["lowerfence"]], upperfence=[b["upperfence"]],
+                             name=str(k), marker_color=c, boxpoints=False))
+        traces.append(go.Scatter(x=[str(k)] * len(b["outliers"]), y=b["outliers"], mode="markers",
+                                 marker=dict(color=c, size=4), showlegend=False, hoverinfo="y"))
+    return traces
+
+def violin_traces(y, by, colors=None):
+    """Violins drawn from a gridded KDE (one filled outline per group at x = 0, 1, ...)
+    with a precomputed inner box."""
+    traces = []
+    for i, (k, g) in enumerate(_groups(y, by)):
+        grid, d = downsample.kde(g, CHART_POINTS["kde"])
+        half, b, c = d / d.max() * .4, downsample.box_stats(g, 0), (colors or {}).get(k)
+        traces.append(go.Scatter(x=np.round(np.r_[i - half, (i + half)[::-1]], 4), y=np.r_[grid, grid[::-1]],
+                                 fill="toself", mode="lines", line=dict(color=c, width=1),
+                                 name=str(k), hoverinfo="skip"))
+        traces.append(go.Box(x=[i], q1=[b["q1"]], median=[b["median"]], q3=[b["q3"]],
+                             lowerfence=[b["lowerfence"]], upperfence=[b["upperfence"]], width=.08,
+                             marker_color=c, boxpoints=False, showlegend=False))
+    return traces
+
+def scatter_traces(x, y, by, colors=None, n=POINT_BUDGET, **marker):
+    """Density-preserving thinned scatter, one go.Scatter per `by` group."""
+    x, y, by = np.asarray(x), np.asarray(y), np.asarray(by)
+    keep = downsample.thin(x, y, n, by=by)
+    x, y, by = x[keep], y[keep], by[keep]
+    return [go.Scatter(x=x[by == k], y=y[by == k], mode="markers", name=str(k),
+                       marker=dict(color=(colors or {}).get(k), **marker)) for k in np.unique(by)]
+
+def series(x, y, n=None):
+    """x= / y= trace arguments reduced with LTTB to the market time-series budget."""
+    keep = downsample.lttb(x, y, n or CHART_POINTS["market_ts"])
+    return dict(x=np.asarray(x)[keep], y=np.asarray(y)[keep])
 
 # ═══════════════════════════════════════════════════════════════════════════════
 #  ROUTE: HOME DASHBOARD
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@app.route("/")
-def home():
-    total_loans     = len(cr)
-    default_rate    = round(cr.default.mean()*100, 1)
-    fraud_rate      = round(fd.fraud.mean()*100, 1)
-    avg_loss_ratio  = round(ins.loss_ratio.mean(), 3)
-
+@parts("home", "cr","fd","ins")
+def _home_parts():
+    t_cr, t_fd, t_ins = AGGS["cr"].total(), AGGS["fd"].total(), AGGS["ins"].total()
+    total_loans     = int(t_cr.n)
+    default_rate    = round(t_cr.default_mean*100, 1)
+    fraud_rate      = round(t_fd.fraud_mean*100, 1)
+    avg_loss_ratio  = round(t_ins.loss_ratio_mean, 3)
+    return dict(kpis=[
+        kpi_block("Total Loan Records", f"{total_loans:,}","Synthetic portfolio","<i class='fas fa-file-invoice-dollar'></i>","0,176,255"),
+        kpi_block("Avg Default Rate", f"{default_rate}%","Probability of Default (PD)","<i class='fas fa-exclamation-triangle'></i>","248,81,73"),
+        kpi_block("Fraud Detection Rate", f"{fraud_rate}%","of flagged transactions","<i class='fas fa-user-secret'></i>","210,153,34"),
+        kpi_block("Avg Loss Ratio", f"{avg_loss_ratio:.2f}","Claims ÷ Premiums","<i class='fas fa-balance-scale'></i>","63,185,80")])
+
+@chart("home", "grade_default", "cr")
+def _home_grade_default():
     # Chart 1 — default rate by credit grade
-    grade_df = cr.groupby("risk_grade", observed=True)["default"].mean().reset_index()
-    fig1 = go.Figure(go.Bar(
-        x=grade_df.risk_grade.astype(str), y=(grade_df.default*100).round(1),
+    grade_df = AGGS["cr"].frame("grade")
+    fig = go.Figure(go.Bar(
+        x=grade_df.index.astype(str), y=(grade_df.default_mean*100).round(1),
         marker_color=["#f85149","#d29922","#58a6ff","#3fb950","#00b0ff"],
-        text=(grade_df.default*100).round(1).astype(str)+"%", textposition="outside"))
-    fig1.update_layout(title="Default Rate by Credit Grade (%)", showlegend=False)
+        text=(grade_df.default_mean*100).round(1).astype(str)+"%", textposition="outside"))
+    fig.update_layout(title="Default Rate by Credit Grade (%)", showlegend=False)
+    return fig
 
+@chart("home", "channel_fraud", "fd")
+def _home_channel_fraud():
     # Chart 2 — fraud by channel
-    ch_df = fd.groupby("channel")["fraud"].mean().reset_index()
-    fig2 = px.bar(ch_df, x="channel", y="fraud", color="fraud",
+    ch_df = AGGS["fd"].frame("channel").fraud_mean.rename("fraud").reset_index()
+    return px.bar(ch_df, x="channel", y="fraud", color="fraud",
                   color_continuous_scale=["#3fb950","#f85149"], title="Fraud Rate by Channel")
 
+@chart("home", "portfolio", "mkt")
+def _home_portfolio():
     # Chart 3 — portfolio value
-    fig3 = go.Figure(go.Scatter(
-        x=mkt.date, y=mkt.portfolio/1e6, fill="tozeroy",
+    fig = go.Figure(go.Scatter(
+        **series(mkt.date, mkt.portfolio/1e6), fill="tozeroy",
         line=dict(color="#00b0ff",width=2), fillcolor="rgba(0,176,255,.08)"))
-    fig3.update_layout(title="Portfolio Value (USD M)", xaxis_title="", yaxis_title="M")
+    fig.update_layout(title="Portfolio Value (USD M)", xaxis_title="", yaxis_title="M")
+    return fig
 
+@chart("home", "policy_loss_ratio", "ins")
+def _home_policy_loss_ratio():
     # Chart 4 — loss ratio by policy type
-    lr_df = ins.groupby("policy_type")["loss_ratio"].mean().reset_index()
-    fig4 = px.pie(lr_df, names="policy_type", values="loss_ratio",
+    lr_df = AGGS["ins"].frame("policy").loss_ratio_mean.rename("loss_ratio").reset_index()
+    return px.pie(lr_df, names="policy_type", values="loss_ratio",
                   color_discrete_sequence=["#00b0ff","#3fb950","#d29922"],
                   title="Avg Loss Ratio by Policy Type", hole=.45)
 
-    j1,j2,j3,j4 = [dark_layout(f) for f in [fig1,fig2,fig3,fig4]]
-
+@app.route("/")
+def home():
+    p = page_parts("home")
+    k = p["kpis"]
     body = f"""
     <!-- KPIs -->
     <div class="row g-3 mb-4">
-      <div class="col-md-3">{kpi_block("Total Loan Records", f"{total_loans:,}","Synthetic portfolio","<i class='fas fa-file-invoice-dollar'></i>","0,176,255")}</div>
-      <div class="col-md-3">{kpi_block("Avg Default Rate", f"{default_rate}%","Probability of Default (PD)","<i class='fas fa-exclamation-triangle'></i>","248,81,73")}</div>
-      <div class="col-md-3">{kpi_block("Fraud Detection Rate", f"{fraud_rate}%","of flagged transactions","<i class='fas fa-user-secret'></i>","210,153,34")}</div>
-      <div class="col-md-3">{kpi_block("Avg Loss Ratio", f"{avg_loss_ratio:.2f}","Claims ÷ Premiums","<i class='fas fa-balance-scale'></i>","63,185,80")}</div>
+      <div class="col-md-3">{k[0]}</div>
+      <div class="col-md-3">{k[1]}</div>
+      <div class="col-md-3">{k[2]}</div>
+      <div class="col-md-3">{k[3]}</div>
     </div>
     <!-- Charts row 1 -->
     <div class="row g-3 mb-0">
@@ -330,10 +738,7 @@ def home():
         <div id="c4" style="height:260px"></div></div></div>
     </div>
     <script>
-      var fns=[{j1},{j2},{j3},{j4}];
-      ["c1","c2","c3","c4"].forEach(function(id,i){{
-        Plotly.react(id,fns[i].data,fns[i].layout,{{responsive:true,displayModeBar:false}});
-      }});
+      loadFigs({fig_urls("home", c1="grade_default", c2="channel_fraud", c3="portfolio", c4="policy_loss_ratio")});
     </script>"""
     return rp("Risk Dashboard", "home", body)
 
@@ -341,36 +746,54 @@ def home():
 #  ROUTE: CREDIT RISK
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@app.route("/banking/credit-risk")
-def credit_risk():
+@parts("credit_risk", "cr")
+def _credit_risk_parts():
+    t = AGGS["cr"].total()
+    return dict(kpis=[
+        kpi_block("Default Rate",f"{ round(t.default_mean*100,1)}%","Probability of Default","<i class='fas fa-times-circle'></i>","248,81,73"),
+        kpi_block("Avg Credit Score",str(int(t.credit_score_mean)),"Population average","<i class='fas fa-star'></i>","0,176,255"),
+        kpi_block("High-Risk Loans",f"{int(t.pd_gt50_sum):,}","PD > 50%","<i class='fas fa-exclamation-circle'></i>","210,153,34"),
+        kpi_block("Avg LGD Proxy",f"{ round(t.debt_ratio_mean*100,1)}%","Avg debt-to-income ratio","<i class='fas fa-percent'></i>","63,185,80")])
+
+@chart("credit_risk", "score_dist", "cr")
+def _credit_score_dist():
     # Distribution of credit scores
-    fig1 = px.histogram(cr, x="credit_score", nbins=40, color="default",
-                        color_discrete_map={0:"#3fb950",1:"#f85149"},
-                        barmode="overlay", title="Credit Score Distribution",
-                        labels={"default":"Default"})
+    fig = go.Figure(hist_bars(cr.credit_score, cr.default, 40, {0:"#3fb950",1:"#f85149"}, opacity=.6))
+    fig.update_layout(title="Credit Score Distribution", barmode="overlay", bargap=0,
+                      legend_title_text="Default", xaxis_title="credit_score", yaxis_title="count")
+    return fig
+
+@chart("credit_risk", "pd_heatmap", "cr")
+def _credit_pd_heatmap():
     # Default prob heatmap by age bucket and debt ratio bucket
-    cr["age_grp"]  = pd.cut(cr.age,  [20,30,40,50,60,70], labels=["20s","30s","40s","50s","60s"])
-    cr["dr_grp"]   = pd.cut(cr.debt_ratio, [0,.2,.4,.6,.8,1], labels=["0-20%","20-40%","40-60%","60-80%","80-100%"])
-    heat = cr.groupby(["age_grp","dr_grp"], observed=True)["default_prob"].mean().unstack()
-    fig2 = go.Figure(go.Heatmap(
+    heat = AGGS["cr"].frame("age_dr").default_prob_mean.unstack()
+    fig = go.Figure(go.Heatmap(
         z=heat.values, x=heat.columns.astype(str), y=heat.index.astype(str),
         colorscale=[[0,"#3fb950"],[.5,"#d29922"],[1,"#f85149"]], text=heat.values.round(2),
         texttemplate="%{text}", colorbar=dict(title="PD")))
-    fig2.update_layout(title="Avg Default Probability — Age vs Debt Ratio")
+    fig.update_layout(title="Avg Default Probability — Age vs Debt Ratio")
+    return fig
+
+@chart("credit_risk", "importance", "models")
+def _credit_importance():
     # Feature importance
     fi = pd.Series(mdl_cr.feature_importances_,
                    index=["Age","Income","Debt Ratio","Credit Score","Emp Years","Loan Amt"]).sort_values()
-    fig3 = go.Figure(go.Bar(x=fi.values, y=fi.index, orientation="h",
-                            marker_color="#00b0ff"))
-    fig3.update_layout(title="Feature Importance (Random Forest)")
-    j1,j2,j3 = [dark_layout(f) for f in [fig1,fig2,fig3]]
+    fig = go.Figure(go.Bar(x=fi.values, y=fi.index, orientation="h",
+                           marker_color="#00b0ff"))
+    fig.update_layout(title="Feature Importance (Random Forest)")
+    return fig
 
+@app.route("/banking/credit-risk")
+def credit_risk():
+    p = page_parts("credit_risk")
+    k = p["kpis"]
     body = f"""
     <div class="row g-3 mb-3">
-      <div class="col-md-3">{kpi_block("Default Rate",f"{ round(cr.default.mean()*100,1)}%","Probability of Default","<i class='fas fa-times-circle'></i>","248,81,73")}</div>
-      <div class="col-md-3">{kpi_block("Avg Credit Score",str(int(cr.credit_score.mean())),"Population average","<i class='fas fa-star'></i>","0,176,255")}</div>
-      <div class="col-md-3">{kpi_block("High-Risk Loans",f"{(cr.default_prob>.5).sum():,}","PD > 50%","<i class='fas fa-exclamation-circle'></i>","210,153,34")}</div>
-      <div class="col-md-3">{kpi_block("Avg LGD Proxy",f"{ round(cr.debt_ratio.mean()*100,1)}%","Avg debt-to-income ratio","<i class='fas fa-percent'></i>","63,185,80")}</div>
+      <div class="col-md-3">{k[0]}</div>
+      <div class="col-md-3">{k[1]}</div>
+      <div class="col-md-3">{k[2]}</div>
+      <div class="col-md-3">{k[3]}</div>
     </div>
     <div class="row g-3">
       <div class="col-lg-5">
@@ -413,8 +836,7 @@ def credit_risk():
     </div>
     <div class="cc"><h6>Default Probability Heatmap — Age Group vs Debt Ratio</h6><div id="p2" style="height:280px"></div></div>
     <script>
-      var fns=[{j1},{j2},{j3}];
-      ["p1","p2","p3"].forEach(function(id,i){{Plotly.react(id,fns[i].data,fns[i].layout,{{responsive:true,displayModeBar:false}})}});
+      loadFigs({fig_urls("credit_risk", p1="score_dist", p2="pd_heatmap", p3="importance")});
       function scoreCr(){{
         var payload={{age:+document.getElementById('c_age').value,income:+document.getElementById('c_inc').value,
                       debt_ratio:+document.getElementById('c_dr').value,credit_score:+document.getElementById('c_cs').value,
@@ -444,44 +866,62 @@ def credit_risk():
 #  ROUTE: FRAUD DETECTION
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@app.route("/banking/fraud-detection")
-def fraud_detection():
+@parts("fraud_detection", "fd")
+def _fraud_detection_parts():
+    # Recent flagged transactions (date index, fraud bitmap)
+    badge = {1: '<span class="bh">FRAUD</span>', 0: '<span class="bl">CLEAN</span>'}
+    mrisk = {"High": "bh", "Medium": "bm", "Low": "bl"}
+    rows = "".join(
+        f"<tr><td>{r['txn_id']}</td><td>${r['amount']:,.2f}</td><td>{r['hour']:02d}:00</td>"
+        f"<td><span class=\"{mrisk[r['merch_risk']]}\">{r['merch_risk']}</span></td><td>{'Yes' if r['foreign'] else 'No'}</td>"
+        f"<td>{r['channel']}</td><td>{badge[r['fraud']]}</td><td style='color:var(--er)'>{r['fraud_prob']:.1%}</td></tr>"
+        for r in txns().query(where={"fraud": [1]}, limit=12)["rows"])
+
+    t, amt = AGGS["fd"].total(), AGGS["fd"].frame("flag").amount_mean
+    return dict(rows=rows, kpis=[
+        kpi_block("Fraud Transactions",str(int(t.fraud_sum)),"Detected by model","<i class='fas fa-ban'></i>","248,81,73"),
+        kpi_block("Fraud Rate",f"{ round(t.fraud_mean*100,1)}%","of all transactions","<i class='fas fa-percent'></i>","210,153,34"),
+        kpi_block("Avg Fraud Amount",f"${amt.get(1, np.nan):,.0f}",f"vs ${amt.get(0, np.nan):,.0f} clean","<i class='fas fa-dollar-sign'></i>","0,176,255"),
+        kpi_block("Night Fraud (0-5h)",f"{ round(t.night_fraud_sum/t.fraud_sum*100,1)}%","of fraud is after hours","<i class='fas fa-moon'></i>","63,185,80")])
+
+@chart("fraud_detection", "hourly", "fd")
+def _fraud_hourly():
     # Fraud by hour
-    hr_df = fd.groupby("hour")["fraud"].mean().reset_index()
-    fig1 = go.Figure(go.Scatter(x=hr_df.hour, y=hr_df.fraud*100, fill="tozeroy",
-                                line=dict(color="#f85149",width=2), fillcolor="rgba(248,81,73,.1)"))
-    fig1.update_layout(title="Fraud Rate by Hour of Day (%)")
-
+    hr_df = AGGS["fd"].frame("hour")
+    fig = go.Figure(go.Scatter(x=hr_df.index, y=hr_df.fraud_mean*100, fill="tozeroy",
+                               line=dict(color="#f85149",width=2), fillcolor="rgba(248,81,73,.1)"))
+    fig.update_layout(title="Fraud Rate by Hour of Day (%)")
+    return fig
+
+@chart("fraud_detection", "channels", "fd")
+def _fraud_channels():
     # Fraud count by channel
-    ch_df = fd.groupby("channel").agg(total=("fraud","count"),fraud=("fraud","sum")).reset_index()
-    ch_df["rate"] = ch_df.fraud/ch_df.total
-    fig2 = go.Figure()
-    fig2.add_trace(go.Bar(x=ch_df.channel, y=ch_df.total, name="Total", marker_color="#30363d"))
-    fig2.add_trace(go.Bar(x=ch_df.channel, y=ch_df.fraud, name="Fraud", marker_color="#f85149"))
-    fig2.update_layout(title="Transactions vs Fraud by Channel", barmode="overlay")
-
+    ch_df = AGGS["fd"].frame("channel")
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=ch_df.index, y=ch_df.n, name="Total", marker_color="#30363d"))
+    fig.add_trace(go.Bar(x=ch_df.index, y=ch_df.fraud_sum, name="Fraud", marker_color="#f85149"))
+    fig.update_layout(title="Transactions vs Fraud by Channel", barmode="overlay")
+    return fig
+
+@chart("fraud_detection", "amounts", "fd")
+def _fraud_amounts():
     # Fraud amount distribution
-    fig3 = px.violin(fd, y="amount", x="fraud", color="fraud",
-                     color_discrete_map={0:"#3fb950",1:"#f85149"},
-                     title="Transaction Amount Distribution — Legit vs Fraud",
-                     labels={"fraud":"Fraud Flag"}, box=True)
-
-    j1,j2,j3 = [dark_layout(f) for f in [fig1,fig2,fig3]]
-
-    # Recent flagged transactions
-    recent = fd[fd.fraud==1].sort_values("date",ascending=False).head(12)
-    rows = ""
-    for _, r in recent.iterrows():
-        badge = '<span class="bh">FRAUD</span>' if r.fraud else '<span class="bl">CLEAN</span>'
-        mrisk = f'<span class="{"bh" if r.merch_risk=="High" else "bm" if r.merch_risk=="Medium" else "bl"}">{r.merch_risk}</span>'
-        rows += f"<tr><td>{r.txn_id}</td><td>${r.amount:,.2f}</td><td>{r.hour:02d}:00</td><td>{mrisk}</td><td>{'Yes' if r.foreign else 'No'}</td><td>{r.channel}</td><td>{badge}</td><td style='color:var(--er)'>{r.fraud_prob:.1%}</td></tr>"
+    fig = go.Figure(violin_traces(fd.amount, fd.fraud, {0:"#3fb950",1:"#f85149"}))
+    fig.update_layout(title="Transaction Amount Distribution — Legit vs Fraud", legend_title_text="Fraud Flag",
+                      xaxis=dict(title="Fraud Flag", tickvals=[0,1], ticktext=["0","1"]), yaxis_title="amount")
+    return fig
 
+@app.route("/banking/fraud-detection")
+def fraud_detection():
+    p = page_parts("fraud_detection")
+    k = p["kpis"]
+    rows = p["rows"]
     body = f"""
     <div class="row g-3 mb-3">
-      <div class="col-md-3">{kpi_block("Fraud Transactions",str(fd.fraud.sum()),"Detected by model","<i class='fas fa-ban'></i>","248,81,73")}</div>
-      <div class="col-md-3">{kpi_block("Fraud Rate",f"{ round(fd.fraud.mean()*100,1)}%","of all transactions","<i class='fas fa-percent'></i>","210,153,34")}</div>
-      <div class="col-md-3">{kpi_block("Avg Fraud Amount",f"${fd[fd.fraud==1].amount.mean():,.0f}","vs ${fd[fd.fraud==0].amount.mean():,.0f} clean","<i class='fas fa-dollar-sign'></i>","0,176,255")}</div>
-      <div class="col-md-3">{kpi_block("Night Fraud (0-5h)",f"{ round(fd[(fd.hour<5)&(fd.fraud==1)].shape[0]/fd[fd.fraud==1].shape[0]*100,1)}%","of fraud is after hours","<i class='fas fa-moon'></i>","63,185,80")}</div>
+      <div class="col-md-3">{k[0]}</div>
+      <div class="col-md-3">{k[1]}</div>
+      <div class="col-md-3">{k[2]}</div>
+      <div class="col-md-3">{k[3]}</div>
     </div>
     <div class="row g-3 mb-2">
       <div class="col-md-5"><div class="cc"><h6>Fraud Rate by Hour</h6><div id="f1" style="height:240px"></div></div></div>
@@ -497,8 +937,7 @@ def fraud_detection():
       </table></div>
     </div>
     <script>
-      var fns=[{j1},{j2},{j3}];
-      ["f1","f2","f3"].forEach(function(id,i){{Plotly.react(id,fns[i].data,fns[i].layout,{{responsive:true,displayModeBar:false}})}});
+      loadFigs({fig_urls("fraud_detection", f1="hourly", f2="channels", f3="amounts")});
     </script>"""
     return rp("Fraud Detection", "fraud", body)
 
@@ -506,50 +945,98 @@ def fraud_detection():
 #  ROUTE: MARKET RISK  (VaR / CVaR / Drawdown)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@app.route("/banking/market-risk")
-def market_risk():
+def ret_sketch():
+    """Quantile sketch of the book's daily returns (risksight.sketch), once per market data version."""
+    return FIGS.get_or_set(("ret_sketch", DATA_VERSION["mkt"]), lambda: QuantileSketch().update(mkt.ret.values),
+                           tags=("mkt",))
+
+def _var_levels(sk):
+    """1-day historical VaR 95/99 and CVaR 95 on the $10M book, from a return sketch."""
+    VaR_95, VaR_99 = -sk.quantile([.05, .01]) * 10_000_000
+    CVaR_95 = -sk.tail_mean(.05) * 10_000_000
+    return VaR_95, VaR_99, CVaR_95
+
+@parts("market_risk", "mkt")
+def _market_risk_parts():
     rets = mkt.ret.values
-    VaR_95  = -np.percentile(rets, 5)   * 10_000_000
-    VaR_99  = -np.percentile(rets, 1)   * 10_000_000
-    CVaR_95 = -rets[rets < -VaR_95/10_000_000].mean() * 10_000_000
+    VaR_95, VaR_99, CVaR_95 = _var_levels(ret_sketch())
     vol     = rets.std() * np.sqrt(252)
     sharpe  = (rets.mean()*252) / (rets.std()*np.sqrt(252))
     max_dd  = mkt.drawdown.min()
 
+    # Multi-desk parametric vs Monte Carlo VaR (10-day, Basel horizon)
+    cov, mu = np.cov(BOOK_RETS.values.T), BOOK_RETS.values.mean(0)
+    par = parametric_var(BOOK_POS.values, cov, mu, levels=(.99,), horizon=10)
+    mc  = monte_carlo_var(BOOK_POS.values, cov, mu, levels=(.95,.99), horizon=10, n_scenarios=100_000)
+    mc_rows = "".join(
+        f"<tr><td>{desk}</td><td>${BOOK_POS.loc[desk].abs().sum()/1e6:.1f}M</td><td>${par['var_99'][i]:,.0f}</td>"
+        f"<td>${mc['var_95'][i]:,.0f}</td><td style='color:var(--wa)'>${mc['var_99'][i]:,.0f}</td>"
+        f"<td style='color:var(--er)'>${mc['cvar_99'][i]:,.0f}</td></tr>"
+        for i, desk in enumerate(BOOK_POS.index))
+    mc_note = (f"{mc['timing']['scenarios']:,} correlated scenarios × {BOOK_POS.shape[1]} assets "
+               f"in {mc['timing']['seconds']*1e3:.0f} ms")
+
+    return dict(mc_rows=mc_rows, mc_note=mc_note,
+                vol=round(vol*100,1), max_dd=round(max_dd*100,1), kpis=[
+        kpi_block("VaR 95% (1-day)",f"${VaR_95:,.0f}","Max daily loss at 95% CI","<i class='fas fa-chart-bar'></i>","210,153,34"),
+        kpi_block("VaR 99% (1-day)",f"${VaR_99:,.0f}","Max daily loss at 99% CI","<i class='fas fa-exclamation-triangle'></i>","248,81,73"),
+        kpi_block("CVaR 95%",f"${CVaR_95:,.0f}","Expected Shortfall (ES)","<i class='fas fa-fire'></i>","248,81,73"),
+        kpi_block("Sharpe Ratio",f"{sharpe:.2f}","Annualized risk-adjusted return","<i class='fas fa-tachometer-alt'></i>","0,176,255")])
+
+@chart("market_risk", "portfolio", "mkt")
+def _market_portfolio():
     # Portfolio time series
-    fig1 = go.Figure()
-    fig1.add_trace(go.Scatter(x=mkt.date,y=mkt.portfolio/1e6,name="Portfolio",
-                              line=dict(color="#00b0ff",width=2),fill="tozeroy",
-                              fillcolor="rgba(0,176,255,.06)"))
-    fig1.update_layout(title="Portfolio Value (USD M)", yaxis_title="USD M")
-
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(**series(mkt.date, mkt.portfolio/1e6),name="Portfolio",
+                             line=dict(color="#00b0ff",width=2),fill="tozeroy",
+                             fillcolor="rgba(0,176,255,.06)"))
+    fig.update_layout(title="Portfolio Value (USD M)", yaxis_title="USD M")
+    return fig
+
+@chart("market_risk", "returns", "mkt")
+def _market_returns():
     # Return distribution with VaR lines
-    fig2 = go.Figure()
-    fig2.add_trace(go.Histogram(x=rets*100, nbinsx=60, name="Daily Returns",
-                                marker_color="rgba(0,176,255,.6)"))
-    fig2.add_vline(x=-VaR_95/10_000_000*100, line_color="#d29922", annotation_text="VaR 95%")
-    fig2.add_vline(x=-VaR_99/10_000_000*100, line_color="#f85149", annotation_text="VaR 99%")
-    fig2.update_layout(title="Daily Return Distribution (%)")
-
+    rets = mkt.ret.values
+    VaR_95, VaR_99, _ = _var_levels(ret_sketch())
+    fig = go.Figure()
+    fig.add_traces(hist_bars(rets*100, nbins=60, name="Daily Returns", marker_color="rgba(0,176,255,.6)"))
+    fig.update_layout(bargap=0)
+    fig.add_vline(x=-VaR_95/10_000_000*100, line_color="#d29922", annotation_text="VaR 95%")
+    fig.add_vline(x=-VaR_99/10_000_000*100, line_color="#f85149", annotation_text="VaR 99%")
+    fig.update_layout(title="Daily Return Distribution (%)")
+    return fig
+
+@chart("market_risk", "drawdown", "mkt")
+def _market_drawdown():
     # Drawdown
-    fig3 = go.Figure(go.Scatter(x=mkt.date, y=mkt.drawdown*100, fill="tozeroy",
-                                line=dict(color="#f85149",width=1.5),
-                                fillcolor="rgba(248,81,73,.1)"))
-    fig3.update_layout(title="Portfolio Drawdown (%)", yaxis_title="%")
-
-    # Rolling VaR (21-day)
-    roll_var = pd.Series(rets).rolling(21).apply(lambda x: -np.percentile(x,5)*10_000_000)
-    fig4 = go.Figure(go.Scatter(x=mkt.date, y=roll_var/1e3, line=dict(color="#d29922",width=2)))
-    fig4.update_layout(title="Rolling 21-day VaR 95% (USD K)")
-
-    j1,j2,j3,j4 = [dark_layout(f) for f in [fig1,fig2,fig3,fig4]]
+    fig = go.Figure(go.Scatter(**series(mkt.date, mkt.drawdown*100), fill="tozeroy",
+                               line=dict(color="#f85149",width=1.5),
+                               fillcolor="rgba(248,81,73,.1)"))
+    fig.update_layout(title="Portfolio Drawdown (%)", yaxis_title="%")
+    return fig
+
+@chart("market_risk", "rolling_var", "mkt")
+def _market_rolling_var():
+    # Rolling VaR / CVaR (21-day)
+    roll = rolling_risk(mkt.ret.values, window=21, levels=(.95,), notional=10_000_000)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(**series(mkt.date, roll["var_95"]/1e3), name="VaR 95%",
+                             line=dict(color="#d29922",width=2)))
+    fig.add_trace(go.Scatter(**series(mkt.date, roll["cvar_95"]/1e3), name="CVaR 95%",
+                             line=dict(color="#f85149",width=1.5,dash="dot")))
+    fig.update_layout(title="Rolling 21-day VaR / CVaR 95% (USD K)")
+    return fig
 
+@app.route("/banking/market-risk")
+def market_risk():
+    p = page_parts("market_risk")
+    k = p["kpis"]
     body = f"""
     <div class="row g-3 mb-3">
-      <div class="col-md-3">{kpi_block("VaR 95% (1-day)",f"${VaR_95:,.0f}","Max daily loss at 95% CI","<i class='fas fa-chart-bar'></i>","210,153,34")}</div>
-      <div class="col-md-3">{kpi_block("VaR 99% (1-day)",f"${VaR_99:,.0f}","Max daily loss at 99% CI","<i class='fas fa-exclamation-triangle'></i>","248,81,73")}</div>
-      <div class="col-md-3">{kpi_block("CVaR 95%",f"${CVaR_95:,.0f}","Expected Shortfall (ES)","<i class='fas fa-fire'></i>","248,81,73")}</div>
-      <div class="col-md-3">{kpi_block("Sharpe Ratio",f"{sharpe:.2f}","Annualized risk-adjusted return","<i class='fas fa-tachometer-alt'></i>","0,176,255")}</div>
+      <div class="col-md-3">{k[0]}</div>
+      <div class="col-md-3">{k[1]}</div>
+      <div class="col-md-3">{k[2]}</div>
+      <div class="col-md-3">{k[3]}</div>
     </div>
     <div class="row g-3 mb-2">
       <div class="col-md-8"><div class="cc"><h6>Portfolio Value (1 Year)</h6><div id="m1" style="height:240px"></div></div></div>
@@ -559,14 +1046,22 @@ def market_risk():
       <div class="col-md-6"><div class="cc"><h6>Drawdown</h6><div id="m3" style="height:230px"></div></div></div>
       <div class="col-md-6"><div class="cc"><h6>Rolling VaR 95%</h6><div id="m4" style="height:230px"></div></div></div>
     </div>
+    <div class="cc">
+      <h6><i class="fas fa-dice me-2" style="color:var(--ac)"></i>Desk VaR — 10-Day Horizon (Parametric vs Monte Carlo)</h6>
+      <div class="table-responsive">
+      <table class="table rt">
+        <thead><tr><th>Desk</th><th>Gross Exposure</th><th>Parametric VaR 99%</th><th>MC VaR 95%</th><th>MC VaR 99%</th><th>MC CVaR 99%</th></tr></thead>
+        <tbody>{p["mc_rows"]}</tbody>
+      </table></div>
+      <small style="color:var(--tm);font-size:11px">{p["mc_note"]}</small>
+    </div>
     <div class="alert-dark alert mt-0 mb-0 p-3" style="font-size:12px">
       <i class="fas fa-info-circle me-2" style="color:var(--ac)"></i>
       <b>Basel III Pillar 1:</b> VaR at 99% confidence over 10-day horizon for market risk capital requirement.
-      Annualised Volatility: <b>{ round(vol*100,1)}%</b> &bull; Max Drawdown: <b>{ round(max_dd*100,1)}%</b>
+      Annualised Volatility: <b>{p["vol"]}%</b> &bull; Max Drawdown: <b>{p["max_dd"]}%</b>
     </div>
     <script>
-      var fns=[{j1},{j2},{j3},{j4}];
-      ["m1","m2","m3","m4"].forEach(function(id,i){{Plotly.react(id,fns[i].data,fns[i].layout,{{responsive:true,displayModeBar:false}})}});
+      loadFigs({fig_urls("market_risk", m1="portfolio", m2="returns", m3="drawdown", m4="rolling_var")});
     </script>"""
     return rp("Market Risk — VaR", "market", body)
 
@@ -574,42 +1069,67 @@ def market_risk():
 #  ROUTE: LOAN PORTFOLIO
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@app.route("/banking/loan-portfolio")
-def loan_portfolio():
+@parts("loan_portfolio", "cr", "book")
+def _loan_portfolio_parts():
+    t = AGGS["cr"].total()
+    b = book().summary()
+    top = max(b["by_purpose"], key=lambda k: b["by_purpose"][k]["ead"])
+    return dict(kpis=[
+        kpi_block("Total Exposure",f"${t.loan_amt_sum/1e6:.1f}M","Gross loan book","<i class='fas fa-university'></i>","0,176,255"),
+        kpi_block("Avg Loan Size",f"${t.loan_amt_mean:,.0f}","Per borrower","<i class='fas fa-coins'></i>","63,185,80"),
+        kpi_block("Expected Loss",f"${b['el']/1e6:.2f}M",f"Model PD × LGD × EAD · UL ${b['ul']/1e6:.2f}M","<i class='fas fa-times-circle'></i>","248,81,73"),
+        kpi_block("Concentration Risk",top,f"{b['by_purpose'][top]['share']:.0%} of exposure · HHI {b['hhi']['purpose']:.2f}","<i class='fas fa-layer-group'></i>","210,153,34")])
+
+@chart("loan_portfolio", "purpose", "cr")
+def _loan_purpose():
     # Purpose breakdown
-    pur_df = cr.groupby("purpose").agg(count=("loan_amt","count"),total=("loan_amt","sum"),
-                                        default_rate=("default","mean")).reset_index()
-    fig1 = px.bar(pur_df, x="purpose", y="total", color="default_rate",
+    pur = AGGS["cr"].frame("purpose")
+    pur_df = pd.DataFrame({"count": pur.n, "total": pur.loan_amt_sum,
+                           "default_rate": pur.default_mean}).reset_index()
+    return px.bar(pur_df, x="purpose", y="total", color="default_rate",
                   color_continuous_scale=["#3fb950","#f85149"],
                   title="Loan Volume by Purpose (colored by default rate)",
                   text=pur_df["count"].astype(str)+" loans")
+
+@chart("loan_portfolio", "grades", "cr")
+def _loan_grades():
     # Risk grade donut
-    grade_cnt = cr.risk_grade.value_counts()
-    fig2 = go.Figure(go.Pie(labels=grade_cnt.index.astype(str), values=grade_cnt.values,
-                            hole=.5, marker_colors=["#f85149","#d29922","#58a6ff","#3fb950","#00b0ff"]))
-    fig2.update_layout(title="Portfolio by Credit Grade")
+    grade_cnt = AGGS["cr"].frame("grade").n.sort_values(ascending=False, kind="stable")
+    fig = go.Figure(go.Pie(labels=grade_cnt.index.astype(str), values=grade_cnt.values,
+                           hole=.5, marker_colors=["#f85149","#d29922","#58a6ff","#3fb950","#00b0ff"]))
+    fig.update_layout(title="Portfolio by Credit Grade")
+    return fig
+
+@chart("loan_portfolio", "income_loan", "cr")
+def _loan_income_loan():
     # Income vs loan scatter
-    sample = cr.sample(300).copy()
-    sample["default"] = sample["default"].astype(str)
-    fig3 = px.scatter(sample, x="income", y="loan_amt", color="default",
-                      color_discrete_map={"0":"#3fb950","1":"#f85149"}, opacity=.7,
-                      title="Income vs Loan Amount",
-                      labels={"default":"Default","income":"Annual Income","loan_amt":"Loan Amount"})
+    fig = go.Figure(scatter_traces(cr.income, cr.loan_amt, cr.default, {0:"#3fb950",1:"#f85149"},
+                                   CHART_POINTS["income_loan"], opacity=.7))
+    fig.update_layout(title="Income vs Loan Amount", legend_title_text="Default",
+                      xaxis_title="Annual Income", yaxis_title="Loan Amount")
+    return fig
+
+@chart("loan_portfolio", "region_purpose", "cr")
+def _loan_region_purpose():
     # Region heatmap
-    rg_df = cr.groupby(["region","purpose"])["default"].mean().unstack().fillna(0)
-    fig4 = go.Figure(go.Heatmap(z=rg_df.values, x=rg_df.columns, y=rg_df.index,
-                                colorscale=[[0,"#3fb950"],[1,"#f85149"]],
-                                texttemplate="%{z:.1%}",
-                                colorbar=dict(title="Default Rate")))
-    fig4.update_layout(title="Default Rate — Region × Loan Purpose")
-    j1,j2,j3,j4 = [dark_layout(f) for f in [fig1,fig2,fig3,fig4]]
+    rg_df = AGGS["cr"].frame("region_purpose").default_mean.unstack().fillna(0)
+    fig = go.Figure(go.Heatmap(z=rg_df.values, x=rg_df.columns, y=rg_df.index,
+                               colorscale=[[0,"#3fb950"],[1,"#f85149"]],
+                               texttemplate="%{z:.1%}",
+                               colorbar=dict(title="Default Rate")))
+    fig.update_layout(title="Default Rate — Region × Loan Purpose")
+    return fig
 
+@app.route("/banking/loan-portfolio")
+def loan_portfolio():
+    p = page_parts("loan_portfolio")
+    k = p["kpis"]
     body = f"""
     <div class="row g-3 mb-3">
-      <div class="col-md-3">{kpi_block("Total Exposure",f"${cr.loan_amt.sum()/1e6:.1f}M","Gross loan book","<i class='fas fa-university'></i>","0,176,255")}</div>
-      <div class="col-md-3">{kpi_block("Avg Loan Size",f"${cr.loan_amt.mean():,.0f}","Per borrower","<i class='fas fa-coins'></i>","63,185,80")}</div>
-      <div class="col-md-3">{kpi_block("Expected Loss",f"${(cr.default_prob*cr.loan_amt).sum()/1e6:.2f}M","EL = PD × LGD × EAD","<i class='fas fa-times-circle'></i>","248,81,73")}</div>
-      <div class="col-md-3">{kpi_block("Concentration Risk",cr.purpose.value_counts().index[0],"Largest loan purpose","<i class='fas fa-layer-group'></i>","210,153,34")}</div>
+      <div class="col-md-3">{k[0]}</div>
+      <div class="col-md-3">{k[1]}</div>
+      <div class="col-md-3">{k[2]}</div>
+      <div class="col-md-3">{k[3]}</div>
     </div>
     <div class="row g-3 mb-2">
       <div class="col-md-8"><div class="cc"><h6>Loan Volume by Purpose</h6><div id="l1" style="height:260px"></div></div></div>
@@ -620,8 +1140,7 @@ def loan_portfolio():
       <div class="col-md-6"><div class="cc"><h6>Default Rate Heatmap</h6><div id="l4" style="height:270px"></div></div></div>
     </div>
     <script>
-      var fns=[{j1},{j2},{j3},{j4}];
-      ["l1","l2","l3","l4"].forEach(function(id,i){{Plotly.react(id,fns[i].data,fns[i].layout,{{responsive:true,displayModeBar:false}})}});
+      loadFigs({fig_urls("loan_portfolio", l1="purpose", l2="grades", l3="income_loan", l4="region_purpose")});
     </script>"""
     return rp("Loan Portfolio", "loan", body)
 
@@ -629,43 +1148,69 @@ def loan_portfolio():
 #  ROUTE: CLAIMS ANALYTICS
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@app.route("/insurance/claims")
-def claims():
+@parts("claims", "ins")
+def _claims_parts():
+    t, sm = AGGS["ins"].total(), AGGS["ins"].frame("smoker").claim_amt_mean
+    med, p95 = AGGS["ins"].quantile("total", "claim_amt", [.5, .95]).iloc[0]
+    return dict(kpis=[
+        kpi_block("Total Claims",f"${t.claim_amt_sum/1e6:.1f}M","Annual claim exposure","<i class='fas fa-file-medical'></i>","248,81,73"),
+        kpi_block("Avg Claim",f"${t.claim_amt_mean:,.0f}",f"Median ${med:,.0f} · P95 ${p95:,.0f}","<i class='fas fa-hand-holding-usd'></i>","0,176,255"),
+        kpi_block("High-Risk %",f"{ round(t.high_risk_mean*100,1)}%","Smokers / BMI>35 / Age>60","<i class='fas fa-heartbeat'></i>","210,153,34"),
+        kpi_block("Smoker Avg Claim",f"${sm.get(1, np.nan):,.0f}",f"vs ${sm.get(0, np.nan):,.0f} non-smoker","<i class='fas fa-smoking'></i>","248,81,73")])
+
+@chart("claims", "monthly", "ins")
+def _claims_monthly():
     # Claims by month
-    mo_df = ins.groupby("month").agg(count=("claim_amt","count"),total=("claim_amt","sum")).reset_index()
-    fig1 = go.Figure()
-    fig1.add_trace(go.Bar(x=mo_df.month, y=mo_df.total/1e3, name="Total Claims ($K)",marker_color="#00b0ff"))
-    fig1.add_trace(go.Scatter(x=mo_df.month, y=mo_df["count"], name="# Claims",
-                              yaxis="y2", line=dict(color="#d29922",width=2), mode="lines+markers"))
-    fig1.update_layout(title="Claims Volume by Month",
-                       yaxis=dict(title="Total ($K)"),
-                       yaxis2=dict(title="# Claims",overlaying="y",side="right",showgrid=False))
-
+    mo = AGGS["ins"].frame("month")
+    mo_df = pd.DataFrame({"count": mo.n, "total": mo.claim_amt_sum}).reset_index()
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=mo_df.month, y=mo_df.total/1e3, name="Total Claims ($K)",marker_color="#00b0ff"))
+    fig.add_trace(go.Scatter(x=mo_df.month, y=mo_df["count"], name="# Claims",
+                             yaxis="y2", line=dict(color="#d29922",width=2), mode="lines+markers"))
+    fig.update_layout(title="Claims Volume by Month",
+                      yaxis=dict(title="Total ($K)"),
+                      yaxis2=dict(title="# Claims",overlaying="y",side="right",showgrid=False))
+    return fig
+
+@chart("claims", "policy_stats", "ins")
+def _claims_policy_stats():
     # Claims by policy type
-    pt_df = ins.groupby("policy_type")["claim_amt"].describe()[["mean","50%","max"]].reset_index()
-    fig2 = go.Figure()
-    for col,col_c in [("mean","#00b0ff"),("50%","#3fb950"),("max","#f85149")]:
-        fig2.add_trace(go.Bar(x=pt_df.policy_type, y=pt_df[col], name=col.upper(), marker_color=col_c))
-    fig2.update_layout(title="Claim Amount Stats by Policy Type", barmode="group")
-
+    pt, q = AGGS["ins"].frame("policy"), AGGS["ins"].quantile("policy", "claim_amt", [.5, .95])
+    pt_df = pd.DataFrame({"mean": pt.claim_amt_mean, "50%": q[.5], "95%": q[.95],
+                          "max": pt.claim_amt_max}).reset_index()
+    fig = go.Figure()
+    for col,col_c in [("mean","#00b0ff"),("50%","#3fb950"),("95%","#d29922"),("max","#f85149")]:
+        fig.add_trace(go.Bar(x=pt_df.policy_type, y=pt_df[col], name=col.upper(), marker_color=col_c))
+    fig.update_layout(title="Claim Amount Stats by Policy Type", barmode="group")
+    return fig
+
+@chart("claims", "smoker_box", "ins")
+def _claims_smoker_box():
     # Smoker vs Non-smoker claims
-    fig3 = px.box(ins, x="smoker", y="claim_amt", color="smoker",
-                  color_discrete_map={0:"#3fb950",1:"#f85149"},
-                  title="Claim Amount: Smoker vs Non-Smoker",
-                  labels={"smoker":"Smoker (1=Yes)","claim_amt":"Claim ($)"})
+    fig = go.Figure(box_traces(ins.claim_amt, ins.smoker, {0:"#3fb950",1:"#f85149"}))
+    fig.update_layout(title="Claim Amount: Smoker vs Non-Smoker", legend_title_text="Smoker (1=Yes)",
+                      xaxis_title="Smoker (1=Yes)", yaxis_title="Claim ($)")
+    return fig
+
+@chart("claims", "bmi_claim", "ins")
+def _claims_bmi_claim():
     # BMI vs claim
-    fig4 = px.scatter(ins.sample(400), x="bmi", y="claim_amt", color="high_risk",
-                      color_discrete_map={0:"#3fb950",1:"#f85149"},
-                      title="BMI vs Claim Amount (colored by high-risk flag)",
-                      opacity=.65)
-    j1,j2,j3,j4 = [dark_layout(f) for f in [fig1,fig2,fig3,fig4]]
+    fig = go.Figure(scatter_traces(ins.bmi, ins.claim_amt, ins.high_risk, {0:"#3fb950",1:"#f85149"},
+                                   CHART_POINTS["bmi_claim"], opacity=.65))
+    fig.update_layout(title="BMI vs Claim Amount (colored by high-risk flag)", legend_title_text="high_risk",
+                      xaxis_title="bmi", yaxis_title="claim_amt")
+    return fig
 
+@app.route("/insurance/claims")
+def claims():
+    p = page_parts("claims")
+    k = p["kpis"]
     body = f"""
     <div class="row g-3 mb-3">
-      <div class="col-md-3">{kpi_block("Total Claims",f"${ins.claim_amt.sum()/1e6:.1f}M","Annual claim exposure","<i class='fas fa-file-medical'></i>","248,81,73")}</div>
-      <div class="col-md-3">{kpi_block("Avg Claim",f"${ins.claim_amt.mean():,.0f}","Per policyholder","<i class='fas fa-hand-holding-usd'></i>","0,176,255")}</div>
-      <div class="col-md-3">{kpi_block("High-Risk %",f"{ round(ins.high_risk.mean()*100,1)}%","Smokers / BMI>35 / Age>60","<i class='fas fa-heartbeat'></i>","210,153,34")}</div>
-      <div class="col-md-3">{kpi_block("Smoker Avg Claim",f"${ins[ins.smoker==1].claim_amt.mean():,.0f}","vs ${ins[ins.smoker==0].claim_amt.mean():,.0f} non-smoker","<i class='fas fa-smoking'></i>","248,81,73")}</div>
+      <div class="col-md-3">{k[0]}</div>
+      <div class="col-md-3">{k[1]}</div>
+      <div class="col-md-3">{k[2]}</div>
+      <div class="col-md-3">{k[3]}</div>
     </div>
     <div class="row g-3 mb-2">
       <div class="col-md-8"><div class="cc"><h6>Monthly Claims Volume</h6><div id="cl1" style="height:250px"></div></div></div>
@@ -676,8 +1221,7 @@ def claims():
       <div class="col-md-7"><div class="cc"><h6>BMI vs Claim Amount</h6><div id="cl4" style="height:260px"></div></div></div>
     </div>
     <script>
-      var fns=[{j1},{j2},{j3},{j4}];
-      ["cl1","cl2","cl3","cl4"].forEach(function(id,i){{Plotly.react(id,fns[i].data,fns[i].layout,{{responsive:true,displayModeBar:false}})}});
+      loadFigs({fig_urls("claims", cl1="monthly", cl2="policy_stats", cl3="smoker_box", cl4="bmi_claim")});
     </script>"""
     return rp("Claims Analytics", "claims", body)
 
@@ -685,28 +1229,47 @@ def claims():
 #  ROUTE: UNDERWRITING RISK
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@app.route("/insurance/underwriting")
-def underwriting():
+@parts("underwriting", "ins","models")
+def _underwriting_parts():
+    t = AGGS["ins"].total()
+    acc, sub = held_out("underwriting", "accuracy"), "Logistic Regression · held-out"
+    if acc is None:             # artifacts published without metrics
+        acc, sub = (mdl_ins.predict(sins.transform(Xins))==ins.high_risk.values).mean(), "Logistic Regression · training set"
+    return dict(kpis=[
+        kpi_block("High-Risk Policies",str(int(t.high_risk_sum)),f"of {int(t.n)} total policies","<i class='fas fa-exclamation-circle'></i>","248,81,73"),
+        kpi_block("Model Accuracy",f"{ round(acc*100,1)}%",sub,"<i class='fas fa-brain'></i>","0,176,255"),
+        kpi_block("Smoker Risk Premium","+$10K","Additional expected claim","<i class='fas fa-smoking'></i>","210,153,34"),
+        kpi_block("Obesity (BMI>35)",f"{ round(t.obese_mean*100,1)}%","of portfolio","<i class='fas fa-weight'></i>","248,81,73")])
+
+@chart("underwriting", "factors", "models")
+def _underwriting_factors():
     # Feature importances (use coefficients from LogReg)
     feat_names = ["Age","BMI","Smoker","Children","Veh Age","E","N","S","W"][:len(INS_COLS)]
     coef = np.abs(mdl_ins.coef_[0][:len(feat_names)])
-    fig1 = go.Figure(go.Bar(x=coef, y=feat_names[:len(coef)], orientation="h",
-                            marker_color="#00b0ff"))
-    fig1.update_layout(title="Underwriting Risk Factors (|Coefficient|)")
+    fig = go.Figure(go.Bar(x=coef, y=feat_names[:len(coef)], orientation="h",
+                           marker_color="#00b0ff"))
+    fig.update_layout(title="Underwriting Risk Factors (|Coefficient|)")
+    return fig
 
+@chart("underwriting", "scores", "ins","models")
+def _underwriting_scores():
     # Risk score distribution
     probs = mdl_ins.predict_proba(sins.transform(Xins))[:,1]
-    fig2 = px.histogram(x=probs, nbins=40, color_discrete_sequence=["#00b0ff"],
-                        title="Predicted High-Risk Probability Distribution",
-                        labels={"x":"Risk Score"})
-    j1,j2 = [dark_layout(f) for f in [fig1,fig2]]
+    fig = go.Figure(hist_bars(probs, nbins=40, marker_color="#00b0ff"))
+    fig.update_layout(title="Predicted High-Risk Probability Distribution", bargap=0,
+                      xaxis_title="Risk Score", yaxis_title="count")
+    return fig
 
+@app.route("/insurance/underwriting")
+def underwriting():
+    p = page_parts("underwriting")
+    k = p["kpis"]
     body = f"""
     <div class="row g-3 mb-3">
-      <div class="col-md-3">{kpi_block("High-Risk Policies",str(ins.high_risk.sum()),f"of {NI} total policies","<i class='fas fa-exclamation-circle'></i>","248,81,73")}</div>
-      <div class="col-md-3">{kpi_block("Model Accuracy",f"{ round((mdl_ins.predict(sins.transform(Xins))==ins.high_risk.values).mean()*100,1)}%","Logistic Regression","<i class='fas fa-brain'></i>","0,176,255")}</div>
-      <div class="col-md-3">{kpi_block("Smoker Risk Premium","+$10K","Additional expected claim","<i class='fas fa-smoking'></i>","210,153,34")}</div>
-      <div class="col-md-3">{kpi_block("Obesity (BMI>35)",f"{ round((ins.bmi>35).mean()*100,1)}%","of portfolio","<i class='fas fa-weight'></i>","248,81,73")}</div>
+      <div class="col-md-3">{k[0]}</div>
+      <div class="col-md-3">{k[1]}</div>
+      <div class="col-md-3">{k[2]}</div>
+      <div class="col-md-3">{k[3]}</div>
     </div>
     <div class="row g-3">
       <div class="col-lg-4">
@@ -737,8 +1300,7 @@ def underwriting():
       </div>
     </div>
     <script>
-      var fns=[{j1},{j2}];
-      ["u1","u2"].forEach(function(id,i){{Plotly.react(id,fns[i].data,fns[i].layout,{{responsive:true,displayModeBar:false}})}});
+      loadFigs({fig_urls("underwriting", u1="factors", u2="scores")});
       function scoreUw(){{
         var payload={{age:+document.getElementById('u_age').value,bmi:+document.getElementById('u_bmi').value,
                       smoker:+document.getElementById('u_smk').value,children:+document.getElementById('u_ch').value,
@@ -771,51 +1333,77 @@ def underwriting():
 #  ROUTE: LOSS RATIO
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@app.route("/insurance/loss-ratio")
-def loss_ratio():
+@parts("loss_ratio", "ins")
+def _loss_ratio_parts():
+    rg = AGGS["ins"].frame("region")
+    rg_df = pd.DataFrame({"lr": rg.loss_ratio_mean}).reset_index()
+    t = AGGS["ins"].total()
+    med, p95 = AGGS["ins"].quantile("total", "loss_ratio", [.5, .95]).iloc[0]
+    return dict(kpis=[
+        kpi_block("Avg Loss Ratio",f"{ round(t.loss_ratio_mean,3)}",f"Median {med:.2f} · P95 {p95:.2f} (<1.0 = profitable)","<i class='fas fa-balance-scale'></i>","0,176,255"),
+        kpi_block("Combined Ratio",f"{ round(t.loss_ratio_mean+.25,3)}","LR + Expense Ratio","<i class='fas fa-calculator'></i>","210,153,34"),
+        kpi_block("Unprofitable Policies",f"{ int(t.lr_gt1_sum)}",f"LR>1.0 ({round(t.lr_gt1_mean*100,1)}% of book)","<i class='fas fa-times'></i>","248,81,73"),
+        kpi_block("Best Region",rg_df.loc[rg_df.lr.idxmin(),'region'],f"LR = {rg_df.lr.min():.2f}","<i class='fas fa-trophy'></i>","63,185,80")])
+
+@chart("loss_ratio", "regions", "ins")
+def _loss_ratio_regions():
     # Loss ratio by region
-    rg_df = ins.groupby("region").agg(lr=("loss_ratio","mean"),
-                                       claims=("claim_amt","sum"),
-                                       premiums=("premium","sum")).reset_index()
-    fig1 = go.Figure()
-    fig1.add_trace(go.Bar(x=rg_df.region, y=rg_df.claims/1e3, name="Claims ($K)", marker_color="#f85149"))
-    fig1.add_trace(go.Bar(x=rg_df.region, y=rg_df.premiums/1e3, name="Premiums ($K)", marker_color="#3fb950"))
-    fig1.update_layout(title="Claims vs Premiums by Region ($K)", barmode="group")
-
+    rg = AGGS["ins"].frame("region")
+    rg_df = pd.DataFrame({"lr": rg.loss_ratio_mean, "claims": rg.claim_amt_sum,
+                          "premiums": rg.premium_sum}).reset_index()
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=rg_df.region, y=rg_df.claims/1e3, name="Claims ($K)", marker_color="#f85149"))
+    fig.add_trace(go.Bar(x=rg_df.region, y=rg_df.premiums/1e3, name="Premiums ($K)", marker_color="#3fb950"))
+    fig.update_layout(title="Claims vs Premiums by Region ($K)", barmode="group")
+    return fig
+
+@chart("loss_ratio", "heatmap", "ins")
+def _loss_ratio_heatmap():
     # Loss ratio by policy type + region heatmap
-    lr_heat = ins.groupby(["region","policy_type"])["loss_ratio"].mean().unstack()
-    fig2 = go.Figure(go.Heatmap(z=lr_heat.values, x=lr_heat.columns, y=lr_heat.index,
-                                colorscale=[[0,"#3fb950"],[.5,"#d29922"],[1,"#f85149"]],
-                                texttemplate="%{z:.2f}", zmin=.5, zmax=1.5,
-                                colorbar=dict(title="Loss Ratio")))
-    fig2.update_layout(title="Loss Ratio Heatmap — Region × Policy Type")
-
+    lr_heat = AGGS["ins"].frame("region_policy").loss_ratio_mean.unstack()
+    fig = go.Figure(go.Heatmap(z=lr_heat.values, x=lr_heat.columns, y=lr_heat.index,
+                               colorscale=[[0,"#3fb950"],[.5,"#d29922"],[1,"#f85149"]],
+                               texttemplate="%{z:.2f}", zmin=.5, zmax=1.5,
+                               colorbar=dict(title="Loss Ratio")))
+    fig.update_layout(title="Loss Ratio Heatmap — Region × Policy Type")
+    return fig
+
+@chart("loss_ratio", "distribution", "ins")
+def _loss_ratio_distribution():
     # Loss ratio distribution
-    fig3 = px.histogram(ins, x="loss_ratio", nbins=50, color="policy_type",
-                        color_discrete_map={"Basic":"#58a6ff","Standard":"#3fb950","Premium":"#d29922"},
-                        title="Loss Ratio Distribution by Policy Type", barmode="overlay", opacity=.7)
-    fig3.add_vline(x=1.0, line_color="#f85149", annotation_text="Break-even (LR=1.0)")
-
+    fig = go.Figure(sketch_bars({p: AGGS["ins"].sketch("policy", "loss_ratio", (p,)) for p in ingest.CATS["policy_type"]},
+                                50, {"Basic":"#58a6ff","Standard":"#3fb950","Premium":"#d29922"}, opacity=.7))
+    fig.update_layout(title="Loss Ratio Distribution by Policy Type", barmode="overlay", bargap=0,
+                      legend_title_text="policy_type", xaxis_title="loss_ratio", yaxis_title="count")
+    fig.add_vline(x=1.0, line_color="#f85149", annotation_text="Break-even (LR=1.0)")
+    return fig
+
+@chart("loss_ratio", "combined", "ins")
+def _loss_ratio_combined():
     # Combined ratio simulation
     months = list(range(1,13))
-    mo_lr = ins.groupby("month")["loss_ratio"].mean()
+    mo_lr = AGGS["ins"].frame("month").loss_ratio_mean
     expense_ratio = .25
     combined_ratio = mo_lr + expense_ratio
-    fig4 = go.Figure()
-    fig4.add_trace(go.Scatter(x=months, y=mo_lr.values, name="Loss Ratio",fill="tozeroy",
-                              fillcolor="rgba(248,81,73,.1)",line=dict(color="#f85149",width=2)))
-    fig4.add_trace(go.Scatter(x=months, y=combined_ratio.values, name="Combined Ratio",
-                              line=dict(color="#d29922",width=2,dash="dash")))
-    fig4.add_hline(y=1.0, line_color="#3fb950", annotation_text="Profitable threshold")
-    fig4.update_layout(title="Loss Ratio vs Combined Ratio by Month")
-    j1,j2,j3,j4 = [dark_layout(f) for f in [fig1,fig2,fig3,fig4]]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=months, y=mo_lr.values, name="Loss Ratio",fill="tozeroy",
+                             fillcolor="rgba(248,81,73,.1)",line=dict(color="#f85149",width=2)))
+    fig.add_trace(go.Scatter(x=months, y=combined_ratio.values, name="Combined Ratio",
+                             line=dict(color="#d29922",width=2,dash="dash")))
+    fig.add_hline(y=1.0, line_color="#3fb950", annotation_text="Profitable threshold")
+    fig.update_layout(title="Loss Ratio vs Combined Ratio by Month")
+    return fig
 
+@app.route("/insurance/loss-ratio")
+def loss_ratio():
+    p = page_parts("loss_ratio")
+    k = p["kpis"]
     body = f"""
     <div class="row g-3 mb-3">
-      <div class="col-md-3">{kpi_block("Avg Loss Ratio",f"{ round(ins.loss_ratio.mean(),3)}","<1.0 = profitable","<i class='fas fa-balance-scale'></i>","0,176,255")}</div>
-      <div class="col-md-3">{kpi_block("Combined Ratio",f"{ round(ins.loss_ratio.mean()+.25,3)}","LR + Expense Ratio","<i class='fas fa-calculator'></i>","210,153,34")}</div>
-      <div class="col-md-3">{kpi_block("Unprofitable Policies",f"{ (ins.loss_ratio>1).sum()}",f"LR>1.0 ({round((ins.loss_ratio>1).mean()*100,1)}% of book)","<i class='fas fa-times'></i>","248,81,73")}</div>
-      <div class="col-md-3">{kpi_block("Best Region",rg_df.loc[rg_df.lr.idxmin(),'region'],f"LR = {rg_df.lr.min():.2f}","<i class='fas fa-trophy'></i>","63,185,80")}</div>
+      <div class="col-md-3">{k[0]}</div>
+      <div class="col-md-3">{k[1]}</div>
+      <div class="col-md-3">{k[2]}</div>
+      <div class="col-md-3">{k[3]}</div>
     </div>
     <div class="row g-3 mb-2">
       <div class="col-md-7"><div class="cc"><h6>Claims vs Premiums by Region</h6><div id="lr1" style="height:250px"></div></div></div>
@@ -826,56 +1414,591 @@ def loss_ratio():
       <div class="col-md-6"><div class="cc"><h6>Combined Ratio Trend</h6><div id="lr4" style="height:270px"></div></div></div>
     </div>
     <script>
-      var fns=[{j1},{j2},{j3},{j4}];
-      ["lr1","lr2","lr3","lr4"].forEach(function(id,i){{Plotly.react(id,fns[i].data,fns[i].layout,{{responsive:true,displayModeBar:false}})}});
+      loadFigs({fig_urls("loss_ratio", lr1="regions", lr2="heatmap", lr3="distribution", lr4="combined")});
     </script>"""
     return rp("Loss Ratio Analysis", "loss", body)
 
+# ═══════════════════════════════════════════════════════════════════════════════
+#  ROUTE: MODEL DRIFT  (risksight.drift; windowed scoring traffic vs. training frames)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+DRIFT_COLORS = {"credit": "#00b0ff", "fraud": "#f85149", "underwriting": "#3fb950"}
+
+def drift_version():
+    """Point DATA_VERSION["drift"] at the monitors' current state (traffic seen, window position)."""
+    v = "-".join(monitor(t).version() for t in DRIFT_TASKS)
+    if v != DATA_VERSION.get("drift"):
+        DATA_VERSION["drift"] = v
+        FIGS.invalidate("drift")
+    return v
+
+@parts("drift", "cr","fd","ins","drift")
+def _drift_parts():
+    rep = {t: monitor(t).report() for t in DRIFT_TASKS}
+    badge = {"drift": "bh", "warning": "bm", "stable": "bl"}
+    cols = [(t, f, c) for t, r in rep.items() for f, c in drift.columns(r)]
+    num = lambda v, fmt: "—" if v is None else format(v, fmt)
+    rows = "".join(
+        f"<tr><td>{t}</td><td>{f}</td><td>{num(c['psi'], '.3f')}</td><td>{num(c['ks'], '.3f')} / {num(c['ks_critical'], '.3f')}</td>"
+        f"<td>{num(c['out_of_range'], '.1%')}</td>"
+        f"<td><span class=\"{badge.get(c['status'], '')}\">{c['status'].upper()}</span></td></tr>"
+        for t, f, c in cols)
+    n, bad = sum(r["records"] for r in rep.values()), sum(r["rejected"] for r in rep.values())
+    live = [(t, f, c) for t, f, c in cols if c["status"] != "insufficient"]
+    worst = max(live, key=lambda x: x[2]["psi"], default=None)
+    oor = max(live, key=lambda x: x[2]["out_of_range"], default=None)
+    moving = sum(c["status"] in ("warning", "drift") for _, _, c in live)
+    mins = DRIFT_WINDOW // 60
+    return dict(rows=rows, kpis=[
+        kpi_block("Records Scored",f"{n:,}",f"Last {mins} min · {bad:,} rejected","<i class='fas fa-stream'></i>","0,176,255"),
+        kpi_block("Max PSI",f"{worst[2]['psi']:.3f}" if worst else "—",
+                  f"{worst[0]} · {worst[1]}" if worst else f"Needs {drift.MIN_RECORDS} records per model","<i class='fas fa-wave-square'></i>","248,81,73"),
+        kpi_block("Drifting Features",f"{moving}" if live else "—",f"PSI ≥ {drift.PSI_WARN} of {len(cols)} monitored","<i class='fas fa-exclamation-triangle'></i>","210,153,34"),
+        kpi_block("Out of Range",f"{oor[2]['out_of_range']:.1%}" if oor else "—",
+                  f"{oor[0]} · {oor[1]} outside training range" if oor else "Values outside training range","<i class='fas fa-ruler-horizontal'></i>","63,185,80")])
+
+@chart("drift", "psi", "cr","fd","ins","drift")
+def _drift_psi():
+    fig = go.Figure()
+    for t in DRIFT_TASKS:
+        psi = {f: c["psi"] for f, c in drift.columns(monitor(t).report())}
+        fig.add_trace(go.Bar(y=[f"{t} · {f}" for f in psi], x=list(psi.values()), orientation="h",
+                             name=t, marker_color=DRIFT_COLORS[t]))
+    for x, c in ((drift.PSI_WARN, "#d29922"), (drift.PSI_ALERT, "#f85149")):
+        fig.add_vline(x=x, line_dash="dash", line_color=c)
+    fig.update_layout(title="Population Stability Index by Feature (rolling window)", xaxis_title="PSI",
+                      yaxis=dict(autorange="reversed"))
+    return fig
+
+def _drift_scores(task):
+    r = monitor(task).report()["score"]
+    e = r["edges"]
+    labels = [f"<{e[0]:.2f}"] + [f"{a:.2f}–{b:.2f}" for a, b in zip(e[:-1], e[1:])] + [f">{e[-1]:.2f}"]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=labels, y=r["reference"], name="Training", marker_color="#30363d"))
+    fig.add_trace(go.Bar(x=labels, y=r["window"], name="Window", marker_color=DRIFT_COLORS[task]))
+    fig.update_layout(title=f"{task.title()} Score Distribution" + (f" · PSI {r['psi']:.3f}" if r["psi"] is not None else ""),
+                      barmode="group",
+                      yaxis=dict(title="Share", tickformat=".0%"))
+    return fig
+
+for _t, (_ds, _) in DRIFT_TASKS.items():
+    chart("drift", f"scores_{_t}", _ds, "drift")(lambda t=_t: _drift_scores(t))
+
+@app.route("/monitoring/drift")
+def drift_monitor():
+    drift_version()
+    p = page_parts("drift")
+    k = p["kpis"]
+    rows = p["rows"]
+    body = f"""
+    <div class="row g-3 mb-3">
+      <div class="col-md-3">{k[0]}</div>
+      <div class="col-md-3">{k[1]}</div>
+      <div class="col-md-3">{k[2]}</div>
+      <div class="col-md-3">{k[3]}</div>
+    </div>
+    <div class="row g-3 mb-2">
+      <div class="col-md-4"><div class="cc"><h6>Credit PD</h6><div id="d1" style="height:240px"></div></div></div>
+      <div class="col-md-4"><div class="cc"><h6>Fraud Probability</h6><div id="d2" style="height:240px"></div></div></div>
+      <div class="col-md-4"><div class="cc"><h6>Underwriting Risk Score</h6><div id="d3" style="height:240px"></div></div></div>
+    </div>
+    <div class="row g-3">
+      <div class="col-md-6"><div class="cc"><h6>Feature Stability</h6><div id="d4" style="height:520px"></div></div></div>
+      <div class="col-md-6"><div class="cc">
+        <h6><i class="fas fa-wave-square me-2" style="color:var(--wa)"></i>Drift &amp; Data Quality</h6>
+        <div class="table-responsive" style="max-height:520px">
+        <table class="table rt">
+          <thead><tr><th>Model</th><th>Feature</th><th>PSI</th><th>KS / 95% crit.</th><th>Out of Range</th><th>Status</th></tr></thead>
+          <tbody>{rows}</tbody>
+        </table></div>
+      </div></div>
+    </div>
+    <script>
+      loadFigs({fig_urls("drift", d1="scores_credit", d2="scores_fraud", d3="scores_underwriting", d4="psi")});
+    </script>"""
+    return rp("Model Drift Monitor", "drift", body)
+
 # ═══════════════════════════════════════════════════════════════════════════════
 #  API ENDPOINTS  (called by JS forms)
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def _credit_out(X):
+    pd_ = _predict("credit", CR_ENGINE, X)
+    lgd = X[:, 2]                           # proxy: debt ratio ≈ LGD
+    ead = X[:, 5]
+    return dict(pd=pd_.round(4), lgd=lgd.round(3), ead=ead, expected_loss=(pd_*lgd*ead).round(2))
+
+def _fraud_out(X):
+    prob = _predict("fraud", ONLINE["fraud"].engine() if "fraud" in ONLINE else FR_ENGINE, X)
+    return dict(fraud_prob=prob.round(4), fraud_flag=prob > FRAUD_THRESHOLD)
+
+def _uw_out(X):
+    prob = _predict("underwriting", ONLINE["underwriting"].engine() if "underwriting" in ONLINE else (sins, mdl_ins), X)
+    c = {f: X[:, INS_COLS.index(f)] for f in ("age","bmi","smoker","children")}
+    base_premium = 5000 + c["age"]*100 + c["bmi"]*50 + c["smoker"]*10000 + c["children"]*500
+    loading = np.round(prob * 80)                  # up to +80% loading
+    return dict(risk_score=prob.round(4), est_premium=(base_premium*(1+loading/100)).round(2),
+                loading=loading.astype(int))
+
+# Single-record results, keyed by the model version and the record's feature vector
+# (float64, -0.0 → 0.0), so field order, "688" vs 688 and int vs float hit the same entry
+SCORE_CACHE = LRUCache(int(os.environ.get("RISKSIGHT_SCORE_CACHE_MB", "4")) << 20,
+                       max_items=int(os.environ.get("RISKSIGHT_SCORE_CACHE_ITEMS", "50000")),
+                       ttl=float(os.environ.get("RISKSIGHT_SCORE_TTL", "600")), name="scores")
+
+def _model_version(task):
+    return ONLINE[task].version if task in ONLINE else DATA_VERSION["models"]
+
+def _scored(task, out, X):
+    """out(X) for a one-row X as {name: scalar}, through SCORE_CACHE (and into the drift monitor)."""
+    key = (task, _model_version(task), (np.asarray(X[0], dtype=np.float64) + 0.0).tobytes())
+    o = SCORE_CACHE.get_or_set(key, lambda: {k: v[0].item() for k, v in out(X).items()}, tags=(task,))
+    monitor(task).observe(X, [o[DRIFT_TASKS[task][1]]])
+    return o
+
+def _one(task, matrix, *cols):
+    """Vectorise a single JSON object; returns (X, error). A rejected record is counted in the drift window."""
+    d = request.get_json(silent=True)
+    X, _, err = matrix([d], *cols)
+    if err[0]:
+        monitor(task).observe(X, [], rejected=1)
+    return X, err[0]
+
+def _batch(task, matrix, out, *cols):
+    """Score a JSON-array / NDJSON batch; bad records are reported, not fatal."""
+    try:
+        recs = parse_batch(request.get_data(), request.content_type or "")
+    except BatchError as e:
+        return jsonify(error=str(e)), 400
+    X, ok, err = matrix(recs, *cols)
+    res = out(X)
+    monitor(task).observe(X, res[DRIFT_TASKS[task][1]], rejected=len(recs)-len(ok))
+    return jsonify(n=len(recs), n_ok=len(ok), n_err=len(recs)-len(ok),
+                   results=aligned(err, ok, res))
+
 @app.route("/api/credit", methods=["POST"])
 def api_credit():
-    d   = request.json
-    X   = [[d["age"], d["income"], d["debt_ratio"], d["credit_score"], d["emp_years"], d["loan_amt"]]]
-    pd_ = float(mdl_cr.predict_proba(scr.transform(X))[0,1])
-    lgd = d["debt_ratio"]                   # proxy: debt ratio ≈ LGD
-    ead = d["loan_amt"]
-    el  = pd_ * lgd * ead
-    return jsonify(pd=round(pd_,4), lgd=round(lgd,3), ead=ead,
-                   expected_loss=f"${el:,.0f}")
+    X, err = _one("credit", credit_matrix)
+    if err: return jsonify(error=err), 400
+    o = _scored("credit", _credit_out, X)
+    return jsonify(pd=o["pd"], lgd=o["lgd"], ead=o["ead"],
+                   expected_loss=f"${o['expected_loss']:,.0f}")
 
 @app.route("/api/fraud", methods=["POST"])
 def api_fraud():
-    d = request.json
-    row = pd.DataFrame([{
-        "amount": d["amount"], "hour": d["hour"], "foreign": d["foreign"],
-        "velocity": d.get("velocity",1), "mr_High":0,"mr_Low":0,"mr_Medium":0,
-    }])
-    row[f"mr_{d.get('merch_risk','Low')}"] = 1
-    row = row.reindex(columns=FR_COLS, fill_value=0)
-    prob = float(mdl_fr.predict_proba(sfr.transform(row))[0,1])
-    return jsonify(fraud_prob=round(prob,4), fraud_flag=prob>0.25)
+    X, err = _one("fraud", fraud_matrix, FR_COLS)
+    if err: return jsonify(error=err), 400
+    o = _scored("fraud", _fraud_out, X)
+    return jsonify(fraud_prob=o["fraud_prob"], fraud_flag=o["fraud_flag"])
 
 @app.route("/api/underwriting", methods=["POST"])
 def api_underwriting():
-    d = request.json
-    row = pd.DataFrame([{"age":d["age"],"bmi":d["bmi"],"smoker":d["smoker"],
-                         "children":d["children"],"veh_age":d["veh_age"],
-                         "r_East":0,"r_North":0,"r_South":0,"r_West":0}])
-    row[f"r_{d['region']}"] = 1
-    row = row.reindex(columns=INS_COLS, fill_value=0)
-    prob = float(mdl_ins.predict_proba(sins.transform(row))[0,1])
-    base_premium = 5000 + d["age"]*100 + d["bmi"]*50 + d["smoker"]*10000 + d["children"]*500
-    loading = round(prob * 80)                     # up to +80% loading
-    return jsonify(risk_score=round(prob,4),
-                   est_premium=f"${base_premium*(1+loading/100):,.0f}",
-                   loading=loading)
-
-# ═══════════════════════════════════════════════════════════════════════════════
-#  ENTRYPOINT
+    X, err = _one("underwriting", underwriting_matrix, INS_COLS)
+    if err: return jsonify(error=err), 400
+    o = _scored("underwriting", _uw_out, X)
+    return jsonify(risk_score=o["risk_score"],
+                   est_premium=f"${o['est_premium']:,.0f}",
+                   loading=o["loading"])
+
+# Batch variants — body is a JSON array, {"records": [...]} or NDJSON; results are
+# aligned to the input by "index" and invalid records carry an "error" instead.
+
+@app.route("/api/credit/batch", methods=["POST"])
+def api_credit_batch():
+    return _batch("credit", credit_matrix, _credit_out)
+
+@app.route("/api/fraud/batch", methods=["POST"])
+def api_fraud_batch():
+    return _batch("fraud", fraud_matrix, _fraud_out, FR_COLS)
+
+@app.route("/api/underwriting/batch", methods=["POST"])
+def api_underwriting_batch():
+    return _batch("underwriting", underwriting_matrix, _uw_out, INS_COLS)
+
+# Per-prediction attributions (risksight.explain) for the model each scoring API serves.
+# Rows are cached per model version; a request may cost at most EXPLAIN_BUDGET node visits.
+EXPLAIN_CACHE  = LRUCache(int(os.environ.get("RISKSIGHT_EXPLAIN_CACHE_MB", "8")) << 20, name="explanations")
+EXPLAIN_BUDGET = int(os.environ.get("RISKSIGHT_EXPLAIN_BUDGET", "50000000"))
+EXPLAIN_TASKS  = {"credit": (credit_matrix, ()), "fraud": (fraud_matrix, (FR_COLS,)),
+                  "underwriting": (underwriting_matrix, (INS_COLS,))}
+_EXPLAINERS, _EXPLAINERS_LOCK = {}, threading.Lock()
+
+def _explainer(task):
+    """(model version, feature names, Explainer) matching what the task's scoring API uses."""
+    cols = {"credit": M["CR_COLS"], "fraud": FR_COLS, "underwriting": INS_COLS}[task]
+    if task in ONLINE:
+        s, m, v = ONLINE[task].snapshot()
+        key = (task, v)
+    else:
+        s, m = {"credit": CR_ENGINE, "fraud": FR_ENGINE, "underwriting": (sins, mdl_ins)}[task]
+        key = (task, DATA_VERSION["models"])
+    with _EXPLAINERS_LOCK:
+        if key not in _EXPLAINERS:
+            if len(_EXPLAINERS) >= 8:           # online learners move through versions
+                _EXPLAINERS.clear()
+            _EXPLAINERS[key] = explain.Explainer(s, m)
+        return key[1], cols, _EXPLAINERS[key]
+
+def _explain_rows(task, X):
+    """Explanation dict per row of X: cached rows are reused, the rest computed in one pass."""
+    version, cols, ex = _explainer(task)
+    keys = [(task, version, row.tobytes()) for row in np.ascontiguousarray(X, dtype=np.float64)]
+    res  = [EXPLAIN_CACHE.get(k) for k in keys]
+    todo = [i for i, r in enumerate(res) if r is None]
+    if len(todo) * ex.cost > EXPLAIN_BUDGET:
+        raise OverflowError(f"{len(todo)} rows exceed the explanation budget "
+                            f"({EXPLAIN_BUDGET // ex.cost} rows for this model)")
+    if todo:
+        with STAGE.time("explain", task, ""):
+            score, bias, c = ex.explain(X[todo])
+        for j, i in enumerate(todo):
+            res[i] = EXPLAIN_CACHE.put(keys[i], {
+                "score": round(float(score[j]), 6), "space": ex.space, "bias": round(float(bias[j]), 6),
+                "contributions": dict(zip(cols, np.round(c[j], 6).tolist()))}, tags=(task,))
+    return res
+
+@app.route("/api/<task>/explain", methods=["POST"])
+@app.route("/api/<task>/explain/batch", methods=["POST"])
+def api_explain(task):
+    """Feature attributions for one record (or a batch at /explain/batch): score = f(bias + Σ contributions),
+    f the identity for random forests (space "probability") and the sigmoid otherwise ("log_odds")."""
+    if task not in EXPLAIN_TASKS:
+        return jsonify(error=f"unknown model {task!r}"), 404
+    matrix, cols = EXPLAIN_TASKS[task]
+    batch = request.path.endswith("/batch")
+    try:
+        recs = parse_batch(request.get_data(), request.content_type or "") if batch \
+               else [request.get_json(silent=True)]
+    except BatchError as e:
+        return jsonify(error=str(e)), 400
+    X, ok, err = matrix(recs, *cols)
+    if not batch and err[0]:
+        return jsonify(error=err[0]), 400
+    try:
+        rows = _explain_rows(task, X)
+    except OverflowError as e:
+        return jsonify(error=str(e)), 413
+    if not batch:
+        return jsonify(rows[0])
+    res = [{"index": i, "error": e} if e is not None else None for i, e in enumerate(err)]
+    for j, i in enumerate(ok.tolist()):
+        res[i] = {"index": i, **rows[j]}
+    return jsonify(n=len(recs), n_ok=len(ok), n_err=len(recs)-len(ok), results=res)
+
+@app.route("/api/<task>/feedback", methods=["POST"])
+def api_feedback(task):
+    """Labeled records (features + "fraud" / "high_risk" as 0/1) → one incremental update.
+
+    Invalid records are reported and skipped; the new version serves the next request, on every
+    worker (the update goes through the journal).
+    """
+    if task not in ONLINE:
+        return jsonify(error=f"online updates are not enabled for {task!r} (RISKSIGHT_ONLINE)"), 404
+    if (refused := _unshared()):
+        return refused
+    try:
+        recs = parse_batch(request.get_data(), request.content_type or "")
+    except BatchError as e:
+        return jsonify(error=str(e)), 400
+    matrix, cols = {"fraud": (fraud_matrix, FR_COLS), "underwriting": (underwriting_matrix, INS_COLS)}[task]
+    X, ok, err = matrix(recs, cols)
+    label = online.LABELS[task]
+    y = np.array([recs[i].get(label) for i in ok], dtype=object)
+    good = np.array([v in (0, 1) for v in y], dtype=bool)
+    for i in ok[~good]:
+        err[i] = f"missing or invalid: {label} (0 or 1)"
+    if not good.any():
+        return jsonify(error="no valid labeled records", errors=[e for e in err if e][:20]), 400
+    rec = _commit(_entry("feedback", task=task, X=X[good], y=y[good].astype(int)))
+    return jsonify(n=len(recs), n_ok=int(good.sum()), n_err=len(recs) - int(good.sum()),
+                   errors=[{"index": i, "error": e} for i, e in enumerate(err) if e][:100], **rec)
+
+@app.route("/api/models/online")
+def api_online():
+    return jsonify({t: l.stats() for t, l in ONLINE.items()})
+
+def market_args():
+    """(JSON body, arg, levels) for the market endpoints: arg(name, default) reads a parameter from
+    the query string, else the body, else the default; levels is arg("levels") as floats, given as
+    "0.95,0.99" or a list."""
+    d = request.get_json(silent=True) or {}
+    arg = lambda k, dflt: request.args.get(k, d.get(k, dflt))
+    levels = arg("levels", [.95, .99])
+    return d, arg, [float(x) for x in (levels.split(",") if isinstance(levels, str) else levels)]
+
+@app.route("/api/market/rolling-var", methods=["GET", "POST"])
+def api_rolling_var():
+    """Rolling VaR / CVaR / vol. Params: window, levels (e.g. "0.95,0.99"), notional (query string or
+    body, the query string winning); POST {"returns": [...] or [[...], ...]} to use your own series
+    instead of the demo book."""
+    try:
+        d, arg, levels = market_args()
+        rets   = np.asarray(d["returns"], dtype=float) if "returns" in d else mkt.ret.values
+        res    = rolling_risk(rets, int(arg("window", 21)), levels, float(arg("notional", 10_000_000)))
+    except (TypeError, ValueError) as e:
+        return jsonify(error=str(e)), 400
+    out = {k: np.where(np.isnan(v), None, v.round(2)).tolist() for k, v in res.items()}
+    if "returns" not in d:
+        out["date"] = mkt.date.dt.strftime("%Y-%m-%d").tolist()
+    return jsonify(window=int(arg("window", 21)), levels=levels, **out)
+
+@app.route("/api/market/monte-carlo", methods=["GET", "POST"])
+def api_monte_carlo():
+    """Parametric + Monte Carlo VaR/CVaR per portfolio. POST {"positions": [[...]], "cov": [[...]],
+    "mu": [...]} for your own book (daily cov/mean), else the demo desks; plus horizon, levels,
+    scenarios, seed (query string or body, the query string winning)."""
+    try:
+        d, arg, levels = market_args()
+        if "positions" in d:
+            names = d.get("names") or [f"P{i+1}" for i in range(len(np.atleast_2d(d["positions"])))]
+            P, cov, mu = d["positions"], d["cov"], d.get("mu")
+        else:
+            names, P = BOOK_POS.index.tolist(), BOOK_POS.values
+            cov, mu  = np.cov(BOOK_RETS.values.T), BOOK_RETS.values.mean(0)
+        n, h   = int(arg("scenarios", 100_000)), int(arg("horizon", 10))
+        if not 0 < n <= MC_MAX_SCENARIOS:
+            raise ValueError(f"scenarios must be in 1..{MC_MAX_SCENARIOS:,}")
+        mc  = monte_carlo_var(P, cov, mu, levels, h, n, seed=int(arg("seed", 42)), workers=MC_WORKERS)
+        par = parametric_var(P, cov, mu, levels, h)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify(error=str(e)), 400
+    timing = mc.pop("timing")
+    return jsonify(portfolios=names, horizon=h, levels=levels, timing=timing,
+                   monte_carlo={k: v.round(2).tolist() for k, v in mc.items()},
+                   parametric={k: v.round(2).tolist() for k, v in par.items()})
+
+@app.route("/api/market/var")
+def api_market_var():
+    """1-day historical VaR / CVaR of the demo book at each of `levels` (default "0.95,0.99") on
+    `notional`, read from the return sketch (within alpha relative error of np.percentile)."""
+    try:
+        levels = [float(x) for x in request.args.get("levels", "0.95,0.99").split(",")]
+        if any(not 0 < l < 1 for l in levels):
+            raise ValueError("levels must be in (0, 1)")
+        notional = float(request.args.get("notional", 10_000_000))
+        sk = ret_sketch()
+        var = -sk.quantile([1 - l for l in levels]) * notional
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(levels=levels, notional=notional, days=len(sk), alpha=sk.alpha, var=var.round(2).tolist(),
+                   cvar=[round(-sk.tail_mean(1 - l) * notional, 2) for l in levels])
+
+@app.route("/api/quantiles/<dataset>")
+def api_quantiles(dataset):
+    """Percentiles over every row from the aggregate store's quantile sketches. Query args: column,
+    q (comma-separated, 0–1, default "0.5,0.95,0.99"), by (a sketched view, default total)."""
+    k = {ds: k for k, ds in DATASETS.items()}.get(dataset)
+    if k is None or not AGGS[k].quantiles:
+        return jsonify(error=f"no quantile sketches for {dataset!r}"), 404
+    view, col = request.args.get("by", "total"), request.args.get("column")
+    if col not in AGGS[k].quantiles.get(view, []):
+        return jsonify(error=f"sketched columns: {AGGS[k].quantiles}", by=view, column=col), 400
+    try:
+        qs = [float(x) for x in request.args.get("q", "0.5,0.95,0.99").split(",")]
+        est = AGGS[k].quantile(view, col, qs)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    keys = [list(i) if isinstance(i, tuple) else [i] for i in est.index] if AGGS[k].specs[view][0] else [[]] * len(est)
+    return jsonify(dataset=dataset, column=col, by=view, keys=list(AGGS[k].specs[view][0]), q=qs,
+                   alpha=AGGS[k].alpha, groups=[{"key": key, "values": v.round(6).tolist()}
+                                                for key, v in zip(keys, est.to_numpy())])
+
+STRESS_WORKERS       = int(os.environ.get("RISKSIGHT_STRESS_WORKERS", "4"))   # >1 → process pool per run
+STRESS_MAX_SCENARIOS = int(os.environ.get("RISKSIGHT_STRESS_MAX_SCENARIOS", "50"))
+
+@app.route("/api/credit/stress", methods=["GET", "POST"])
+def api_stress():
+    """Whole-book credit stress test (risksight.stress): portfolio PD, EL, UL and grade migration per
+    scenario vs. the base book. POST {"scenarios": {name: {column: {"add": a, "mul": m}}}} (or a list
+    of {"name", "shocks"}); GET runs the built-in scenarios. Results are cached per data/model version."""
+    scen = (request.get_json(silent=True) or {}).get("scenarios", stress.SCENARIOS)
+    if isinstance(scen, (list, dict)) and len(scen) > STRESS_MAX_SCENARIOS:
+        return jsonify(error=f"at most {STRESS_MAX_SCENARIOS} scenarios per run"), 400
+    key = ("stress", DATA_VERSION["cr"], DATA_VERSION["models"], json.dumps(scen, sort_keys=True))
+    try:
+        res = FIGS.get_or_set(key, lambda: stress.run(CR_ENGINE, Xcr.values, scen, STRESS_WORKERS), tags=("cr",))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(res)
+
+@app.route("/api/data/refresh", methods=["POST"])
+def api_data_refresh():
+    """Regenerate the synthetic datasets (optional {"seed": n}) and invalidate cached figures."""
+    seed = (request.get_json(silent=True) or {}).get("seed", 42)
+    if not isinstance(seed, int):
+        return jsonify(error="seed must be an integer"), 400
+    reload_data(**dict(zip(("cr","fd","ins","mkt"), synthetic(seed))))
+    return jsonify(versions=DATA_VERSION, snapshot=SNAPSHOT["version"], figures=FIGS.stats())
+
+@app.route("/api/data/<dataset>/append", methods=["POST"])
+def api_data_append(dataset):
+    """Fold new records into the dataset's aggregate store and refresh its KPIs. All-or-nothing:
+    every record is validated before anything changes; credit records also join the loan book
+    (replacing the loan when they carry an existing loan_id), fraud records the transaction index.
+
+    Row-level charts keep using the in-memory frame; only the aggregates grow.
+    """
+    k = {ds: k for k, ds in DATASETS.items()}.get(dataset)
+    if k is None:
+        return jsonify(error=f"unknown dataset {dataset!r}"), 404
+    if (refused := _unshared()):
+        return refused
+    try:
+        recs = parse_batch(request.get_data(), request.content_type or "")
+        if not recs or not all(isinstance(r, dict) for r in recs):
+            raise BatchError("every record must be a JSON object")
+        chunks = list(ingest.iter_chunks(pd.DataFrame.from_records(recs), dataset))
+        extra = {"loans": _loans(recs)} if k == "cr" else \
+                {"txns": [transactions._columns(c) for c in chunks]} if k == "fd" else {}
+    except (BatchError, KeyError, TypeError, ValueError) as e:
+        return jsonify(error=str(e)), 400
+    if _commit(_entry("append", k, chunks=chunks, **extra)) is None:
+        return jsonify(error=f"{dataset} was reloaded while appending; nothing was added"), 409
+    return jsonify(appended=len(recs), rows=int(AGGS[k].total().n), versions=DATA_VERSION)
+
+def _loans(recs):
+    """(frame of the credit model columns + purpose / region, loan_ids or None) for credit records;
+    ValueError unless every record can be scored into the book."""
+    X, _, err = credit_matrix(recs)
+    bad = next((f"record {i}: {e}" for i, e in enumerate(err) if e), None)
+    if bad:
+        raise ValueError(bad)
+    df = pd.DataFrame(X, columns=portfolio.COLS)
+    for c in ("purpose", "region"):
+        df[c] = [r.get(c) for r in recs]
+        portfolio._codes(df[c], c)
+    ids = [r.get("loan_id") for r in recs]
+    if all(i is None for i in ids):
+        return df, None
+    if not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        raise ValueError("loan_id must be an integer on every record (or on none)")
+    if len(set(ids)) < len(ids):
+        raise ValueError("duplicate loan_id in one batch")
+    return df, ids
+
+@app.route("/api/fraud/transactions")
+def api_transactions():
+    """Filtered, keyset-paginated transactions. Query args: channel, merch_risk, foreign, fraud
+    (comma-separated values), date_from / date_to, amount_min / amount_max, sort (date | amount),
+    order (asc | desc), limit (≤ 1000), cursor (the previous page's `next`), count=1 for the total."""
+    t0 = time.perf_counter()
+    try:
+        res = txns().query(**transactions.parse_args(request.args))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(**res, ms=round((time.perf_counter() - t0) * 1e3, 3))
+
+@app.route("/api/monitoring/drift")
+def api_drift():
+    """Per scoring API: PSI / KS / out-of-range share of every input feature and of the score over
+    the rolling window vs. the training frame, plus records scored and rejected in the window."""
+    return jsonify(models={t: monitor(t).report() for t in DRIFT_TASKS}, version=drift_version())
+
+@app.route("/api/portfolio")
+def api_portfolio():
+    """Whole-book EL / UL / HHI through the credit model, with purpose and region breakdowns."""
+    return jsonify(**book().summary(), version=DATA_VERSION["book"])
+
+@app.route("/api/portfolio/loans", methods=["POST"])
+def api_portfolio_loans():
+    """Add or change loans (all-or-nothing): records carrying an existing loan_id replace that
+    loan, others are added (under the given loan_id, or new ids when none is given).
+    Only these rows are scored; the book's sums move by the difference."""
+    try:
+        recs = parse_batch(request.get_data(), request.content_type or "")
+        if not recs or not all(isinstance(r, dict) for r in recs):
+            raise BatchError("every record must be a JSON object")
+        loans = _loans(recs)
+    except (BatchError, TypeError, ValueError) as e:
+        return jsonify(error=str(e)), 400
+    if (refused := _unshared()):
+        return refused
+    done = _commit(_entry("loans", "cr", loans=loans))
+    if done is None:
+        return jsonify(error="credit was reloaded while updating the book; nothing was changed"), 409
+    b = book()
+    ids, added, changed = done["loans"]
+    res = b.loans(ids)
+    return jsonify(added=added, changed=changed, version=DATA_VERSION["book"],
+                   loans=[{"loan_id": int(i), "pd": round(float(p_), 4), "el": round(float(e), 2), "ul": round(float(u), 2)}
+                          for i, p_, e, u in zip(ids, res["pd"], res["el"], res["ul"])],
+                   portfolio=b.summary())
+
+def send_payload(p, max_age=0):
+    """Serve a transport.Payload: best accepted encoding, ETag per encoding, 304 on If-None-Match."""
+    coding, body = p.negotiate(request.headers.get("Accept-Encoding"))
+    r = app.response_class(body, mimetype=p.mimetype)
+    r.set_etag(p.etag if coding is None else f"{p.etag}-{coding}")
+    r.vary.add("Accept-Encoding")
+    if coding:
+        r.content_encoding = coding
+    r.cache_control.public = True
+    if max_age:
+        r.cache_control.max_age = max_age
+        r.cache_control.immutable = True
+    else:
+        r.cache_control.no_cache = True
+    return r.make_conditional(request)
+
+@app.route("/fig/template")
+def figure_template():
+    return send_payload(FIG_TEMPLATE, FIG_MAX_AGE if request.args.get("v") == PLOTLY_VERSION else 0)
+
+@app.route("/fig/<route>/<name>")
+def figure(route, name):
+    """One chart as typed-array JSON, built on demand. URLs carrying the chart's current data
+    version (?v=, as the pages emit) are cacheable for RISKSIGHT_FIG_MAX_AGE; others revalidate by ETag."""
+    if (route, name) not in CHARTS:
+        return jsonify(error=f"unknown chart {route}/{name}"), 404
+    fresh = request.args.get("v") == chart_version(route, name)
+    return send_payload(chart_payload(route, name), FIG_MAX_AGE if fresh else 0)
+
+@app.route("/api/charts")
+def api_charts():
+    """Every page's charts with their current versioned URLs."""
+    pages = {}
+    for route, name in CHARTS:
+        pages.setdefault(route, {})[name] = fig_url(route, name)
+    return jsonify(pages=pages)
+
+@app.route("/api/cache")
+def api_cache():
+    return jsonify(figures=FIGS.stats(), explanations=EXPLAIN_CACHE.stats(), scores=SCORE_CACHE.stats())
+
+def _cache_series(field):
+    return lambda: [({"cache": c.name}, c.stats()[field]) for c in (FIGS, EXPLAIN_CACHE, SCORE_CACHE)]
+
+for _f, _kind, _help in (("hits", "counter", "Cache hits."), ("misses", "counter", "Cache misses."),
+                         ("evictions", "counter", "Entries evicted for space."),
+                         ("invalidations", "counter", "Entries dropped by invalidation."),
+                         ("bytes", "gauge", "Approximate cached payload bytes."), ("items", "gauge", "Cached entries.")):
+    METRICS.collect(f"risksight_cache_{_f}" + ("_total" if _kind == "counter" else ""), _help,
+                    _cache_series(_f), _kind)
+def _drift_series():
+    return [({"model": t, "feature": f}, c["psi"]) for t, m in list(_DRIFT.items())
+            for f, c in drift.columns(m.report()) if c["psi"] is not None]
+
+METRICS.collect("risksight_drift_psi", "PSI of each scoring API input (and its score) over the drift window; "
+                "models appear once they have scored.", _drift_series)
+metrics.add_process_metrics(METRICS)
+
+@app.route("/metrics")
+def prometheus_metrics():
+    return app.response_class(METRICS.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route("/api/data/sources")
+def api_data_sources():
+    """Where each dataset came from: file (rows streamed, sample size, load time) or synthetic."""
+    return jsonify(sources={ds: SOURCES.get(ds, {"path": None, "rows": len(globals()[k])})
+                            for k, ds in DATASETS.items()}, versions=DATA_VERSION)
+
 # ═══════════════════════════════════════════════════════════════════════════════
+#  ENTRYPOINT  (dev server; production runs `gunicorn -c gunicorn.conf.py`,
+#               which serves `app` threaded or `asgi_app` under uvicorn workers)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+asgi_app = WSGIBridge(app)
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=7860, debug=False)
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+Inference benchmark: sklearn predict_proba (scaler.transform + estimator) vs
+the compiled flat-array tree kernels in risksight.compiled, for the credit
+RandomForest and the fraud GradientBoosting model — single-row latency,
+throughput by batch size (kernel only, and routed: kernel up to CUTOVER rows,
+sklearn above) and max |difference| from sklearn.
+
+    python benchmarks/bench_inference.py [--rows 100000] [--calls 300]
+"""
+
+import os, sys, time, argparse, warnings
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from risksight import registry, compiled
+from risksight.data import synthetic, features
+from risksight.scoring import predict
+
+def latency(fn, x, calls):
+    ts = []
+    for _ in range(calls):
+        t = time.perf_counter(); fn(x); ts.append(time.perf_counter() - t)
+    return np.percentile(np.array(ts) * 1e6, [50, 99])
+
+def clock(fn, reps):
+    t = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - t) / reps
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--calls", type=int, default=300)
+    a = ap.parse_args()
+    warnings.filterwarnings("ignore")
+    cr, fd, ins, _ = synthetic()
+    M = registry.load_or_train(cr, fd, ins)
+    Xcr, Xfd, _ = features(cr, fd, ins)
+    rng = np.random.default_rng(0)
+
+    for name, scaler, model, X in (("credit RF", M["scr"], M["mdl_cr"], Xcr.values.astype(float)),
+                                   ("fraud GBM", M["sfr"], M["mdl_fr"], Xfd.values.astype(float))):
+        t = time.perf_counter(); c = compiled.compile_model(scaler, model); t_c = time.perf_counter() - t
+        big = X[rng.integers(len(X), size=a.rows)] * rng.uniform(.9, 1.1, (a.rows, X.shape[1]))
+        err = compiled.verify(c, scaler, model, big, tol=np.inf)
+        print(f"{name}: {c.n_nodes:,} nodes, depth {c.depth}, compiled in {t_c*1e3:.1f} ms, "
+              f"max |diff| {err:.1e} over {a.rows:,} rows")
+        row = X[:1]
+        s50, s99 = latency(lambda x: predict(scaler, model, x), row, a.calls)
+        c50, c99 = latency(lambda x: predict(None, c, x), row, a.calls)
+        print(f"  single row   sklearn p50 {s50:8.0f} µs  p99 {s99:8.0f} µs | compiled p50 {c50:6.0f} µs"
+              f"  p99 {c99:6.0f} µs   ({s50/c50:.0f}x)")
+        print(f"  {'batch':>12} {'sklearn rows/s':>15} {'kernel rows/s':>15} {'routed rows/s':>15}")
+        for n in (10, 100, compiled.CUTOVER, 1_000, 10_000, a.rows):
+            x, reps = big[:n], max(1, 2_000 // n)
+            ts = clock(lambda: predict(scaler, model, x), reps)
+            tk = clock(lambda: c.kernel(x), reps)
+            tr = clock(lambda: predict(None, c, x), reps)
+            print(f"  {n:>12,} {n/ts:>15,.0f} {n/tk:>15,.0f} {n/tr:>15,.0f}")
+        print()
+
+if __name__ == "__main__":
+    main()
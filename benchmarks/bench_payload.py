@@ -0,0 +1,86 @@
+"""
+Chart payload benchmark: figure JSON size and server build time for the
+row-level dashboard charts, shipping raw rows (plotly.express on the frame, as
+the pages did before risksight.downsample) vs. the reduced traces the pages use
+now, at growing data sizes. `values` counts the numbers in the trace data —
+what the browser has to parse and lay out, so it stands in for render time.
+
+    python benchmarks/bench_payload.py [--scales 1,10,100]
+"""
+
+import os, sys, time, argparse, warnings
+import numpy as np, pandas as pd
+import plotly.express as px, plotly.graph_objects as go
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+warnings.filterwarnings("ignore")
+import app as A
+
+def grow(df, k, rng):
+    """k copies of df with numeric columns jittered ±5% (so bins and quantiles move)."""
+    if k == 1:
+        return df
+    out = pd.concat([df] * k, ignore_index=True)
+    for c in out.select_dtypes("float").columns:
+        out[c] = out[c] * rng.uniform(.95, 1.05, len(out))
+    return out
+
+def values(fig):
+    n = 0
+    for t in fig.data:
+        for a in ("x", "y", "q1", "median", "q3"):
+            v = getattr(t, a, None)
+            n += len(v) if v is not None and not isinstance(v, str) else 0
+    return n
+
+def charts(cr, fd, ins):
+    """(name, raw figure builder, reduced figure builder) per row-level chart."""
+    c2 = {0: "#3fb950", 1: "#f85149"}
+    return [
+        ("credit score histogram",
+         lambda: px.histogram(cr, x="credit_score", nbins=40, color="default", barmode="overlay"),
+         lambda: go.Figure(A.hist_bars(cr.credit_score, cr.default, 40, c2, opacity=.6))),
+        ("fraud amount violin",
+         lambda: px.violin(fd, y="amount", x="fraud", color="fraud", box=True),
+         lambda: go.Figure(A.violin_traces(fd.amount, fd.fraud, c2))),
+        ("claims smoker box",
+         lambda: px.box(ins, x="smoker", y="claim_amt", color="smoker"),
+         lambda: go.Figure(A.box_traces(ins.claim_amt, ins.smoker, c2))),
+        ("loss ratio histogram",
+         lambda: px.histogram(ins, x="loss_ratio", nbins=50, color="policy_type", barmode="overlay"),
+         lambda: go.Figure(A.hist_bars(ins.loss_ratio, ins.policy_type, 50))),
+        ("income vs loan scatter",
+         lambda: px.scatter(cr, x="income", y="loan_amt", color="default"),
+         lambda: go.Figure(A.scatter_traces(cr.income, cr.loan_amt, cr.default, c2,
+                                            A.CHART_POINTS["income_loan"]))),
+        ("bmi vs claim scatter",
+         lambda: px.scatter(ins, x="bmi", y="claim_amt", color="high_risk"),
+         lambda: go.Figure(A.scatter_traces(ins.bmi, ins.claim_amt, ins.high_risk, c2,
+                                            A.CHART_POINTS["bmi_claim"]))),
+    ]
+
+def measure(build):
+    t = time.perf_counter()
+    fig = build(); js = A.dark_layout(fig)
+    return len(js), time.perf_counter() - t, values(fig)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", default="1,10,100", help="row multipliers of the synthetic data")
+    a = ap.parse_args()
+    rng = np.random.default_rng(0)
+    print(f"point budget: scatter {A.POINT_BUDGET}, outliers {A.CHART_POINTS['outliers']}, "
+          f"kde grid {A.CHART_POINTS['kde']}\n")
+    print(f"{'chart':<24} {'rows':>9} {'raw KB':>9} {'reduced KB':>11} {'raw ms':>8} {'reduced ms':>11}"
+          f" {'raw values':>11} {'reduced':>8}")
+    for k in (int(s) for s in a.scales.split(",")):
+        cr, fd, ins = grow(A.cr, k, rng), grow(A.fd, k, rng), grow(A.ins, k, rng)
+        for name, raw, red in charts(cr, fd, ins):
+            rb, rt, rv = measure(raw)
+            sb, st, sv = measure(red)
+            rows = len(fd) if "fraud" in name else len(cr) if name.startswith(("credit", "income")) else len(ins)
+            print(f"{name:<24} {rows:>9,} {rb/1024:>9,.0f} {sb/1024:>11,.1f} {rt*1e3:>8,.0f} {st*1e3:>11,.1f}"
+                  f" {rv:>11,} {sv:>8,}")
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Page render benchmark: the shell rendered the old way (body spliced into the
+template source, render_template_string parses and compiles it per request)
+vs. the precompiled shell with the body passed in as safe markup, for every
+dashboard page, serially and from concurrent threads. Figures are served
+separately from /fig, so this is the whole server-side cost of a page view
+once its KPIs are cached. Both renders are checked to produce the same HTML.
+
+    python benchmarks/bench_render.py [--threads 1,4,16] [--requests 400]
+"""
+
+import os, sys, time, argparse, warnings
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from flask import render_template, render_template_string
+from markupsafe import Markup
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+warnings.filterwarnings("ignore")
+import app as A
+
+PAGES = {"/": "home", "/banking/credit-risk": "credit_risk", "/banking/fraud-detection": "fraud_detection",
+         "/banking/market-risk": "market_risk", "/banking/loan-portfolio": "loan_portfolio",
+         "/insurance/claims": "claims", "/insurance/underwriting": "underwriting",
+         "/insurance/loss-ratio": "loss_ratio", "/monitoring/drift": "drift_monitor"}
+
+def legacy(title, active, body, scripts=""):
+    html = A.SHELL.replace("{{ body }}", body).replace("{{ scripts }}", scripts)
+    return render_template_string(html, title=title, active=active, now="-", plotly_version=A.PLOTLY_VERSION)
+
+def compiled(title, active, body, scripts=""):
+    return render_template(A.SHELL_TEMPLATE, title=title, active=active, now="-",
+                           plotly_version=A.PLOTLY_VERSION, body=Markup(body), scripts=Markup(scripts))
+
+def capture():
+    """(path, rp arguments) of every page, as its view builds them."""
+    calls, rp = {}, A.rp
+    A.rp = lambda *a: calls.setdefault("last", a)
+    try:
+        with A.app.test_request_context():
+            for path, endpoint in PAGES.items():
+                calls.pop("last", None)
+                A.app.view_functions[endpoint]()
+                calls[path] = calls.pop("last")
+    finally:
+        A.rp = rp
+    return calls
+
+def run(render, calls, threads, n):
+    paths = list(calls)
+    def one(i):
+        with A.app.test_request_context(paths[i % len(paths)]):
+            t = time.perf_counter()
+            render(*calls[paths[i % len(paths)]])
+            return time.perf_counter() - t
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        lat = np.array(list(pool.map(one, range(n)))) * 1e3
+    return n / (time.perf_counter() - t0), lat
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", default="1,4,16")
+    ap.add_argument("--requests", type=int, default=400)
+    a = ap.parse_args()
+    calls = capture()
+    with A.app.test_request_context():
+        for path, args in calls.items():
+            assert legacy(*args) == compiled(*args), f"render mismatch on {path}"
+    print(f"{len(calls)} pages, identical HTML from both renders\n")
+    print(f"{'render':<10} {'threads':>7} {'pages/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for k in (int(t) for t in a.threads.split(",")):
+        for name, fn in (("string", legacy), ("compiled", compiled)):
+            run(fn, calls, k, len(calls))                       # warm
+            rate, lat = run(fn, calls, k, a.requests)
+            p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+            print(f"{name:<10} {k:>7} {rate:>9,.0f} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Rolling VaR benchmark: pandas rolling().apply(np.percentile) (the original
+market-risk page code) vs risksight.market.rolling_risk, which also returns
+CVaR and volatility in the same pass.
+
+    python benchmarks/bench_rolling_var.py [--years 20] [--books 200] [--window 21]
+"""
+
+import os, sys, time, argparse
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from risksight.market import rolling_risk, rolling_var_reference
+
+def clock(fn, *a, **kw):
+    t = time.perf_counter(); r = fn(*a, **kw); return r, time.perf_counter() - t
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--years",  type=int, default=20)
+    ap.add_argument("--books",  type=int, default=200)
+    ap.add_argument("--window", type=int, default=21)
+    ap.add_argument("--ref-books", type=int, default=3, help="books timed with the slow reference")
+    a = ap.parse_args()
+
+    n = 252 * a.years
+    R = np.random.default_rng(0).normal(.0003, .012, (n, a.books))
+    print(f"{n} days × {a.books} books, window {a.window}\n")
+
+    print("single book")
+    for days in (252, n):
+        ref, t_ref = clock(rolling_var_reference, R[:days, 0], a.window, .95, 1e7)
+        new, t_new = clock(rolling_risk, R[:days, 0], a.window, (.95,), 1e7)
+        err = np.nanmax(np.abs(new["var_95"] - ref))
+        print(f"  {days:>6} days   reference {t_ref*1e3:9.1f} ms   engine {t_new*1e3:7.2f} ms"
+              f"   {t_ref/t_new:7.0f}x   max |diff| {err:.2e}")
+
+    print("\nall books (VaR 95/99 + CVaR 95/99 + vol)")
+    _, t_ref = clock(lambda: [rolling_var_reference(R[:, b], a.window, .95, 1e7) for b in range(a.ref_books)])
+    est = t_ref / a.ref_books * a.books
+    _, t_new = clock(rolling_risk, R, a.window, (.95, .99), 1e7)
+    print(f"  reference (VaR 95 only, est. from {a.ref_books} books) {est:8.2f} s")
+    print(f"  engine                                           {t_new:8.3f} s   ({est/t_new:.0f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Quantile sketch benchmark: estimates from risksight.sketch vs. exact
+np.percentile for return-, claim- and loss-ratio-shaped columns, at several
+relative error bounds and sizes. For every quantile it checks the documented
+guarantee (|estimate − exact| ≤ α·|exact| when the two ranks around q share a
+sign), that a sketch merged from shards equals the one-pass sketch, and
+reports the observed worst error, sketch size and update throughput.
+Exits non-zero if a bound is violated.
+
+    python benchmarks/bench_sketch.py [--sizes 10000,1000000] [--alphas 0.01,0.005,0.001] [--shards 16]
+"""
+
+import os, sys, time, argparse
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from risksight.sketch import QuantileSketch
+
+QS = np.array([.001, .01, .05, .1, .25, .5, .75, .9, .95, .99, .999])
+
+def columns(n, rng):
+    return {"returns":    rng.standard_t(4, n) * .01 + .0003,      # fat-tailed daily P&L, both signs
+            "claim_amt":  rng.lognormal(9, 1.1, n),
+            "loss_ratio": rng.gamma(2.5, .4, n)}
+
+def bound(x, alpha):
+    """Allowed error per quantile: α·|exact|, or α·max(|neighbours|) across a sign change."""
+    s = np.sort(x)
+    pos = QS * (len(s) - 1)
+    lo, hi = s[np.floor(pos).astype(int)], s[np.ceil(pos).astype(int)]
+    return alpha * np.maximum(np.abs(lo), np.abs(hi)) * (1 + 1e-9) + 1e-15
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10000,1000000")
+    ap.add_argument("--alphas", default="0.01,0.005,0.001")
+    ap.add_argument("--shards", type=int, default=16)
+    a = ap.parse_args()
+    rng, failed = np.random.default_rng(7), 0
+    print(f"quantiles {QS.tolist()}\n")
+    print(f"{'column':<11} {'n':>9} {'alpha':>6} {'max rel err':>11} {'within':>6} {'merge':>5} "
+          f"{'sketch KB':>9} {'raw KB':>9} {'Mrows/s':>8}")
+    for n in (int(x) for x in a.sizes.split(",")):
+        for name, x in columns(n, rng).items():
+            exact = np.percentile(x, QS * 100)
+            for alpha in (float(x) for x in a.alphas.split(",")):
+                t = time.perf_counter()
+                sk = QuantileSketch(alpha).update(x)
+                dt = time.perf_counter() - t
+                est = sk.quantile(QS)
+                merged = QuantileSketch(alpha)
+                for part in np.array_split(rng.permutation(x), a.shards):
+                    merged.merge(QuantileSketch(alpha).update(part))
+                ok = bool((np.abs(est - exact) <= bound(x, alpha)).all())
+                same = bool(np.array_equal(merged.quantile(QS), est))
+                failed += (not ok) + (not same)
+                rel = np.abs(est - exact) / np.abs(exact)
+                print(f"{name:<11} {n:>9,} {alpha:>6g} {rel.max():>11.5f} {'yes' if ok else 'NO':>6} "
+                      f"{'yes' if same else 'NO':>5} {sk.nbytes / 1024:>9.1f} {x.nbytes / 1024:>9,.0f} "
+                      f"{n / dt / 1e6:>8.1f}")
+    sk, v = QuantileSketch(), rng.normal(0, .01, 200_000)
+    t = time.perf_counter()
+    for x in v:
+        sk.add(x)
+    print(f"\nsingle-value add: {(time.perf_counter() - t) / len(v) * 1e6:.2f} µs")
+    if failed:
+        print(f"{failed} checks failed")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
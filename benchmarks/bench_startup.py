@@ -0,0 +1,57 @@
+"""
+Startup-time benchmark: cold `import app` with published artifacts (load-only
+path) vs. without them (in-process training fallback), plus the model step alone.
+
+    python -m risksight.registry train     # once, so the load path has artifacts
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import os, sys, time, argparse, tempfile, statistics, subprocess
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from risksight import registry
+from risksight.data import synthetic
+
+ROOT = registry.ROOT
+PROBE = "import time; t=time.perf_counter(); import app; print(time.perf_counter()-t)"
+
+def cold_import(env):
+    """Seconds to import app in a fresh interpreter (excludes interpreter boot)."""
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def med(fn, runs):
+    xs = [fn() for _ in range(runs)]
+    return statistics.median(xs), min(xs), max(xs)
+
+def row(label, r):
+    print(f"  {label:<28} median {r[0]*1e3:8.1f} ms   min {r[1]*1e3:8.1f}   max {r[2]*1e3:8.1f}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    a = ap.parse_args()
+    if not registry.versions():
+        sys.exit("no artifacts published — run `python -m risksight.registry train` first")
+
+    base = {k: v for k, v in os.environ.items() if not k.startswith("RISKSIGHT_")}
+    empty = tempfile.mkdtemp(prefix="risksight-noart-")
+    print(f"artifacts: {registry.ART_DIR} ({registry.latest()})   runs: {a.runs}\n")
+
+    print("cold `import app` (fresh interpreter)")
+    load  = med(lambda: cold_import({**base}), a.runs)
+    train = med(lambda: cold_import({**base, "RISKSIGHT_ARTIFACTS": empty}), a.runs)
+    row("load-only (artifacts)", load)
+    row("train at import", train)
+
+    print("\nmodel step only (in-process)")
+    cr, fd, ins, _ = synthetic()
+    row("registry.load (mmap)", med(lambda: _t(registry.load), a.runs))
+    row("registry.train", med(lambda: _t(registry.train, cr, fd, ins), a.runs))
+    print(f"\nspeed-up (cold import): {train[0]/load[0]:.1f}x")
+
+def _t(fn, *args):
+    t = time.perf_counter(); fn(*args); return time.perf_counter() - t
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Fraud stream benchmark: feeds synthetic transactions at a fixed arrival rate
+through the micro-batch loop and reports throughput and p50/p99 latency for
+several batch-size / latency bounds, to size the scorer for peak card traffic.
+
+    python benchmarks/bench_stream.py [--n 50000] [--rate 20000] [--batches 64,256,1024]
+"""
+
+import os, sys, json, time, queue, argparse, threading, warnings
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from risksight import registry, stream
+from risksight.data import synthetic
+
+def feed(q, lines, rate):
+    t0 = time.perf_counter()
+    for i, line in enumerate(lines):
+        if rate:
+            d = t0 + i / rate - time.perf_counter()
+            if d > 0:
+                time.sleep(d)
+        q.put((time.perf_counter(), line))
+    q.put(stream._EOF)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=50_000)
+    ap.add_argument("--rate", type=float, default=20_000, help="arrivals per second (0 = unthrottled)")
+    ap.add_argument("--batches", default="64,256,1024")
+    ap.add_argument("--max-latency-ms", type=float, default=20)
+    a = ap.parse_args()
+    warnings.filterwarnings("ignore")
+    M = registry.load_or_train(*synthetic()[:3])
+    lines = [json.dumps(r) for r in stream.generate(a.n)]
+
+    print(f"{a.n:,} transactions at {a.rate or 'max':} /s, max latency {a.max_latency_ms:g} ms\n")
+    print(f"{'max_batch':>9} {'avg_batch':>9} {'rec/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'flagged':>8}")
+    for b in (int(x) for x in a.batches.split(",")):
+        sc = stream.StreamScorer(M["sfr"], M["mdl_fr"], M["FR_COLS"])
+        q  = queue.Queue()
+        th = threading.Thread(target=feed, args=(q, lines, a.rate), daemon=True)
+        sc.stats.t0 = time.perf_counter()
+        th.start()
+        s = stream.run(sc, q, lambda recs: None, b, a.max_latency_ms / 1e3)
+        print(f"{b:>9} {s['avg_batch']:>9} {s['records_per_sec']:>9,} {s['p50_ms']:>8} {s['p99_ms']:>8} {s['flagged']:>8,}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Load test against a running server: closed-loop clients (one keep-alive
+connection each) issue a mix of dashboard page and scoring API requests for a
+fixed duration, then report requests/s and p50/p95/p99/max latency per route
+group. Run it once per server mode to compare them.
+
+    gunicorn -c gunicorn.conf.py                           # or: python app.py
+    python benchmarks/loadtest.py [--url http://127.0.0.1:7860] [--clients 32]
+                                  [--duration 20] [--api-share 0.8]
+"""
+
+import sys, json, time, random, argparse, threading
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+import numpy as np
+
+PAGES = ["/", "/banking/credit-risk", "/banking/fraud-detection", "/banking/market-risk",
+         "/banking/loan-portfolio", "/insurance/claims", "/insurance/underwriting",
+         "/insurance/loss-ratio", "/monitoring/drift"]
+API = [
+    ("/api/credit", {"age": 41, "income": 62000, "debt_ratio": 0.34, "credit_score": 688,
+                     "emp_years": 6, "loan_amt": 24000}),
+    ("/api/fraud", {"amount": 912.5, "hour": 3, "foreign": 1, "velocity": 7, "merch_risk": "High"}),
+    ("/api/underwriting", {"age": 52, "bmi": 31.2, "smoker": 0, "children": 2, "veh_age": 4,
+                           "region": "South"}),
+]
+
+def client(host, port, stop, api_share, seed, out):
+    rng, conn = random.Random(seed), HTTPConnection(host, port, timeout=60)
+    while not stop.is_set():
+        if rng.random() < api_share:
+            group, (path, rec) = "api", rng.choice(API)
+            args = ("POST", path, json.dumps(rec), {"Content-Type": "application/json"})
+        else:
+            group, args = "page", ("GET", rng.choice(PAGES), None, {})
+        t = time.perf_counter()
+        try:
+            conn.request(*args)
+            r = conn.getresponse(); r.read()
+            ok = r.status < 500
+        except OSError:
+            conn.close(); conn = HTTPConnection(host, port, timeout=60)
+            ok = False
+        out.append((group, time.perf_counter() - t, ok))
+    conn.close()
+
+def report(name, rows, seconds):
+    lat = np.array([r[1] for r in rows if r[2]]) * 1e3
+    err = sum(not r[2] for r in rows)
+    if not len(lat):
+        print(f"  {name:<6} no successful requests ({err} errors)")
+        return
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    print(f"  {name:<6} {len(lat):>8,} ok {err:>5} err {len(lat)/seconds:>9,.1f} req/s   "
+          f"p50 {p50:7.1f} ms  p95 {p95:7.1f}  p99 {p99:7.1f}  max {lat.max():7.1f}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://127.0.0.1:7860")
+    ap.add_argument("--clients", type=int, default=32)
+    ap.add_argument("--duration", type=float, default=20)
+    ap.add_argument("--api-share", type=float, default=0.8, help="fraction of requests to /api/*")
+    ap.add_argument("--warmup", type=float, default=2, help="seconds of traffic before measuring")
+    a = ap.parse_args()
+    u = urlsplit(a.url)
+    host, port = u.hostname, u.port or 80
+
+    try:                                        # every page once, so figure caches are warm
+        for p in PAGES:
+            c = HTTPConnection(host, port, timeout=60); c.request("GET", p); c.getresponse().read(); c.close()
+    except OSError as e:
+        sys.exit(f"cannot reach {a.url}: {e}")
+
+    stop, outs = threading.Event(), [[] for _ in range(a.clients)]
+    ts = [threading.Thread(target=client, args=(host, port, stop, a.api_share, i, outs[i]), daemon=True)
+          for i in range(a.clients)]
+    for t in ts:
+        t.start()
+    time.sleep(a.warmup)
+    marks = [len(o) for o in outs]
+    t0 = time.perf_counter(); time.sleep(a.duration); seconds = time.perf_counter() - t0
+    ends = [len(o) for o in outs]
+    stop.set()
+    for t in ts:
+        t.join()
+
+    rows = [r for o, s, e in zip(outs, marks, ends) for r in o[s:e]]
+    print(f"{a.url}  clients {a.clients}  {seconds:.1f}s  api share {a.api_share:.0%}\n")
+    report("all", rows, seconds)
+    for g in ("api", "page"):
+        report(g, [r for r in rows if r[0] == g], seconds)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+RiskSight Pro — production server settings (gunicorn -c gunicorn.conf.py)
+
+The app is imported once in the master (preload_app) and the workers are forked
+from it, so the aggregates and memory-mapped model artifacts are shared
+copy-on-write instead of being loaded per worker, and the datasets are mapped
+from one read-only snapshot (risksight/snapshot.py). Everything allocated
+at import is moved out of the garbage collector's reach (gc.freeze) before the
+fork; otherwise the first collection in each worker would write to every
+object header and un-share those pages.
+
+RISKSIGHT_SERVER  wsgi (default) — threaded workers serving `app:app`
+                  asgi           — uvicorn workers serving `app:asgi_app`: /api/* reads
+                                   and writes are async and run in their own thread pool
+WEB_CONCURRENCY   worker processes (default: CPU count)
+RISKSIGHT_THREADS threads per wsgi worker (default 4)
+"""
+
+import gc, os, multiprocessing
+
+bind         = os.environ.get("RISKSIGHT_BIND", "0.0.0.0:7860")
+workers      = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+os.environ["RISKSIGHT_WORKERS"] = str(workers)      # read by the app before the workers fork
+preload_app  = True
+timeout      = int(os.environ.get("RISKSIGHT_TIMEOUT", "120"))   # Monte Carlo requests can run long
+keepalive    = 5
+accesslog    = "-"
+
+if os.environ.get("RISKSIGHT_SERVER", "wsgi") == "asgi":
+    wsgi_app     = "app:asgi_app"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app     = "app:app"
+    worker_class = "gthread"
+    threads      = int(os.environ.get("RISKSIGHT_THREADS", "4"))
+
+def when_ready(server):
+    gc.collect()
+    gc.freeze()
+    server.log.info("preloaded app frozen: %d objects shared with workers", gc.get_freeze_count())
@@ -0,0 +1,4 @@
+"""
+RiskSight Pro — engine package
+Scoring, model, data and risk engines used by the Flask app in app.py.
+"""
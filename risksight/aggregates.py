@@ -0,0 +1,193 @@
+"""
+RiskSight Pro — materialized aggregates
+Count, sum, sum of squares, min and max per group key for a fixed set of
+views, so dashboard KPIs and group-bys are read rather than recomputed, plus
+optional quantile sketches (risksight.sketch) for medians and percentiles.
+Appending a record is O(1) per view; stores built by different workers or
+from different file chunks merge exactly.
+"""
+
+import threading
+import numpy as np, pandas as pd
+
+from risksight.sketch import QuantileSketch, ALPHA
+
+SUM, SQ, MIN, MAX = range(4)
+
+def _key(v):
+    return v.item() if isinstance(v, np.generic) else v
+
+def _missing(v):
+    return v is None or (isinstance(v, float) and v != v)
+
+class AggStore:
+    """Group-keyed running moments for `specs` = {view: (key columns, value columns)}.
+
+    Each group holds its row count and a (4, values) array of sum, sum of squares,
+    min and max. `orders` fixes the display order of ordinal keys (e.g. risk grades
+    F→A); other keys sort naturally. Rows with a missing key are left out of that
+    view (pandas groupby semantics); value columns are assumed non-null.
+    `quantiles` = {view: [value columns]} also keeps a QuantileSketch (relative
+    error `alpha`) per group for those columns.
+    """
+
+    def __init__(self, specs, orders=None, quantiles=None, alpha=ALPHA):
+        self.specs  = {v: (tuple(k), list(c)) for v, (k, c) in specs.items()}
+        self.orders = {c: {x: i for i, x in enumerate(o)} for c, o in (orders or {}).items()}
+        self.quantiles, self.alpha = {v: list(c) for v, c in (quantiles or {}).items()}, alpha
+        self._g     = {v: {} for v in self.specs}          # view → {key tuple: [n, (4, k) array]}
+        self._q     = {v: {} for v in self.quantiles}      # view → {key tuple: {column: QuantileSketch}}
+        self._lock  = threading.Lock()
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if k != "_lock"}
+
+    def __setstate__(self, d):
+        self.__dict__.update(d, _lock=threading.Lock())
+
+    def _fold(self, view, key, n, m):
+        g = self._g[view].get(key)
+        if g is None:
+            self._g[view][key] = [n, m.copy()]
+        else:
+            g[0] += n
+            g[1][SUM:SQ+1] += m[SUM:SQ+1]
+            np.minimum(g[1][MIN], m[MIN], out=g[1][MIN])
+            np.maximum(g[1][MAX], m[MAX], out=g[1][MAX])
+
+    def _sketches(self, view, key):
+        q = self._q[view].get(key)
+        if q is None:
+            q = self._q[view][key] = {c: QuantileSketch(self.alpha) for c in self.quantiles[view]}
+        return q
+
+    # ── writes ──────────────────────────────────────────────────────────────────
+    def add(self, rec):
+        """Append one record (mapping with every key and value column) — O(1) per view."""
+        with self._lock:
+            for view, (keys, vals) in self.specs.items():
+                key = tuple(_key(rec[c]) for c in keys)
+                if any(_missing(k) for k in key):
+                    continue
+                if view in self._q:
+                    for c, sk in self._sketches(view, key).items():
+                        sk.add(rec[c])
+                v = np.array([rec[c] for c in vals], dtype=np.float64)
+                g = self._g[view].get(key)
+                if g is None:
+                    self._g[view][key] = [1, np.stack([v, v*v, v, v])]
+                    continue
+                g[0] += 1
+                m = g[1]
+                m[SUM] += v; m[SQ] += v*v
+                np.minimum(m[MIN], v, out=m[MIN]); np.maximum(m[MAX], v, out=m[MAX])
+        return self
+
+    def update(self, df):
+        """Append a frame: one vectorised group-by per view, then O(groups) folds."""
+        parts, sketches = {}, {}
+        for view, cols in self.quantiles.items():
+            keys = self.specs[view][0]
+            groups = df.groupby([df[c] for c in keys], observed=True, sort=False).indices.items() if keys \
+                     else [((), np.arange(len(df)))] if len(df) else []
+            sketches[view] = [(tuple(map(_key, key)) if isinstance(key, tuple) else (_key(key),) if keys else (),
+                               {c: QuantileSketch(self.alpha).update(df[c].to_numpy()[i]) for c in cols})
+                              for key, i in groups]
+        for view, (keys, vals) in self.specs.items():
+            x = df[list(vals)].astype(np.float64)
+            if keys:
+                k = len(vals)
+                g = pd.concat([x, (x*x).add_suffix(".sq")], axis=1) \
+                      .groupby([df[c] for c in keys], observed=True, sort=False)
+                s, lo, hi, n = g.sum().values, g[vals].min().values, g[vals].max().values, g.size()
+                parts[view] = [(tuple(map(_key, key)) if isinstance(key, tuple) else (_key(key),), n.iloc[i],
+                                np.stack([s[i, :k], s[i, k:], lo[i], hi[i]]))
+                               for i, key in enumerate(n.index)]
+            elif len(x):
+                a = x.values
+                parts[view] = [((), len(a), np.stack([a.sum(0), (a*a).sum(0), a.min(0), a.max(0)]))]
+        with self._lock:
+            for view, rows in parts.items():
+                for key, n, m in rows:
+                    self._fold(view, key, int(n), m)
+            for view, rows in sketches.items():
+                for key, sk in rows:
+                    for c, s in self._sketches(view, key).items():
+                        s.merge(sk[c])
+        return self
+
+    def merge(self, other):
+        """Fold another store with the same specs into this one (exact for every statistic)."""
+        if other.specs != self.specs or other.quantiles != self.quantiles or other.alpha != self.alpha:
+            raise ValueError("cannot merge aggregate stores with different specs")
+        with other._lock:
+            sketches = {v: {k: {c: s.copy() for c, s in q.items()} for k, q in g.items()} for v, g in other._q.items()}
+        with self._lock:
+            for view, groups in other.snapshot().items():
+                for key, (n, m) in groups.items():
+                    self._fold(view, key, n, m)
+            for view, groups in sketches.items():
+                for key, q in groups.items():
+                    for c, s in self._sketches(view, key).items():
+                        s.merge(q[c])
+        return self
+
+    # ── reads ───────────────────────────────────────────────────────────────────
+    def snapshot(self):
+        with self._lock:
+            return {v: {k: (n, m.copy()) for k, (n, m) in g.items()} for v, g in self._g.items()}
+
+    def _sort(self, keys, names):
+        def rank(key):
+            return tuple((self.orders[c].get(k, len(self.orders[c])), str(k)) if c in self.orders else (0, k)
+                         for c, k in zip(names, key))
+        return sorted(keys, key=rank)
+
+    def frame(self, view):
+        """DataFrame indexed by the view's keys: n and <col>_{sum,mean,std,min,max}.
+
+        std is the sample standard deviation (ddof=1, as pandas), NaN for single rows.
+        """
+        names, vals = self.specs[view]
+        with self._lock:
+            g    = self._g[view]
+            keys = self._sort(g, names)
+            n    = np.array([g[k][0] for k in keys], dtype=np.float64)
+            m    = np.stack([g[k][1] for k in keys]) if keys else np.zeros((0, 4, len(vals)))
+        cols = {"n": n.astype(np.int64)}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for j, c in enumerate(vals):
+                s, q = m[:, SUM, j], m[:, SQ, j]
+                var  = np.clip((q - s*s/n) / (n - 1), 0, None)
+                cols.update({f"{c}_sum": s, f"{c}_mean": s / n, f"{c}_std": np.sqrt(var),
+                             f"{c}_min": m[:, MIN, j], f"{c}_max": m[:, MAX, j]})
+        return pd.DataFrame(cols, index=self._index(names, keys))
+
+    @staticmethod
+    def _index(names, keys):
+        if not names:
+            return pd.RangeIndex(len(keys))
+        if len(names) == 1:
+            return pd.Index([k[0] for k in keys], name=names[0])
+        return pd.MultiIndex.from_tuples(keys, names=list(names)) if keys else \
+               pd.MultiIndex.from_arrays([[]] * len(names), names=list(names))
+
+    def sketch(self, view, col, key=()):
+        """A copy of the QuantileSketch of `col` for one group of `view` (empty if unseen)."""
+        with self._lock:
+            q = self._q[view].get(tuple(key))
+            return q[col].copy() if q is not None else QuantileSketch(self.alpha)
+
+    def quantile(self, view, col, qs):
+        """DataFrame indexed like frame(view), one column per quantile in `qs` (from the sketches)."""
+        names = self.specs[view][0]
+        with self._lock:
+            g    = self._q[view]
+            keys = self._sort(g, names)
+            est  = [g[k][col].quantile(qs) for k in keys]
+        return pd.DataFrame(np.reshape(est, (len(keys), len(qs))), columns=list(qs), index=self._index(names, keys))
+
+    def total(self, view="total"):
+        """The single row of an ungrouped view as a Series (zeros / NaN when empty)."""
+        f = self.frame(view)
+        return f.iloc[0] if len(f) else pd.Series({"n": 0}, dtype=np.float64).reindex(f.columns)
@@ -0,0 +1,128 @@
+"""
+RiskSight Pro — ASGI front end
+Serves the Flask (WSGI) app from an event loop. Request bodies are read and
+responses written asynchronously, so a slow or idle client costs a coroutine
+instead of a worker thread, and the blocking Flask handler runs only once the
+request is complete. /api/* and page routes use separate thread pools: a heavy
+page render cannot queue scoring calls behind it.
+
+    gunicorn -c gunicorn.conf.py                     # RISKSIGHT_SERVER=asgi (needs uvicorn)
+    uvicorn app:asgi_app --port 7860                 # single process
+"""
+
+import io, os, sys, asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+API_PREFIX   = "/api/"
+API_THREADS  = int(os.environ.get("RISKSIGHT_API_THREADS", "8"))
+PAGE_THREADS = int(os.environ.get("RISKSIGHT_PAGE_THREADS", "2"))
+MAX_BODY     = int(os.environ.get("RISKSIGHT_MAX_BODY_MB", "32")) << 20
+
+def _environ(scope, body):
+    """PEP 3333 environ for an ASGI http scope whose body has been read."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    env = {
+        "REQUEST_METHOD":    scope["method"],
+        "SCRIPT_NAME":       scope.get("root_path", ""),
+        "PATH_INFO":         scope["path"],
+        "QUERY_STRING":      scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME":       str(server[0]),
+        "SERVER_PORT":       str(server[1]),
+        "SERVER_PROTOCOL":   f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR":       client[0],
+        "CONTENT_LENGTH":    str(len(body)),
+        "wsgi.version":      (1, 0),
+        "wsgi.url_scheme":   scope.get("scheme", "http"),
+        "wsgi.input":        io.BytesIO(body),
+        "wsgi.errors":       sys.stderr,
+        "wsgi.multithread":  True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once":     False,
+    }
+    for name, value in scope.get("headers", []):
+        key = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if key == "CONTENT_TYPE":
+            env["CONTENT_TYPE"] = value
+        elif key != "CONTENT_LENGTH":
+            key = "HTTP_" + key
+            env[key] = env[key] + "," + value if key in env else value
+    return env
+
+class WSGIBridge:
+    """ASGI application wrapping a WSGI app, with separate pools for /api/* and pages."""
+
+    def __init__(self, wsgi_app, api_threads=API_THREADS, page_threads=PAGE_THREADS,
+                 max_body=MAX_BODY, api_prefix=API_PREFIX):
+        self.wsgi_app, self.max_body, self.api_prefix = wsgi_app, max_body, api_prefix
+        self.sizes = (api_threads, page_threads)
+        self.api_pool = self.page_pool = None
+
+    def _pools(self):
+        # created lazily so a preloaded master never owns threads it would fork
+        if self.api_pool is None:
+            self.api_pool  = ThreadPoolExecutor(self.sizes[0], thread_name_prefix="api")
+            self.page_pool = ThreadPoolExecutor(self.sizes[1], thread_name_prefix="page")
+        return self.api_pool, self.page_pool
+
+    def shutdown(self):
+        for pool in (self.api_pool, self.page_pool):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        self.api_pool = self.page_pool = None
+
+    def _call(self, environ):
+        """Run the WSGI app to completion: (status code, headers, body bytes)."""
+        out = {}
+        def start_response(status, headers, exc_info=None):
+            out["status"], out["headers"] = int(status.split(" ", 1)[0]), headers
+        result = self.wsgi_app(environ, start_response)
+        try:
+            body = b"".join(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return out["status"], out["headers"], body
+
+    async def _read(self, receive):
+        chunks, size = [], 0
+        while True:
+            msg = await receive()
+            if msg["type"] == "http.disconnect":
+                return None
+            chunk = msg.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body:
+                return False
+            chunks.append(chunk)
+            if not msg.get("more_body", False):
+                return b"".join(chunks)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                msg = await receive()
+                if msg["type"] == "lifespan.startup":
+                    self._pools()
+                    await send({"type": "lifespan.startup.complete"})
+                else:
+                    await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            raise ValueError(f"unsupported ASGI scope {scope['type']!r}")
+
+        body = await self._read(receive)
+        if body is None:                                   # client went away mid-upload
+            return
+        if body is False:
+            status, headers, body = 413, [("Content-Type", "text/plain")], b"request body too large"
+        else:
+            api, page = self._pools()
+            pool = api if scope["path"].startswith(self.api_prefix) else page
+            status, headers, body = await asyncio.get_running_loop().run_in_executor(
+                pool, self._call, _environ(scope, body))
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,91 @@
+"""
+RiskSight Pro — in-process caches
+Thread-safe LRU bounded by total payload bytes, with optional time-to-live,
+tag-based invalidation and hit/miss/eviction counters.
+"""
+
+import sys, time, threading
+from collections import OrderedDict
+
+def sizeof(v):
+    """Approximate payload bytes of a cached value (strings/bytes dominate)."""
+    if isinstance(v, (str, bytes, bytearray)):
+        return len(v)
+    if isinstance(v, dict):
+        return sum(sizeof(x) for x in v.values()) + 64
+    if isinstance(v, (list, tuple)):
+        return sum(sizeof(x) for x in v) + 56
+    if hasattr(v, "nbytes"):                # arrays, transport payloads
+        return int(v.nbytes) + 64
+    return sys.getsizeof(v)
+
+class LRUCache:
+    """Least-recently-used cache bounded by `max_bytes` (and optionally `max_items`).
+
+    With `ttl` (seconds) an entry also expires that long after it was stored.
+    """
+
+    def __init__(self, max_bytes=64 << 20, max_items=None, name="cache", ttl=None):
+        self.name, self.max_bytes, self.max_items, self.ttl = name, max_bytes, max_items, ttl
+        self._d    = OrderedDict()          # key → (value, size, tags, expires)
+        self._lock = threading.Lock()
+        self.bytes = self.hits = self.misses = self.evictions = self.invalidations = self.expirations = 0
+
+    def __len__(self):
+        return len(self._d)
+
+    def get(self, key, default=None):
+        with self._lock:
+            e = self._d.get(key)
+            if e is not None and e[3] is not None and e[3] <= time.monotonic():
+                self.bytes -= self._d.pop(key)[1]
+                self.expirations += 1
+                e = None
+            if e is None:
+                self.misses += 1
+                return default
+            self._d.move_to_end(key)
+            self.hits += 1
+            return e[0]
+
+    def put(self, key, value, tags=(), size=None):
+        size = sizeof(value) if size is None else size
+        if size > self.max_bytes:
+            return value                    # never cache something that would flush everything
+        with self._lock:
+            old = self._d.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._d[key] = (value, size, frozenset(tags),
+                            None if self.ttl is None else time.monotonic() + self.ttl)
+            self.bytes += size
+            while self.bytes > self.max_bytes or (self.max_items and len(self._d) > self.max_items):
+                _, (_, s, _, _) = self._d.popitem(last=False)
+                self.bytes -= s
+                self.evictions += 1
+        return value
+
+    def get_or_set(self, key, build, tags=()):
+        """Cached value for key, computing it with build() on a miss."""
+        v = self.get(key, _MISS)
+        return self.put(key, build(), tags) if v is _MISS else v
+
+    def invalidate(self, tag=None):
+        """Drop every entry carrying `tag` (or everything); returns the count dropped."""
+        with self._lock:
+            keys = [k for k, e in self._d.items() if tag is None or tag in e[2]]
+            for k in keys:
+                self.bytes -= self._d.pop(k)[1]
+            self.invalidations += len(keys)
+        return len(keys)
+
+    def stats(self):
+        with self._lock:
+            n = self.hits + self.misses
+            return {"name": self.name, "items": len(self._d), "bytes": self.bytes,
+                    "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses,
+                    "hit_rate": round(self.hits / n, 4) if n else None,
+                    "evictions": self.evictions, "invalidations": self.invalidations,
+                    **({"ttl": self.ttl, "expirations": self.expirations} if self.ttl is not None else {})}
+
+_MISS = object()
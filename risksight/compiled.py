@@ -0,0 +1,204 @@
+"""
+RiskSight Pro — compiled tree inference
+Flattens fitted RandomForest / (Hist)GradientBoosting classifiers into contiguous
+NumPy node arrays with the StandardScaler folded into the split thresholds,
+and scores them with a vectorised traversal (all rows × all trees advance one
+level per step). No per-call validation or estimator dispatch, so single-row
+latency drops from milliseconds to tens of microseconds. Past a few hundred
+rows sklearn's Cython traversal wins again, so larger batches are routed back
+to the original estimator (see CUTOVER and benchmarks/bench_inference.py).
+
+Enable in the app with RISKSIGHT_INFERENCE=compiled; `compile_pair` checks the
+result against sklearn before it is used.
+"""
+
+import numpy as np
+from sklearn.ensemble import (RandomForestClassifier, GradientBoostingClassifier,
+                              HistGradientBoostingClassifier)
+
+TOL     = 1e-6      # max |p_compiled - p_sklearn| accepted by verify()
+CHUNK   = 16_384    # rows per traversal pass (bounds the rows × trees index matrix)
+CUTOVER = 256       # batches above this go to sklearn when the estimator is attached
+
+class TreeEnsemble:
+    """Flat node arrays for a binary tree ensemble over *unscaled* features.
+
+    feature/threshold/left/right/value are concatenated over all trees; leaves
+    point to themselves with threshold +inf, so a fixed `depth` steps of
+    ``node = left if x[feature] <= threshold else right`` lands every row on its
+    leaf. kind "mean" averages leaf probabilities (random forest); "logit" adds
+    learning-rate-scaled leaf values to `bias` and applies the sigmoid (GBM).
+    `value` covers internal nodes too (path attributions, risksight.explain).
+    `fallback` = (scaler, estimator) serves batches larger than `max_rows`.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, depth, kind, bias=0.0,
+                 n_features=None, fallback=None, max_rows=CUTOVER):
+        self.feature, self.threshold = feature, threshold
+        self.left, self.right, self.value = left, right, value
+        self.roots, self.depth, self.kind, self.bias = roots, depth, kind, bias
+        self.n_features, self.fallback, self.max_rows = n_features, fallback, max_rows
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def predict_proba(self, X):
+        """(n, 2) class probabilities — drop-in for a fitted classifier (scaler already folded)."""
+        p = self.predict(X)
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X):
+        """Positive-class probability for each row of raw feature matrix X."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if self.n_features is not None and X.shape[1] != self.n_features:
+            raise ValueError(f"expected {self.n_features} features, got {X.shape[1]}")
+        if self.fallback is not None and len(X) > self.max_rows:
+            scaler, model = self.fallback
+            return model.predict_proba(X if scaler is None else scaler.transform(X))[:, 1]
+        return self.kernel(X)
+
+    def kernel(self, X):
+        """The compiled traversal for any batch size (no sklearn routing)."""
+        if len(X) <= CHUNK:
+            return self._predict(X)
+        return np.concatenate([self._predict(X[s:s+CHUNK]) for s in range(0, len(X), CHUNK)])
+
+    def _predict(self, X):
+        n = len(X)
+        node = np.broadcast_to(self.roots, (n, len(self.roots))).copy()
+        flat = X.ravel()
+        base = (np.arange(n) * X.shape[1])[:, None]
+        f, t, l, r = self.feature, self.threshold, self.left, self.right
+        for _ in range(self.depth):
+            node = np.where(flat[base + f[node]] <= t[node], l[node], r[node])
+        leaf = self.value[node]
+        if self.kind == "mean":
+            return leaf.mean(1)
+        return 1.0 / (1.0 + np.exp(-(self.bias + leaf.sum(1))))
+
+def _fold(thr, mu, sd):
+    """Raw-space threshold equivalent to sklearn's float32 test float32((x-μ)/σ) ≤ thr.
+
+    float32(y) ≤ thr holds iff y is below the midpoint between the largest float32
+    a ≤ thr and its successor, so the cut is that midpoint mapped back through the
+    scaler and stepped down one float64 ulp (x < cut ⇔ x ≤ prev(cut)).
+    """
+    a  = thr.astype(np.float32)
+    a  = np.where(a > thr, np.nextafter(a, np.float32(-np.inf)), a)
+    up = np.nextafter(a, np.float32(np.inf))
+    cut = (a.astype(np.float64) + up.astype(np.float64)) / 2 * sd + mu
+    return np.nextafter(cut, -np.inf)
+
+def _flatten(trees, scaler, scale=1.0, proba=False):
+    """Concatenate sklearn Tree objects with the scaler folded into the thresholds."""
+    nf  = max(int(tr.n_features) for tr in trees)
+    mu  = np.zeros(nf) if scaler is None else np.asarray(scaler.mean_, dtype=np.float64)
+    sd  = np.ones(nf) if scaler is None else np.asarray(scaler.scale_, dtype=np.float64)
+    F, T, L, R, V, roots, depth, off = [], [], [], [], [], [], 0, 0
+    for tr in trees:
+        leaf = tr.children_left < 0
+        feat = np.where(leaf, 0, tr.feature).astype(np.intp)
+        thr  = np.where(leaf, np.inf, _fold(np.asarray(tr.threshold, dtype=np.float64), mu[feat], sd[feat]))
+        own  = np.arange(tr.node_count) + off
+        F.append(feat); T.append(thr)
+        L.append(np.where(leaf, own, tr.children_left + off))
+        R.append(np.where(leaf, own, tr.children_right + off))
+        if proba:                                   # class-1 share of the leaf (counts or fractions)
+            v = tr.value[:, 0, :]
+            V.append(v[:, 1] / v.sum(1))
+        else:
+            V.append(tr.value[:, 0, 0] * scale)
+        roots.append(off); depth = max(depth, tr.max_depth); off += tr.node_count
+    cat = np.concatenate
+    return (cat(F), cat(T), cat(L).astype(np.intp), cat(R).astype(np.intp), cat(V),
+            np.array(roots, dtype=np.intp), depth)
+
+def _fold64(thr, mu, sd, steps=8):
+    """Largest raw x with StandardScaler's float64 (x - μ) / σ ≤ thr.
+
+    Starts from the affine map and nudges one ulp at a time until the cut sits
+    exactly on the scaler's rounding boundary (a step or two at most).
+    """
+    x = thr * sd + mu
+    for _ in range(steps):
+        over = (x - mu) / sd > thr
+        x    = np.where(over, np.nextafter(x, -np.inf), x)
+        nxt  = np.nextafter(x, np.inf)
+        under = ~over & ((nxt - mu) / sd <= thr)
+        x    = np.where(under, nxt, x)
+        if not (over.any() or under.any()):
+            break
+    return x
+
+def _flatten_hist(predictors, scaler, nf, scale=1.0):
+    """Concatenate HistGradientBoosting node tables (numeric splits only) with the scaler folded.
+
+    Its splits compare the scaled float64 values (x ≤ num_threshold), so the
+    fold is _fold64 rather than the float32 midpoint of _fold.
+    """
+    mu = np.zeros(nf) if scaler is None else np.asarray(scaler.mean_, dtype=np.float64)
+    sd = np.ones(nf) if scaler is None else np.asarray(scaler.scale_, dtype=np.float64)
+    F, T, L, R, V, roots, depth, off = [], [], [], [], [], [], 0, 0
+    for p in predictors:
+        n = p.nodes
+        if n["is_categorical"].any():
+            raise TypeError("HistGradientBoosting with categorical splits cannot be compiled")
+        leaf = n["is_leaf"].astype(bool)
+        feat = np.where(leaf, 0, n["feature_idx"]).astype(np.intp)
+        own  = np.arange(len(n)) + off
+        F.append(feat); T.append(np.where(leaf, np.inf, _fold64(n["num_threshold"], mu[feat], sd[feat])))
+        L.append(np.where(leaf, own, n["left"] + off)); R.append(np.where(leaf, own, n["right"] + off))
+        V.append(np.where(leaf, n["value"], n["value"] * scale))  # leaves are stored already shrunk
+        roots.append(off); depth = max(depth, int(n["depth"].max())); off += len(n)
+    cat = np.concatenate
+    return (cat(F), cat(T), cat(L).astype(np.intp), cat(R).astype(np.intp), cat(V),
+            np.array(roots, dtype=np.intp), depth)
+
+def compile_model(scaler, model, max_rows=CUTOVER):
+    """TreeEnsemble equivalent to model.predict_proba(scaler.transform(X))[:, 1].
+
+    max_rows — batches above this are delegated to the estimator (None: never).
+    """
+    nf = getattr(model, "n_features_in_", None)
+    fb = None if max_rows is None else (scaler, model)
+    if isinstance(model, RandomForestClassifier):
+        if len(model.classes_) != 2:
+            raise TypeError("only binary classifiers can be compiled")
+        return TreeEnsemble(*_flatten([e.tree_ for e in model.estimators_], scaler, proba=True),
+                            kind="mean", n_features=nf, fallback=fb, max_rows=max_rows)
+    if isinstance(model, GradientBoostingClassifier):
+        if model.estimators_.shape[1] != 1:
+            raise TypeError("only binary classifiers can be compiled")
+        if model.init not in (None, "zero"):
+            raise TypeError("GradientBoosting with a custom init estimator cannot be compiled")
+        bias = float(model._raw_predict_init(np.zeros((1, nf)))[0, 0])
+        return TreeEnsemble(*_flatten([e.tree_ for e in model.estimators_[:, 0]], scaler,
+                                      scale=model.learning_rate),
+                            kind="logit", bias=bias, n_features=nf, fallback=fb, max_rows=max_rows)
+    if isinstance(model, HistGradientBoostingClassifier):
+        if model.n_trees_per_iteration_ != 1:
+            raise TypeError("only binary classifiers can be compiled")
+        return TreeEnsemble(*_flatten_hist([p[0] for p in model._predictors], scaler, nf,
+                                           scale=model.learning_rate),
+                            kind="logit", bias=float(model._baseline_prediction.ravel()[0]),
+                            n_features=nf, fallback=fb, max_rows=max_rows)
+    raise TypeError(f"cannot compile {type(model).__name__}")
+
+def verify(compiled, scaler, model, X, tol=TOL):
+    """Max abs difference of the compiled kernel from sklearn on X; raises ValueError above `tol`."""
+    X   = np.asarray(X, dtype=np.float64)
+    ref = model.predict_proba(X if scaler is None else scaler.transform(X))[:, 1]
+    err = float(np.abs(compiled.kernel(X) - ref).max()) if len(X) else 0.0
+    if err > tol:
+        raise ValueError(f"compiled {type(model).__name__} differs from sklearn by {err:.3g} (> {tol:g})")
+    return err
+
+def compile_pair(scaler, model, check=None, tol=TOL, max_rows=CUTOVER):
+    """Compile and, if `check` rows are given, verify against sklearn before returning."""
+    c = compile_model(scaler, model, max_rows)
+    if check is not None:
+        verify(c, scaler, model, check, tol)
+    return c
@@ -0,0 +1,117 @@
+"""
+RiskSight Pro — synthetic datasets & model feature frames
+Shared by the web app and the offline training CLI so both see identical data.
+"""
+
+import numpy as np, pandas as pd
+from datetime import datetime
+
+N  = 1200  # credit records
+NF = 3000  # card transactions
+NI = 1000  # insurance policies
+
+def synthetic(seed=42):
+    """Generate the credit, fraud, insurance and market frames (realistic enough for a demo)."""
+    np.random.seed(seed)
+
+    # ── Credit / Loan ──────────────────────────────────────────────────────────
+    cr = pd.DataFrame({
+        "age":          np.random.randint(22, 70, N),
+        "income":       np.random.lognormal(10.5, .5, N).astype(int),
+        "debt_ratio":   np.round(np.random.beta(2, 5, N), 3),
+        "credit_score": np.random.randint(300, 850, N),
+        "emp_years":    np.random.randint(0, 30, N),
+        "loan_amt":     np.random.lognormal(10, .8, N).astype(int),
+        "purpose":      np.random.choice(["Mortgage","Auto","Personal","Business"], N,
+                                         p=[.35,.25,.25,.15]),
+        "region":       np.random.choice(["North","South","East","West"], N),
+    })
+    cr["default_prob"] = np.clip(
+        .3*(1-(cr.credit_score-300)/550) + .2*cr.debt_ratio +
+        .1*(cr.loan_amt/cr.income) + .1*(1-cr.emp_years/30) + np.random.normal(0,.05,N),
+        0, 1)
+    cr["default"] = (cr.default_prob > .3).astype(int)
+    cr["risk_grade"] = pd.cut(cr.credit_score,[300,580,670,740,800,850],
+                               labels=["F","D","C","B","A"])
+
+    # ── Fraud / Transactions ───────────────────────────────────────────────────
+    fd = pd.DataFrame({
+        "txn_id":    [f"TXN{i:06d}" for i in range(NF)],
+        "amount":    np.round(np.random.lognormal(5, 1.5, NF), 2),
+        "hour":      np.random.randint(0, 24, NF),
+        "merch_risk":np.random.choice(["Low","Medium","High"], NF, p=[.6,.3,.1]),
+        "foreign":   np.random.choice([0,1], NF, p=[.85,.15]),
+        "velocity":  np.random.randint(1, 20, NF),
+        "channel":   np.random.choice(["Online","POS","ATM","Mobile"], NF),
+        "date":      pd.date_range("2024-01-01", periods=NF, freq="H"),
+    })
+    fd["fraud_prob"] = np.clip(
+        .10*(fd.amount>1000).astype(float) + .20*fd.foreign +
+        .15*(fd.merch_risk=="High").astype(float) +
+        .10*((fd.hour<5)|(fd.hour>22)).astype(float) +
+        .05*(fd.velocity>15).astype(float) + np.random.uniform(0,.1,NF), 0, 1)
+    fd["fraud"] = (fd.fraud_prob > .25).astype(int)
+
+    # ── Insurance ──────────────────────────────────────────────────────────────
+    ins = pd.DataFrame({
+        "age":         np.random.randint(18, 75, NI),
+        "bmi":         np.round(np.random.normal(27, 5, NI), 1),
+        "smoker":      np.random.choice([0,1], NI, p=[.75,.25]),
+        "region":      np.random.choice(["North","South","East","West"], NI),
+        "children":    np.random.randint(0, 5, NI),
+        "policy_type": np.random.choice(["Basic","Standard","Premium"], NI, p=[.3,.5,.2]),
+        "veh_age":     np.random.randint(0, 20, NI),
+    })
+    ins["claim_amt"] = np.round(
+        (5000+ins.age*100+ins.bmi*50+ins.smoker*10000+ins.children*500) *
+        np.random.lognormal(0,.3,NI), 2)
+    ins["premium"] = np.round(ins.claim_amt * np.random.uniform(.6,1.4,NI), 2)
+    ins["loss_ratio"] = np.round(ins.claim_amt/ins.premium, 3)
+    ins["high_risk"] = ((ins.smoker==1)|(ins.bmi>35)|(ins.age>60)).astype(int)
+    ins["month"] = np.random.randint(1,13,NI)
+
+    # ── Market / Portfolio ─────────────────────────────────────────────────────
+    mdt  = pd.date_range(end=datetime.now(), periods=252, freq="B")
+    mret = np.random.normal(.0003, .012, 252)
+    mpv  = 10_000_000 * np.cumprod(1+mret)
+    mkt  = pd.DataFrame({"date":mdt,"ret":mret,"portfolio":mpv})
+    mkt["drawdown"] = (mkt.portfolio - mkt.portfolio.cummax()) / mkt.portfolio.cummax()
+
+    return cr, fd, ins, mkt
+
+def features(cr, fd, ins):
+    """Model input frames: credit (raw), fraud (+ merchant-risk dummies), underwriting (+ region dummies).
+
+    Dummy columns are sorted by name so string and categorical (file-loaded) columns
+    produce the same layout the models were trained on.
+    """
+    Xcr  = cr[["age","income","debt_ratio","credit_score","emp_years","loan_amt"]]
+    Xfd  = pd.concat([fd[["amount","hour","foreign","velocity"]].reset_index(drop=True),
+                      pd.get_dummies(fd.merch_risk,prefix="mr").sort_index(axis=1).reset_index(drop=True)], axis=1)
+    Xins = pd.concat([ins[["age","bmi","smoker","children","veh_age"]].reset_index(drop=True),
+                      pd.get_dummies(ins.region,prefix="r").sort_index(axis=1).reset_index(drop=True)], axis=1)
+    return Xcr, Xfd, Xins
+
+ASSETS = ["US Equity","EU Equity","EM Equity","UST 10Y","IG Credit","HY Credit","Gold","EURUSD"]
+
+def market_book(seed=7, days=252):
+    """Daily returns for a small multi-asset universe plus three $10M desk portfolios.
+
+    Uses its own Generator so the legacy global-seed frames above are unaffected.
+    Returns (rets DataFrame days×assets, positions DataFrame desks×assets in USD).
+    """
+    rng  = np.random.default_rng(seed)
+    vol  = np.array([.011,.012,.016,.005,.004,.007,.009,.006])
+    beta = np.array([[.9,.1,0],[.85,.2,0],[.8,.1,.3],[-.3,.8,0],[.1,.7,.2],[.6,.4,.3],[.1,-.2,.6],[.2,0,.5]])
+    corr = beta @ beta.T
+    corr = corr + np.diag(1 - np.minimum(np.diag(corr), .95))
+    d    = np.sqrt(np.diag(corr)); corr = corr / np.outer(d, d)
+    cov  = corr * np.outer(vol, vol)
+    mu   = np.array([.0004,.0003,.0005,.0001,.00015,.0003,.0002,0])
+    rets = pd.DataFrame(rng.multivariate_normal(mu, cov, days), columns=ASSETS,
+                        index=pd.date_range(end=datetime.now(), periods=days, freq="B"))
+    w = pd.DataFrame([[.45,.25,.20,0,0,.05,.05,0],
+                      [0,0,0,.55,.30,.15,0,0],
+                      [.20,.10,.10,.20,.10,.10,.10,.10]],
+                     index=["Equity Desk","Rates & Credit","Multi-Asset"], columns=ASSETS)
+    return rets, w * 10_000_000
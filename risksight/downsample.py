@@ -0,0 +1,149 @@
+"""
+RiskSight Pro — chart payload reduction
+Summarises large columns on the server so the figure JSON sent to the browser
+has a fixed point budget instead of one point per row: pre-binned histograms,
+box / violin statistics (quartiles, fences, a capped outlier set, a gridded
+KDE), LTTB for time series and density-preserving thinning for scatter plots.
+All functions are deterministic and return NumPy arrays (or indices into the
+input), so a chart looks the same on every render.
+"""
+
+import numpy as np
+
+def histogram(x, bins=40, range=None, edges=None):
+    """(counts, edges) — pass the `edges` of one group to bin others identically."""
+    x = np.asarray(x, dtype=np.float64)
+    x = x[np.isfinite(x)]
+    if edges is None:
+        edges = np.histogram_bin_edges(x, bins, range)
+    return np.histogram(x, edges)[0], edges
+
+def box_stats(x, max_outliers=50):
+    """Plotly box statistics (linear quartiles, 1.5·IQR whiskers) plus at most
+    `max_outliers` outliers, evenly spaced in rank so the extremes are kept."""
+    x = np.sort(np.asarray(x, dtype=np.float64)[~np.isnan(x)])
+    if not len(x):
+        return None
+    q1, med, q3 = np.percentile(x, [25, 50, 75])
+    iqr = q3 - q1
+    inside = x[(x >= q1 - 1.5*iqr) & (x <= q3 + 1.5*iqr)]
+    out = x[(x < inside[0]) | (x > inside[-1])]
+    if len(out) > max_outliers:
+        out = out[np.unique(np.linspace(0, len(out) - 1, max_outliers).round().astype(int))]
+    return {"q1": q1, "median": med, "q3": q3, "lowerfence": inside[0], "upperfence": inside[-1],
+            "mean": x.mean(), "sd": x.std(ddof=1) if len(x) > 1 else 0.0, "n": len(x), "outliers": out}
+
+def kde(x, points=200, bandwidth=None):
+    """(grid, density) of a Gaussian KDE on `points` grid values spanning
+    [min - 2h, max + 2h] (plotly's "soft" violin span).
+
+    Bandwidth defaults to Silverman's rule, as plotly violins use. The data is
+    first binned onto a fine grid, so the cost is O(n + grid²) rather than O(n·grid).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    x = x[np.isfinite(x)]
+    if len(x) < 2 or x.min() == x.max():
+        v = x[0] if len(x) else 0.0
+        return np.array([v, v]), np.array([1.0, 1.0])
+    if bandwidth is None:
+        q1, q3 = np.percentile(x, [25, 75])
+        s = min(x.std(ddof=1), (q3 - q1) / 1.349) or x.std(ddof=1)
+        bandwidth = 1.059 * s * len(x) ** -0.2
+    h = float(bandwidth)
+    lo, hi = x.min() - 2*h, x.max() + 2*h
+    fine = max(points * 4, 1024)
+    counts, edges = np.histogram(x, fine, (lo, hi))
+    centers = (edges[:-1] + edges[1:]) / 2
+    grid = np.linspace(lo, hi, points)
+    w = np.exp(-0.5 * ((grid[:, None] - centers[None, :]) / h) ** 2) @ counts
+    return grid, w / (len(x) * h * np.sqrt(2 * np.pi))
+
+def lttb(x, y, n):
+    """Indices of the Largest-Triangle-Three-Buckets downsample of (x, y) to `n` points.
+
+    Keeps the first and last points; for every bucket in between, picks the point
+    forming the largest triangle with the previous pick and the next bucket's mean,
+    so peaks and troughs survive. The global maximum and minimum of y are always
+    kept (for n ≥ 4): their bucket picks them, and if both fall in one bucket the
+    previous bucket gives up its point. Non-finite y values are skipped. x may be
+    datetimes.
+    """
+    x = np.asarray(x)
+    x = (x.astype("datetime64[ns]").astype(np.int64) if np.issubdtype(x.dtype, np.datetime64)
+         else x).astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    idx = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if n >= len(idx) or n < 3:
+        return idx
+    x, y = x[idx], y[idx]
+    bounds = np.linspace(1, len(x) - 1, n - 1).astype(int)        # n-2 interior buckets
+    ext = sorted({int(y.argmax()), int(y.argmin())} - {0, len(x) - 1})
+    keep, a, skip = [0], 0, False
+    for b in range(n - 2):
+        if skip:                                                   # gave its point to the extremes
+            skip = False
+            continue
+        s, e = bounds[b], bounds[b + 1]
+        hit = [i for i in ext if s <= i < e]
+        if len(hit) == 2:
+            if len(keep) > 1:
+                keep.pop()
+            elif b + 1 < n - 2:
+                skip = True
+            else:
+                hit = hit[:1]
+        if hit:
+            keep.extend(hit)
+            a = hit[-1]
+            continue
+        ns, ne = e, bounds[b + 2] if b + 2 < len(bounds) else len(x)
+        mx, my = x[ns:ne].mean(), y[ns:ne].mean()
+        area = np.abs((x[a] - mx) * (y[s:e] - y[a]) - (x[a] - x[s:e]) * (my - y[a]))
+        a = s + int(area.argmax())
+        keep.append(a)
+    keep.append(len(x) - 1)
+    return idx[keep]
+
+def thin(x, y, n, by=None, seed=0):
+    """Indices (sorted) of at most `n` scatter points chosen density-preservingly.
+
+    Points are gridded into ≈n/4 cells (per `by` group): every occupied cell keeps at
+    least one point, so sparse tails and minority groups stay visible, and the
+    remaining budget is shared in proportion to cell counts, so dense regions keep
+    their relative weight. The points at the minimum and maximum of x and of y in
+    each group are always kept, so the plotted range matches the data's. A fixed
+    seed makes the choice stable between renders.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    N = len(x)
+    if N <= n:
+        return np.arange(N)
+    g = max(1, int(np.sqrt(n / 4)))
+    def cell(v):
+        lo, span = np.nanmin(v), np.nanmax(v) - np.nanmin(v)
+        return np.zeros(len(v), dtype=np.int64) if not span else \
+               np.clip(((v - lo) / span * g).astype(np.int64), 0, g - 1)
+    key = cell(x) * g + cell(y)
+    codes = np.zeros(N, dtype=np.int64)
+    if by is not None:
+        codes = np.unique(np.asarray(by), return_inverse=True)[1].astype(np.int64).ravel()
+        key = key + codes * g * g
+    pin = np.zeros(N, dtype=bool)                                 # per-group extremes of x and y
+    for c in np.unique(codes):
+        rows = np.flatnonzero(codes == c)
+        for v in (x[rows], y[rows]):
+            if np.isfinite(v).any():
+                pin[rows[np.nanargmin(v)]] = pin[rows[np.nanargmax(v)]] = True
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(N), ~pin, key))                # pinned points first in their cell
+    cells, start, counts = np.unique(key[order], return_index=True, return_counts=True)
+    need = np.maximum(np.add.reduceat(pin[order].astype(np.int64), start), 1)
+    m = max(n - int(need.sum()), 0)                               # budget left after the pinned / one per cell
+    share = (counts - 1) * (m / max(N - len(cells), 1))
+    extra = np.floor(share).astype(np.int64)
+    extra[np.argsort(extra - share)[:m - extra.sum()]] += 1       # largest remainders
+    quota = np.maximum(1 + extra, need)
+    which = np.repeat(np.arange(len(cells)), counts)
+    rank = np.arange(N) - start[which]
+    return np.sort(order[rank < quota[which]])
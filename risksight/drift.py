@@ -0,0 +1,219 @@
+"""
+RiskSight Pro — drift and data-quality monitoring
+Fixed-memory histograms of what a scoring API receives, compared with the
+frame its model was trained on:
+
+* bins per feature (and per predicted score) come from the reference column:
+  its quantiles, or the midpoints between its values when it has only a few
+  (flags, one-hot columns, counts), plus one bin below and one above the
+  training range, so out-of-range inputs are counted, not clipped;
+* the rolling window is a ring of `slots` count vectors, each covering
+  window / slots seconds, with a running total; a slot that falls out of the
+  window is subtracted and cleared, so memory never grows with traffic;
+* observing a record is one comparison against every feature's edges and one
+  scatter-add into the current slot — constant cost per record, independent of
+  the window and of the reference size;
+* PSI = Σ (w − r)·ln(w / r) over bin shares (floored at EPS) and KS = the
+  largest gap between the binned CDFs, the latter with its 95% critical value
+  for the window and reference sizes.
+
+Records a scoring API rejects (missing or non-numeric fields) are counted as
+`rejected` in the same window. Each slot carries the time step it counts, so a
+stale slot is recognised (and cleared on its next write) without a clock
+thread. Given a `shared` directory, each process keeps its ring in a file there
+(`<bins fingerprint>/<pid>.ring`, memory-mapped) and reports sum the live slots
+of every ring with the same bins, so all gunicorn workers report the traffic of
+the whole server. Rings of processes that have exited are removed once their
+slots expire.
+"""
+
+import os, time, hashlib, threading
+import numpy as np
+
+BINS   = 10                 # quantile bins per feature inside the training range
+WINDOW = 3600               # seconds
+SLOTS  = 12
+EPS    = 1e-4               # floor on bin shares in PSI (empty bins)
+MIN_RECORDS = 100           # below this a window reports "insufficient"
+PSI_WARN, PSI_ALERT = 0.1, 0.25
+SCORE  = "score"
+
+def edges(ref, bins=BINS):
+    """Bin edges for one reference column: [min, inner..., just above max]."""
+    v = np.asarray(ref, dtype=np.float64)
+    u = np.unique(v)
+    if len(u) <= bins:
+        inner = (u[:-1] + u[1:]) / 2
+    else:
+        inner = np.unique(np.quantile(v, np.linspace(0, 1, bins + 1)[1:-1]))
+    return np.concatenate([[u[0]], inner[(inner > u[0]) & (inner < u[-1])], [np.nextafter(u[-1], np.inf)]])
+
+def psi(w, r):
+    w, r = np.maximum(w, EPS), np.maximum(r, EPS)
+    return float(np.sum((w - r) * np.log(w / r)))
+
+def ks(w, r):
+    return float(np.abs(np.cumsum(w) - np.cumsum(r)).max())
+
+def status(psi_, n):
+    if n < MIN_RECORDS:
+        return "insufficient"
+    return "drift" if psi_ >= PSI_ALERT else "warning" if psi_ >= PSI_WARN else "stable"
+
+def columns(report):
+    """(name, stats) of every column in a report, the score last."""
+    return [*report["features"].items(), (SCORE, report["score"])]
+
+class Monitor:
+    """Rolling-window histograms of one model's inputs and scores against its reference.
+
+    `names` label the columns of `ref` (rows × features, as the model reads
+    them) and `scores` are the model's predictions on those rows. `shared` is a
+    directory where the processes serving the same model pool their windows.
+    """
+
+    def __init__(self, names, ref, scores, window=WINDOW, slots=SLOTS, bins=BINS, shared=None):
+        ref = np.column_stack([np.asarray(ref, dtype=np.float64), np.asarray(scores, dtype=np.float64)])
+        if not len(ref):
+            raise ValueError("empty reference")
+        self.names  = list(names) + [SCORE]
+        self.window, self.slots = window, slots
+        self.edges  = [edges(ref[:, j], bins) for j in range(ref.shape[1])]
+        self.nedge  = np.array([len(e) for e in self.edges])
+        self.size   = self.nedge + 1                                 # below, inner bins, above
+        self.offset = np.concatenate([[0], np.cumsum(self.size)[:-1]])
+        self._E = np.full((len(self.edges), self.nedge.max()), np.inf)
+        for j, e in enumerate(self.edges):
+            self._E[j, :len(e)] = e
+        self.ref_rows = len(ref)
+        self.ref = self._bins(ref) / len(ref)
+        self.width = window / slots
+        self.shared = None
+        if shared:
+            fp = hashlib.sha1(np.concatenate([self.ref, *self.edges]).tobytes()).hexdigest()[:16]
+            self.shared = os.path.join(shared, fp)
+            os.makedirs(self.shared, exist_ok=True)
+        self._others = {}                                            # file -> read-only map of another ring
+        self._pid   = None
+        self._lock  = threading.Lock()
+        self._own()
+
+    def _own(self):
+        """This process's ring: [time step, bins..., records, rejected] per slot (a fresh one after fork)."""
+        if self._pid == os.getpid():
+            return self._ring
+        self._pid, shape = os.getpid(), (self.slots, self.size.sum() + 3)
+        if self.shared:
+            f = os.path.join(self.shared, f"{self._pid}.ring")
+            mode = "r+" if os.path.exists(f) else "w+"               # another monitor here already made it
+            self._ring = np.memmap(f, np.int64, mode, shape=shape)
+            self._others = {}
+        else:
+            self._ring = np.zeros(shape, dtype=np.int64)
+        return self._ring
+
+    def _rings(self):
+        """Every ring counted in a report: this process's, and with `shared` the other processes' too."""
+        own = self._own()
+        if not self.shared:
+            return [own]
+        mine, out = f"{self._pid}.ring", [own]
+        for f in os.listdir(self.shared):
+            if f == mine or not f.endswith(".ring"):
+                continue
+            if f not in self._others:
+                try:
+                    self._others[f] = np.memmap(os.path.join(self.shared, f), np.int64, "r", shape=own.shape)
+                except (OSError, ValueError):
+                    continue                                         # still being created, or gone
+            out.append(self._others[f])
+        return out
+
+    def _counts(self, now):
+        """Sum of the slots inside the window across rings; rings of exited processes that hold
+        nothing live any more are deleted."""
+        t = int(now // self.width)
+        c = np.zeros(self.size.sum() + 2, dtype=np.int64)
+        for ring in self._rings():
+            live = (ring[:, 0] > t - self.slots) & (ring[:, 0] <= t)
+            c += ring[live, 1:].sum(0)
+            if not live.any() and ring is not self._ring:
+                self._reap(ring)
+        return c, t
+
+    def _reap(self, ring):
+        f = os.path.basename(ring.filename)
+        try:
+            os.kill(int(f.split(".")[0]), 0)
+            return                                                   # idle, not gone
+        except ProcessLookupError:
+            pass
+        except (OSError, ValueError):
+            return
+        self._others.pop(f, None)
+        try:
+            os.unlink(ring.filename)
+        except OSError:
+            pass
+
+    def _index(self, X):
+        """Flat bin index of every value of X (rows × columns)."""
+        i = np.minimum((X[:, :, None] >= self._E).sum(2), self.nedge)
+        return i + self.offset
+
+    def _bins(self, X):
+        return np.bincount(self._index(X).ravel(), minlength=self.size.sum()).astype(np.float64)
+
+    def observe(self, X, scores, rejected=0, now=None):
+        """Count rows X (valid records, model columns) scored `scores`, plus `rejected` invalid ones."""
+        X = np.asarray(X, dtype=np.float64)
+        idx = self._index(np.column_stack([X, scores])) if len(X) else None
+        t = int((time.time() if now is None else now) // self.width)
+        with self._lock:
+            s = self._own()[t % self.slots]
+            if s[0] != t:                                            # a slot left over from an earlier window
+                s[1:] = 0
+                s[0] = t
+            s = s[1:]
+            if idx is not None:
+                if len(X) == 1:
+                    s[idx[0]] += 1
+                else:
+                    s += np.bincount(idx.ravel(), minlength=len(s))
+            s[-2:] += (len(X), rejected)
+
+    def version(self, now=None):
+        """Changes whenever a report could: records observed (by any process sharing the rings) or
+        the window moved."""
+        with self._lock:
+            c, t = self._counts(time.time() if now is None else now)
+        return f"{int(c[-2] + c[-1])}.{t}"
+
+    def report(self, now=None):
+        """{records, rejected, status, features: {name: {psi, ks, ks_critical, out_of_range, status}},
+        score: {..., edges, reference, window}} for the current window (statistics None while it is
+        empty); status is the worst across columns."""
+        with self._lock:
+            c, _ = self._counts(time.time() if now is None else now)
+        n, rejected = int(c[-2]), int(c[-1])
+        crit = 1.358 * np.sqrt((n + self.ref_rows) / (n * self.ref_rows)) if n else None   # KS, α = 0.05
+        cols = {}
+        for name, off, size in zip(self.names, self.offset, self.size):
+            if not n:
+                cols[name] = {"psi": None, "ks": None, "ks_critical": None, "out_of_range": None,
+                              "status": "insufficient"}
+                continue
+            w, r = c[off:off + size] / n, self.ref[off:off + size]
+            p = psi(w, r)
+            cols[name] = {"psi": round(p, 4), "ks": round(ks(w, r), 4), "ks_critical": round(float(crit), 4),
+                          "out_of_range": round(float(w[0] + w[-1]), 4), "status": status(p, n)}
+        score = cols.pop(SCORE)
+        off, size = self.offset[-1], self.size[-1]
+        score.update(edges=self.edges[-1].round(4).tolist(), reference=self.ref[off:off + size].round(4).tolist(),
+                     window=(c[off:off + size] / max(n, 1)).round(4).tolist())
+        order = ("insufficient", "stable", "warning", "drift")
+        worst = max([score["status"]] + [f["status"] for f in cols.values()], key=order.index)
+        return {"records": n, "rejected": rejected,
+                "rejected_rate": round(rejected / (n + rejected), 4) if n + rejected else None,
+                "window_seconds": self.window, "reference_rows": self.ref_rows,
+                "status": worst, "features": cols, "score": score}
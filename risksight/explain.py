@@ -0,0 +1,76 @@
+"""
+RiskSight Pro — per-prediction explanations
+Feature attributions that add up exactly to each score, vectorised over a batch:
+
+* tree ensembles (RandomForest / GradientBoosting / HistGradientBoosting) —
+  Saabas path attribution on the flat node arrays of risksight.compiled: each
+  split on a row's path credits its feature with the change in node value, so
+  bias (the root values) + Σ contributions is the ensemble output. All rows ×
+  all trees advance one level per step, like the compiled predict kernel.
+* logistic models — the exact linear terms w_j·(x_j − μ_j)/σ_j.
+
+Random forests are explained in probability space, boosted and logistic models
+in log-odds (their additive space). Features are the raw model columns, since
+the compiled trees fold the scaler into their thresholds.
+"""
+
+import numpy as np
+from risksight.compiled import TreeEnsemble, compile_model, CHUNK
+
+def tree_contributions(ens, X):
+    """(bias, contributions n×features) of a TreeEnsemble on raw feature matrix X."""
+    X = np.asarray(X, dtype=np.float64)
+    n, nf = X.shape
+    T = len(ens.roots)
+    out = np.zeros((n, nf))
+    for s in range(0, n, CHUNK):
+        xb = X[s:s+CHUNK]; m = len(xb)
+        node = np.broadcast_to(ens.roots, (m, T)).copy()
+        flat, base = xb.ravel(), (np.arange(m) * nf)[:, None]
+        acc = np.zeros(m * nf)
+        for _ in range(ens.depth):
+            f   = ens.feature[node]
+            nxt = np.where(flat[base + f] <= ens.threshold[node], ens.left[node], ens.right[node])
+            acc += np.bincount((base + f).ravel(), (ens.value[nxt] - ens.value[node]).ravel(), m * nf)
+            node = nxt
+        out[s:s+m] = acc.reshape(m, nf)
+    bias = float(ens.value[ens.roots].sum())
+    if ens.kind == "mean":
+        return np.full(n, bias / T), out / T
+    return np.full(n, ens.bias + bias), out
+
+def linear_contributions(scaler, model, X):
+    """(bias, contributions) in log-odds of a linear classifier on scaler-transformed X."""
+    X = np.asarray(X, dtype=np.float64)
+    w = np.asarray(model.coef_[0], dtype=np.float64)
+    Z = X if scaler is None else scaler.transform(X)
+    return np.full(len(X), float(model.intercept_[0])), Z * w
+
+class Explainer:
+    """Attributions for one (scaler, model) pair as the scoring API uses it.
+
+    Accepts an already compiled TreeEnsemble (scaler None), compiles tree
+    models itself (kernel only, no sklearn fallback) and explains anything
+    with `coef_` linearly. `cost` is the work per row (node visits or terms),
+    for budgeting a request.
+    """
+
+    def __init__(self, scaler, model):
+        if hasattr(model, "coef_"):
+            self.kind, self.scaler, self.model = "linear", scaler, model
+            self.cost, self.space = model.coef_.shape[1], "log_odds"
+            return
+        ens = model if isinstance(model, TreeEnsemble) else compile_model(scaler, model, max_rows=None)
+        self.kind, self.scaler, self.model = "tree", None, ens
+        self.cost  = len(ens.roots) * max(ens.depth, 1)
+        self.space = "probability" if ens.kind == "mean" else "log_odds"
+
+    def explain(self, X):
+        """(score, bias, contributions) for every row of raw feature matrix X."""
+        if self.kind == "linear":
+            bias, c = linear_contributions(self.scaler, self.model, X)
+        else:
+            bias, c = tree_contributions(self.model, X)
+        total = bias + c.sum(1)
+        score = total if self.space == "probability" else 1.0 / (1.0 + np.exp(-total))
+        return score, bias, c
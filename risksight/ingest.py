@@ -0,0 +1,248 @@
+"""
+RiskSight Pro — streaming data sources
+Reads loan books, transaction logs and policy files (CSV, CSV.gz or Parquet)
+in typed chunks, folds the dashboard aggregates as it goes and keeps only a
+bounded reservoir sample for row-level charts — the full frame never has to
+sit in worker memory.
+
+    python -m risksight.ingest export DIR [--format csv|parquet] [--scale 100]
+    python -m risksight.ingest scan PATH --dataset credit|fraud|insurance
+"""
+
+import os, sys, time, argparse
+import numpy as np, pandas as pd
+
+from risksight.aggregates import AggStore
+
+CHUNK  = 250_000
+SAMPLE = 20_000
+
+CATS = {
+    "purpose":     ["Mortgage","Auto","Personal","Business"],
+    "region":      ["North","South","East","West"],
+    "channel":     ["Online","POS","ATM","Mobile"],
+    "merch_risk":  ["Low","Medium","High"],
+    "policy_type": ["Basic","Standard","Premium"],
+}
+
+# Column dtypes per dataset; entries in OPTIONAL may be absent (they are derived).
+SCHEMAS = {
+    "credit": {"age":"int16", "income":"int64", "debt_ratio":"float64", "credit_score":"int16",
+               "emp_years":"int16", "loan_amt":"int64", "purpose":"category", "region":"category",
+               "default_prob":"float64", "default":"int8"},
+    "fraud":  {"txn_id":"object", "amount":"float64", "hour":"int8", "merch_risk":"category",
+               "foreign":"int8", "velocity":"int16", "channel":"category", "date":"datetime64[ns]",
+               "fraud_prob":"float64", "fraud":"int8"},
+    "insurance": {"age":"int16", "bmi":"float64", "smoker":"int8", "region":"category",
+                  "children":"int8", "policy_type":"category", "veh_age":"int16",
+                  "claim_amt":"float64", "premium":"float64", "month":"int8"},
+}
+OPTIONAL = {"credit": {"default_prob"}, "fraud": {"fraud_prob", "txn_id"}, "insurance": set()}
+
+# Aggregate views the dashboards read: (group keys, value columns); see risksight.aggregates.
+AGG_SPECS = {
+    "credit": {
+        "total":          ((), ["default","credit_score","debt_ratio","loan_amt","default_prob","el","pd_gt50"]),
+        "grade":          (("risk_grade",), ["default"]),
+        "purpose":        (("purpose",), ["loan_amt","default"]),
+        "region_purpose": (("region","purpose"), ["default"]),
+        "age_dr":         (("age_grp","dr_grp"), ["default_prob"]),
+    },
+    "fraud": {
+        "total":   ((), ["fraud","amount","night_fraud"]),
+        "channel": (("channel",), ["fraud"]),
+        "hour":    (("hour",), ["fraud"]),
+        "flag":    (("fraud",), ["amount"]),
+    },
+    "insurance": {
+        "total":         ((), ["claim_amt","premium","loss_ratio","high_risk","lr_gt1","obese"]),
+        "policy":        (("policy_type",), ["loss_ratio","claim_amt"]),
+        "month":         (("month",), ["claim_amt","loss_ratio"]),
+        "region":        (("region",), ["loss_ratio","claim_amt","premium"]),
+        "region_policy": (("region","policy_type"), ["loss_ratio"]),
+        "smoker":        (("smoker",), ["claim_amt"]),
+    },
+}
+
+# Value columns that also keep per-group quantile sketches (risksight.sketch): medians and tails
+# over every row, including file-backed books whose frame is only a sample.
+AGG_QUANTILES = {
+    "insurance": {"total": ["claim_amt","loss_ratio"], "policy": ["loss_ratio","claim_amt"]},
+}
+
+AGE_BINS = ([20,30,40,50,60,70], ["20s","30s","40s","50s","60s"])
+DR_BINS  = ([0,.2,.4,.6,.8,1], ["0-20%","20-40%","40-60%","60-80%","80-100%"])
+ORDERS   = {"risk_grade": ["F","D","C","B","A"], "age_grp": AGE_BINS[1], "dr_grp": DR_BINS[1]}
+
+def store(dataset):
+    """An empty AggStore with the dashboard views for `dataset`."""
+    return AggStore(AGG_SPECS[dataset], ORDERS, AGG_QUANTILES.get(dataset))
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  CHUNK READERS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _dtype(col, t):
+    return pd.CategoricalDtype(CATS[col]) if t == "category" else t
+
+def _coerce(df, dataset):
+    """Enforce the schema on a raw chunk (column subset, dtypes, fixed categories)."""
+    schema, opt = SCHEMAS[dataset], OPTIONAL[dataset]
+    missing = [c for c in schema if c not in df.columns and c not in opt]
+    if missing:
+        raise ValueError(f"{dataset}: missing columns {missing}")
+    out = {}
+    for c, t in schema.items():
+        if c in df.columns:
+            s = df[c]
+            out[c] = pd.to_datetime(s) if t.startswith("datetime") else s.astype(_dtype(c, t), copy=False)
+            if t == "category" and s.isna().any():
+                raise ValueError(f"{dataset}.{c}: missing values in {s.isna().sum()} rows (expected {CATS[c]})")
+            if t == "category" and out[c].isna().any():
+                bad = sorted(set(s.dropna().astype(str)) - set(CATS[c]))
+                raise ValueError(f"{dataset}.{c}: unknown categories {bad[:5]} (expected {CATS[c]})")
+    return pd.DataFrame(out)
+
+def iter_chunks(src, dataset, chunksize=CHUNK):
+    """Typed DataFrame chunks from a CSV / CSV.gz / Parquet path or an in-memory frame."""
+    if dataset not in SCHEMAS:
+        raise ValueError(f"unknown dataset {dataset!r}")
+    if isinstance(src, pd.DataFrame):
+        for s in range(0, len(src), chunksize):
+            yield prepare(_coerce(src.iloc[s:s+chunksize], dataset), dataset)
+        return
+    path = os.fspath(src)
+    if path.endswith((".parquet", ".pq")):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("reading Parquet needs pyarrow (pip install pyarrow)") from None
+        f    = pq.ParquetFile(path)
+        cols = [c for c in SCHEMAS[dataset] if c in f.schema_arrow.names]
+        for batch in f.iter_batches(batch_size=chunksize, columns=cols):
+            yield prepare(_coerce(batch.to_pandas(), dataset), dataset)
+    else:
+        schema = SCHEMAS[dataset]
+        head   = pd.read_csv(path, nrows=0).columns
+        dt     = {c: _dtype(c, t) for c, t in schema.items() if c in head and not t.startswith("datetime")}
+        dates  = [c for c, t in schema.items() if c in head and t.startswith("datetime")]
+        for df in pd.read_csv(path, chunksize=chunksize, dtype=dt, parse_dates=dates,
+                              usecols=[c for c in schema if c in head]):
+            yield prepare(_coerce(df, dataset), dataset)
+
+def prepare(df, dataset):
+    """Add the derived columns the dashboards and aggregates use (per chunk, vectorised)."""
+    if dataset == "credit":
+        if "default_prob" not in df:                       # no score in the file: observed outcome
+            df["default_prob"] = df["default"].astype("float64")
+        df["risk_grade"] = pd.cut(df.credit_score, [300,580,670,740,800,850], labels=["F","D","C","B","A"])
+        df["age_grp"]    = pd.cut(df.age, AGE_BINS[0], labels=AGE_BINS[1])
+        df["dr_grp"]     = pd.cut(df.debt_ratio, DR_BINS[0], labels=DR_BINS[1])
+        df["el"]         = df.default_prob * df.loan_amt
+        df["pd_gt50"]    = (df.default_prob > .5).astype("int8")
+    elif dataset == "fraud":
+        if "fraud_prob" not in df:
+            df["fraud_prob"] = df["fraud"].astype("float64")
+        df["night_fraud"] = ((df.hour < 5) & (df.fraud == 1)).astype("int8")
+    elif dataset == "insurance":
+        df["loss_ratio"] = np.round(df.claim_amt / df.premium, 3)
+        df["high_risk"]  = ((df.smoker == 1) | (df.bmi > 35) | (df.age > 60)).astype("int8")
+        df["lr_gt1"]     = (df.loss_ratio > 1).astype("int8")
+        df["obese"]      = (df.bmi > 35).astype("int8")
+    return df
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  STREAMING AGGREGATION (AggStore) + RESERVOIR SAMPLE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class Reservoir:
+    """Uniform fixed-size sample over a stream of chunks.
+
+    Bottom-k sampling: every row draws a uniform key and the `size` smallest keys
+    survive, so a chunk only costs one vectorised compare against the current
+    threshold and dtypes/categoricals are preserved.
+    """
+
+    def __init__(self, size=SAMPLE, seed=42):
+        self.size, self.rng, self.df, self.keys = size, np.random.default_rng(seed), None, np.empty(0)
+
+    def update(self, df):
+        keys = self.rng.random(len(df))
+        if len(self.keys) >= self.size:
+            hit = keys < self.keys.max()
+            df, keys = df[hit], keys[hit]
+        if len(df):
+            df   = df if self.df is None else pd.concat([self.df, df])
+            keys = np.concatenate([self.keys, keys])
+            if len(keys) > self.size:
+                keep = np.sort(np.argpartition(keys, self.size - 1)[:self.size])
+                df, keys = df.iloc[keep], keys[keep]
+            self.df, self.keys = df, keys
+        return self
+
+    def frame(self):
+        return self.df.reset_index(drop=True)
+
+class Loaded:
+    """Result of streaming one dataset: AggStore, bounded sample, row count, timing."""
+    def __init__(self, aggs, sample, rows, seconds):
+        self.aggs, self.sample, self.rows, self.seconds = aggs, sample, rows, seconds
+
+def load(src, dataset, chunksize=CHUNK, sample=SAMPLE, seed=42):
+    """Stream `src` once: aggregates over every row + a `sample`-row reservoir."""
+    t0 = time.perf_counter()
+    agg, res, rows = store(dataset), Reservoir(sample, seed), 0
+    for df in iter_chunks(src, dataset, chunksize):
+        agg.update(df); res.update(df)
+        rows += len(df)
+    df = res.frame()
+    if dataset == "fraud" and "txn_id" not in df:
+        df.insert(0, "txn_id", [f"TXN{i:06d}" for i in range(len(df))])
+    return Loaded(agg, df, rows, time.perf_counter() - t0)
+
+def aggregate(src, dataset, chunksize=CHUNK, into=None):
+    """AggStore over `src` (no sample) — for in-memory frames and appended batches."""
+    agg = store(dataset) if into is None else into
+    for df in iter_chunks(src, dataset, chunksize):
+        agg.update(df)
+    return agg
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  CLI
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def main(argv=None):
+    from risksight.data import synthetic
+    ap  = argparse.ArgumentParser(prog="python -m risksight.ingest", description=__doc__.split("\n")[1])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    e = sub.add_parser("export", help="write the synthetic datasets as files (a local stand-in for real books)")
+    e.add_argument("dir")
+    e.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    e.add_argument("--scale", type=int, default=1, help="replicate rows N times")
+    s = sub.add_parser("scan", help="stream a file and print its aggregates")
+    s.add_argument("path")
+    s.add_argument("--dataset", required=True, choices=list(SCHEMAS))
+    s.add_argument("--chunksize", type=int, default=CHUNK)
+    a = ap.parse_args(argv)
+
+    if a.cmd == "export":
+        os.makedirs(a.dir, exist_ok=True)
+        cr, fd, ins, _ = synthetic()
+        for name, df in (("credit", cr), ("fraud", fd), ("insurance", ins)):
+            df = df[[c for c in SCHEMAS[name] if c in df]]
+            if a.scale > 1:
+                df = pd.concat([df] * a.scale, ignore_index=True)
+            path = os.path.join(a.dir, f"{name}.{a.format}")
+            df.to_csv(path, index=False) if a.format == "csv" else df.to_parquet(path, index=False)
+            print(f"{path}: {len(df):,} rows")
+    else:
+        r = load(a.path, a.dataset, a.chunksize)
+        print(f"{r.rows:,} rows in {r.seconds:.2f}s ({r.rows/max(r.seconds,1e-9):,.0f} rows/s); "
+              f"sample {len(r.sample):,} rows, {r.sample.memory_usage(deep=True).sum()/2**20:.1f} MiB")
+        for name in AGG_SPECS[a.dataset]:
+            f = r.aggs.frame(name)
+            print(f"\n[{name}]\n{f[['n'] + [c for c in f if c.endswith(('_sum','_mean'))]].to_string(max_rows=30)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+RiskSight Pro — shared change journal
+An ordered log of the changes the API accepts after startup (appended records,
+loan upserts, online-learning feedback), kept next to the dataset snapshot so
+every gunicorn worker applies the same changes in the same order and their
+aggregates, loan book and learners agree whichever worker answers.
+
+Entries are pickled files <root>/<seq>.pkl numbered from 1. A writer finishes
+its entry in a temp file and claims the next free number by hard-linking it to
+that name: os.link fails if the name exists, so two writers never share a
+number and a reader never sees a partly written entry. Readers apply entries
+in number order from the last one they applied; a worker forked later replays
+the whole log. Entries are validated before they are written, so applying one
+cannot fail halfway.
+"""
+
+import os, pickle, tempfile
+
+def _path(root, seq):
+    return os.path.join(root, f"{seq:012d}.pkl")
+
+def append(root, entry, after=0):
+    """Write `entry` under the first free number above `after`; returns that number."""
+    os.makedirs(root, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=root, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        seq = after + 1
+        while True:
+            try:
+                os.link(tmp, _path(root, seq))
+                return seq
+            except FileExistsError:
+                seq += 1
+    finally:
+        os.unlink(tmp)
+
+def pending(root, after):
+    """True when entry after + 1 exists (one stat — cheap enough for every request)."""
+    return os.path.exists(_path(root, after + 1))
+
+def entries(root, after=0):
+    """(seq, entry) for the consecutive entries after `after`, in order."""
+    seq = after + 1
+    while True:
+        try:
+            with open(_path(root, seq), "rb") as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return
+        yield seq, entry
+        seq += 1
@@ -0,0 +1,159 @@
+"""
+RiskSight Pro — metrics
+Process-local counters and latency histograms rendered in the Prometheus text
+exposition format (GET /metrics). Recording a sample is a perf_counter pair,
+a bisect into fixed buckets and a few increments under a lock, so the
+instrumentation stays on in production.
+
+Every process keeps its own series: behind gunicorn each scrape reports the
+worker that answered it, identified by the `pid` label on the process gauges.
+"""
+
+import os, time, bisect, threading
+
+BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _esc(v):
+    return str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _labels(names, values, extra=""):
+    pairs = [f'{n}="{_esc(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _num(v):
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+class _Timer:
+    __slots__ = ("h", "labels", "t0")
+
+    def __init__(self, h, labels):
+        self.h, self.labels = h, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.h.observe(time.perf_counter() - self.t0, *self.labels)
+
+class Histogram:
+    """Cumulative latency buckets (seconds) per label combination."""
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=BUCKETS):
+        self.name, self.help, self.labelnames, self.buckets = name, help, tuple(labels), tuple(buckets)
+        self._series, self._lock = {}, threading.Lock()     # labels → [bucket counts..., sum, count]
+
+    def observe(self, value, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def time(self, *labels):
+        """Context manager observing the block's wall time."""
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for labels, s in sorted(series.items()):
+            acc = 0
+            for le, c in zip(self.buckets + ("+Inf",), s):
+                acc += c
+                bound = f'le="{le}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, bound)} {acc}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_num(s[-2])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {s[-1]}"
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self._series, self._lock = {}, threading.Lock()
+
+    def inc(self, n=1, *labels):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + n
+
+    def samples(self):
+        with self._lock:
+            series = dict(self._series)
+        for labels, v in sorted(series.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_num(v)}"
+
+class Collected:
+    """Series computed at scrape time: fn() → iterable of ({label: value}, number)."""
+
+    def __init__(self, name, help, kind, fn):
+        self.name, self.help, self.kind, self.fn = name, help, kind, fn
+
+    def samples(self):
+        for labels, v in self.fn():
+            yield f"{self.name}{_labels(labels.keys(), labels.values())} {_num(v)}"
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, m):
+        self.metrics.append(m)
+        return m
+
+    def histogram(self, name, help, labels=(), buckets=BUCKETS):
+        return self.add(Histogram(name, help, labels, buckets))
+
+    def counter(self, name, help, labels=()):
+        return self.add(Counter(name, help, labels))
+
+    def collect(self, name, help, fn, kind="gauge"):
+        return self.add(Collected(name, help, kind, fn))
+
+    def render(self):
+        out = []
+        for m in self.metrics:
+            out.append(f"# HELP {m.name} {m.help}")
+            out.append(f"# TYPE {m.name} {m.kind}")
+            out.extend(m.samples())
+        return "\n".join(out) + "\n"
+
+def process_stats():
+    """Resident / peak memory (bytes), CPU seconds and thread count of this process."""
+    pid = os.getpid()
+    rss = None
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024      # KiB on Linux
+    except ImportError:                 # not on Windows
+        peak = None
+    t = os.times()
+    return {"pid": pid, "rss": rss, "peak_rss": peak, "cpu": t.user + t.system,
+            "threads": threading.active_count()}
+
+def add_process_metrics(reg, prefix="risksight_process"):
+    """Register process memory / CPU / thread gauges on `reg` (stats read at most once a second)."""
+    snap = {"at": -1.0}
+    def stat(key):
+        def fn():
+            now = time.monotonic()
+            if now - snap["at"] > 1:
+                snap.update(process_stats(), at=now)
+            return [] if snap.get(key) is None else [({"pid": snap["pid"]}, snap[key])]
+        return fn
+    reg.collect(f"{prefix}_resident_memory_bytes", "Resident set size.", stat("rss"))
+    reg.collect(f"{prefix}_peak_memory_bytes", "Peak resident set size.", stat("peak_rss"))
+    reg.collect(f"{prefix}_cpu_seconds_total", "User + system CPU time.", stat("cpu"), "counter")
+    reg.collect(f"{prefix}_threads", "Live Python threads.", stat("threads"))
@@ -0,0 +1,97 @@
+"""
+RiskSight Pro — online model updates
+Incremental learners for the fraud and underwriting scoring APIs: a
+StandardScaler whose running mean / variance are updated with partial_fit and
+an SGD logistic regression updated with partial_fit on labeled feedback
+batches. Boosted trees cannot learn incrementally, so the fraud learner is a
+linear model seeded on the training frame next to the published GBM.
+
+Every update is applied to a copy of the current (scaler, model) pair and
+published by replacing one reference, so in-flight requests finish on the pair
+they started with and readers never take a lock; updates are serialized.
+When the scaler statistics move, the coefficients are rebased onto them first,
+so a batch changes predictions only through what the model learns from it.
+
+Feedback batches reach the learners through the app's change journal
+(risksight.journal), so every gunicorn worker applies the same batches in the
+same order and serves the same version; updates are deterministic for that.
+"""
+
+import copy, time, threading
+from collections import deque
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import log_loss
+from sklearn.preprocessing import StandardScaler
+
+LABELS = {"fraud": "fraud", "underwriting": "high_risk"}     # task → label field in feedback records
+
+def _rebase(model, mu, sd, mu2, sd2):
+    """Re-express a linear model fitted on (x-mu)/sd for inputs scaled by (x-mu2)/sd2, unchanged."""
+    w = model.coef_[0]
+    model.intercept_ = model.intercept_ + np.sum(w * (mu2 - mu) / sd)
+    model.coef_ = (w * sd2 / sd)[None, :]
+
+class OnlineLearner:
+    """Running scaler + SGD logistic regression for one task, swapped atomically on update."""
+
+    def __init__(self, task, scaler, model, base_version=None, history=100):
+        self.task, self.base_version = task, base_version or "in-process"
+        self.current = (scaler, model, 0)            # (scaler, model, updates) — replaced, never mutated
+        self.history = deque(maxlen=history)
+        self.rows, self.seconds = 0, 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def seed(cls, task, X, y, scaler=None, base=None, base_version=None, eta0=0.01, alpha=1e-4):
+        """Learner fitted on (X, y); starts from `base`'s coefficients when it is linear."""
+        X = np.asarray(X, dtype=np.float64)
+        scaler = copy.deepcopy(scaler) if scaler is not None else StandardScaler().fit(X)
+        model = SGDClassifier(loss="log_loss", alpha=alpha, learning_rate="constant", eta0=eta0,
+                              random_state=42)
+        init = ({"coef_init": np.array(base.coef_), "intercept_init": np.array(base.intercept_)}
+                if hasattr(base, "coef_") else {})          # copies: published arrays are read-only mmaps
+        model.fit(scaler.transform(X), np.asarray(y), **init)
+        return cls(task, scaler, model, base_version)
+
+    @property
+    def version(self):
+        return f"{self.base_version}+{self.current[2]}"
+
+    def engine(self):
+        """(scaler, model) to score with — one reference read, consistent for the whole request."""
+        s, m, _ = self.current
+        return s, m
+
+    def snapshot(self):
+        """(scaler, model, version) read together."""
+        s, m, n = self.current
+        return s, m, f"{self.base_version}+{n}"
+
+    def update(self, X, y):
+        """Learn from one labeled batch; returns its record (also kept in `history`)."""
+        X, y = np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.int64)
+        with self._lock:
+            t0 = time.perf_counter()
+            s, m, n = self.current
+            before = m.predict_proba(s.transform(X))[:, 1]       # scored before learning (prequential)
+            s, m = copy.deepcopy(s), copy.deepcopy(m)
+            mu, sd = s.mean_.copy(), s.scale_.copy()
+            s.partial_fit(X)
+            _rebase(m, mu, sd, s.mean_, s.scale_)
+            m.partial_fit(s.transform(X), y, classes=np.array([0, 1]))
+            self.current = (s, m, n + 1)
+            dt = time.perf_counter() - t0
+            self.rows += len(y); self.seconds += dt
+            rec = {"version": self.version, "rows": len(y), "positives": int(y.sum()),
+                   "log_loss_before": round(float(log_loss(y, before, labels=[0, 1])), 4),
+                   "accuracy_before": round(float(((before >= .5) == y).mean()), 4),
+                   "ms": round(dt * 1e3, 3), "us_per_row": round(dt * 1e6 / max(len(y), 1), 2)}
+            self.history.append(rec)
+        return rec
+
+    def stats(self):
+        return {"task": self.task, "version": self.version, "updates": self.current[2],
+                "rows": self.rows, "seconds": round(self.seconds, 4),
+                "us_per_row": round(self.seconds * 1e6 / self.rows, 2) if self.rows else None,
+                "recent": list(self.history)[-10:]}
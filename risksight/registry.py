@@ -0,0 +1,207 @@
+"""
+RiskSight Pro — model registry
+Fits the scalers and models offline, publishes them as versioned on-disk
+artifacts with a manifest, and loads them (memory-mapped) at startup so web
+workers never train.
+
+    python -m risksight.registry train [--keep 3]   # fit + publish a new version
+    python -m risksight.registry train --search     # cross-validated hyperparameters first
+    python -m risksight.registry list               # published versions
+    python -m risksight.registry show [VERSION]     # print a manifest
+    python -m risksight.registry verify [VERSION]   # re-hash artifacts
+"""
+
+import os, sys, json, time, hashlib, shutil, argparse, platform, logging
+from datetime import datetime, timezone
+import joblib, numpy as np, sklearn
+
+from risksight import training
+from risksight.data import synthetic
+
+ROOT    = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ART_DIR = os.environ.get("RISKSIGHT_ARTIFACTS", os.path.join(ROOT, "artifacts"))
+MODELS  = ("scr", "mdl_cr", "sfr", "mdl_fr", "sins", "mdl_ins")
+COLUMNS = ("CR_COLS", "FR_COLS", "INS_COLS")
+LATEST  = "LATEST"
+log     = logging.getLogger(__name__)
+
+class RegistryError(RuntimeError):
+    """No usable artifacts (missing, incomplete or built by another sklearn)."""
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  TRAIN
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def train(cr, fd, ins, choice=None, search=None, n_jobs=None):
+    """Fit the three scaler + model pairs; returns an unpublished bundle dict.
+
+    `choice` maps task → (estimator, params) (default: training.DEFAULTS);
+    `search` is the report of the training.search that produced it.
+    """
+    t0 = time.perf_counter()
+    b, metrics = training.fit(cr, fd, ins, choice, n_jobs=n_jobs)
+    b["version"]  = None
+    b["manifest"] = {"train_seconds": round(time.perf_counter() - t0, 3),
+                     "rows": {"credit": len(cr), "fraud": len(fd), "insurance": len(ins)},
+                     "metrics": metrics}
+    if search:
+        b["manifest"]["search"] = search
+    return b
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  PUBLISH / LOAD
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for blk in iter(lambda: f.read(1 << 20), b""):
+            h.update(blk)
+    return h.hexdigest()
+
+def publish(bundle, root=ART_DIR, keep=None):
+    """Write bundle to <root>/<version>/ and atomically point LATEST at it."""
+    os.makedirs(root, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    tmp   = os.path.join(root, f".tmp-{stamp}-{os.getpid()}")
+    os.makedirs(tmp)
+    arts, digest = {}, hashlib.sha256()
+    for name in MODELS:
+        fn = f"{name}.joblib"
+        joblib.dump(bundle[name], os.path.join(tmp, fn))   # uncompressed → mmap-able
+        sha = _sha256(os.path.join(tmp, fn))
+        digest.update(sha.encode())
+        arts[name] = {"file": fn, "sha256": sha, "bytes": os.path.getsize(os.path.join(tmp, fn)),
+                      "type": type(bundle[name]).__name__}
+    version  = f"v{stamp}-{digest.hexdigest()[:8]}"
+    manifest = {**bundle.get("manifest", {}),
+                "version": version, "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(), "sklearn": sklearn.__version__,
+                "numpy": np.__version__, "columns": {c: bundle[c] for c in COLUMNS},
+                "artifacts": arts}
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(root, version))
+    _write_latest(root, version)
+    if keep:
+        prune(root, keep)
+    return version
+
+def _write_latest(root, version):
+    tmp = os.path.join(root, f".{LATEST}.tmp")
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(root, LATEST))
+
+def versions(root=ART_DIR):
+    """Published versions, oldest first."""
+    if not os.path.isdir(root):
+        return []
+    return sorted(d for d in os.listdir(root)
+                  if d.startswith("v") and os.path.isfile(os.path.join(root, d, "manifest.json")))
+
+def latest(root=ART_DIR):
+    try:
+        with open(os.path.join(root, LATEST)) as f:
+            return f.read().strip()
+    except OSError:
+        vs = versions(root)
+        return vs[-1] if vs else None
+
+def manifest(root=ART_DIR, version=None):
+    version = version or latest(root)
+    if not version:
+        raise RegistryError(f"no published models under {root}")
+    try:
+        with open(os.path.join(root, version, "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise RegistryError(f"unreadable manifest for {version}: {e}") from None
+
+def load(root=ART_DIR, version=None, mmap=True, verify=False):
+    """Load a published bundle; numpy arrays inside the models are memory-mapped."""
+    m = manifest(root, version)
+    if m["sklearn"] != sklearn.__version__:
+        raise RegistryError(f"{m['version']} was built with scikit-learn {m['sklearn']}, "
+                            f"running {sklearn.__version__}")
+    d = os.path.join(root, m["version"])
+    b = {"version": m["version"], "manifest": m, **m["columns"]}
+    for name in MODELS:
+        path = os.path.join(d, m["artifacts"][name]["file"])
+        if verify and _sha256(path) != m["artifacts"][name]["sha256"]:
+            raise RegistryError(f"{m['version']}/{name}: checksum mismatch")
+        try:
+            b[name] = joblib.load(path, mmap_mode="r" if mmap else None)
+        except (OSError, EOFError, ValueError) as e:
+            raise RegistryError(f"{m['version']}/{name}: {e}") from None
+    return b
+
+def load_or_train(cr, fd, ins, root=ART_DIR):
+    """Startup path: load the latest artifacts; train in-process only as a fallback.
+
+    Set RISKSIGHT_REQUIRE_ARTIFACTS=1 to refuse the fallback (e.g. in production).
+    """
+    try:
+        return load(root)
+    except RegistryError as e:
+        if os.environ.get("RISKSIGHT_REQUIRE_ARTIFACTS") == "1":
+            raise
+        log.warning("model artifacts unavailable (%s); training in-process", e)
+        return train(cr, fd, ins)
+
+def prune(root=ART_DIR, keep=3):
+    """Delete all but the newest `keep` versions (never the one LATEST points at)."""
+    cur = latest(root)
+    for v in versions(root)[:-keep]:
+        if v != cur:
+            shutil.rmtree(os.path.join(root, v), ignore_errors=True)
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  CLI
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m risksight.registry", description=__doc__.split("\n")[1])
+    ap.add_argument("--dir", default=ART_DIR, help="artifact root (default: %(default)s)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    t = sub.add_parser("train", help="fit models and publish a new version")
+    t.add_argument("--seed", type=int, default=42)
+    t.add_argument("--keep", type=int, default=3, help="versions to retain (0 = all)")
+    t.add_argument("--search", action="store_true", help="cross-validate training.GRID before fitting")
+    t.add_argument("--folds", type=int, default=5)
+    t.add_argument("--workers", type=int, default=None, help="processes for --search / n_jobs for the final fits "
+                                                             "(default: CPU count)")
+    sub.add_parser("list", help="list published versions")
+    for c in ("show", "verify"):
+        sub.add_parser(c).add_argument("version", nargs="?")
+    a = ap.parse_args(argv)
+
+    if a.cmd == "train":
+        cr, fd, ins, _ = synthetic(a.seed)
+        choice = report = None
+        if a.search:
+            choice, report = training.search(cr, fd, ins, folds=a.folds, workers=a.workers, seed=a.seed)
+            print(f"search: {report['fits']} fits in {report['wall_seconds']:.1f}s "
+                  f"on {report['workers']} workers ({report['serial_seconds']:.1f}s serial)")
+        b = train(cr, fd, ins, choice, report, n_jobs=a.workers or os.cpu_count())
+        for task, m in b["manifest"]["metrics"].items():
+            print(f"  {task:<13} {m['estimator']:<31} held-out auc {m['auc']:.4f}  acc {m['accuracy']:.4f}  "
+                  f"fit {m['fit_seconds']:.2f}s  predict {m['predict_ms']:.2f}ms")
+        v = publish(b, a.dir, keep=a.keep or None)
+        print(f"published {v}  ({b['manifest']['train_seconds']:.2f}s fit) → {a.dir}")
+    elif a.cmd == "list":
+        cur = latest(a.dir)
+        for v in versions(a.dir):
+            print(("* " if v == cur else "  ") + v)
+    elif a.cmd == "show":
+        print(json.dumps(manifest(a.dir, a.version), indent=2))
+    elif a.cmd == "verify":
+        m = load(a.dir, a.version, mmap=False, verify=True)["manifest"]
+        print(f"{m['version']}: {len(MODELS)} artifacts OK")
+    return 0
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except RegistryError as e:
+        sys.exit(f"error: {e}")
@@ -0,0 +1,158 @@
+"""
+RiskSight Pro — record vectorisation & scoring
+Turns JSON payloads (single objects, arrays or NDJSON) into model matrices
+without building per-row DataFrames, so one scaler.transform + predict_proba
+pass scores a whole batch.
+"""
+
+import json
+import numpy as np
+
+CR_FIELDS  = ["age","income","debt_ratio","credit_score","emp_years","loan_amt"]
+FR_FIELDS  = ["amount","hour","foreign","velocity"]
+INS_FIELDS = ["age","bmi","smoker","children","veh_age"]
+MAX_BATCH  = 100_000
+FRAUD_THRESHOLD = 0.25          # fraud_prob above this is flagged
+
+class BatchError(ValueError):
+    """Payload cannot be read as a batch at all (as opposed to a bad record)."""
+
+class _Bad:
+    """Placeholder for an NDJSON line that failed to parse."""
+    __slots__ = ("msg",)
+    def __init__(self, msg): self.msg = msg
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  PARSING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def parse_batch(body, content_type=""):
+    """JSON array, {"records": [...]} or NDJSON → list of records, aligned to input."""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        recs = _parse_ndjson(body)
+    else:
+        try:
+            obj = json.loads(body)
+        except ValueError:
+            recs = _parse_ndjson(body)       # no/odd content-type but line-delimited body
+        else:
+            if isinstance(obj, dict) and "records" in obj:
+                obj = obj["records"]
+            if not isinstance(obj, list):
+                raise BatchError("expected a JSON array, {\"records\": [...]} or NDJSON")
+            recs = obj
+    if len(recs) > MAX_BATCH:
+        raise BatchError(f"batch too large ({len(recs)} > {MAX_BATCH} records)")
+    return recs
+
+def _parse_ndjson(body):
+    recs = []
+    for ln, line in enumerate(body.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            recs.append(json.loads(line))
+        except ValueError as e:
+            recs.append(_Bad(f"line {ln}: invalid JSON ({e.msg})"))
+    if not recs:
+        raise BatchError("empty batch")
+    return recs
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  VECTORISATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _column(recs, key, default):
+    vals = [r.get(key, default) for r in recs]
+    try:
+        col = np.array(vals, dtype=np.float64)
+        if col.ndim == 1:
+            return col
+    except (TypeError, ValueError):
+        pass
+    return np.array([_num(v) for v in vals], dtype=np.float64)       # per value: arrays / objects → NaN
+
+def _num(v):
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return v
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+def vectorize(records, cols, numeric, defaults=None, onehot=None):
+    """Build the model matrix for `records` in column order `cols`.
+
+    numeric  — fields copied as-is into the column of the same name.
+    defaults — optional {field: value} used when a field is missing.
+    onehot   — optional (field, prefix, default) expanded into `{prefix}_{value}` columns.
+
+    Returns (X, ok, errors): X holds the valid rows only, ok their positions in
+    `records`, and errors a list aligned to `records` (None or a message).
+    """
+    defaults = defaults or {}
+    n, errors = len(records), [None]*len(records)
+    for i, r in enumerate(records):
+        if not isinstance(r, dict):
+            errors[i] = r.msg if isinstance(r, _Bad) else "record must be a JSON object"
+    pos  = np.array([i for i in range(n) if errors[i] is None], dtype=np.intp)
+    recs = [records[i] for i in pos]
+    X    = np.zeros((len(recs), len(cols)))
+    bad  = [[] for _ in recs]
+
+    for f in numeric:
+        col = _column(recs, f, defaults.get(f))
+        X[:, cols.index(f)] = col
+        for j in np.flatnonzero(~np.isfinite(col)):
+            bad[j].append(f)
+
+    if onehot is not None:
+        field, prefix, default = onehot
+        lut = {c[len(prefix)+1:]: k for k, c in enumerate(cols) if c.startswith(prefix + "_")}
+        codes = np.array([lut.get(v, -1) if isinstance(v, str) else -1
+                          for v in (r.get(field, default) for r in recs)], dtype=np.intp)
+        hit = codes >= 0
+        X[np.flatnonzero(hit), codes[hit]] = 1
+        for j in np.flatnonzero(~hit):
+            bad[j].append(field)
+
+    keep = np.ones(len(recs), dtype=bool)
+    for j, fields in enumerate(bad):
+        if fields:
+            keep[j] = False
+            errors[pos[j]] = "missing or invalid: " + ", ".join(fields)
+    return X[keep], pos[keep], errors
+
+def credit_matrix(records, cols=CR_FIELDS):
+    return vectorize(records, cols, CR_FIELDS)
+
+def fraud_matrix(records, cols):
+    return vectorize(records, cols, FR_FIELDS, defaults={"velocity": 1},
+                     onehot=("merch_risk", "mr", "Low"))
+
+def underwriting_matrix(records, cols):
+    return vectorize(records, cols, INS_FIELDS, onehot=("region", "r", None))
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  SCORING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def predict(scaler, model, X):
+    """Positive-class probability for every row of X in one vectorised pass.
+
+    scaler may be None for models that take raw features (compiled tree ensembles).
+    """
+    if not len(X):
+        return np.empty(0)
+    return model.predict_proba(X if scaler is None else scaler.transform(X))[:, 1]
+
+def aligned(errors, ok, out):
+    """Merge per-row output columns {name: array} back onto input positions."""
+    res = [{"index": i, "error": e} if e is not None else None for i, e in enumerate(errors)]
+    cols = {k: np.asarray(v).tolist() for k, v in out.items()}
+    keys = list(cols)
+    for j, i in enumerate(ok.tolist()):
+        res[i] = {"index": i, **{k: cols[k][j] for k in keys}}
+    return res
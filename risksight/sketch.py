@@ -0,0 +1,197 @@
+"""
+RiskSight Pro — quantile sketches
+Mergeable, fixed-size summaries of a numeric column that answer quantiles
+(VaR levels, medians, tail percentiles) without holding the values, so a
+column sharded across workers or arriving as a stream is summarised once per
+shard and combined by addition.
+
+Values are counted in logarithmic buckets (DDSketch): bucket k holds
+(γ^(k-1), γ^k] with γ = (1+α)/(1−α), separately for positive and negative
+values, plus a zero count. Any value read back from a bucket is within a
+relative error α of every value in it, so:
+
+* the rank-r value (0-based, in sorted order) is returned within α·|x_r|;
+* quantile(q) interpolates linearly between ranks ⌊q(n−1)⌋ and ⌈q(n−1)⌉ as
+  np.percentile does, so it is within α·|exact| of np.percentile(x, 100q)
+  whenever those two neighbours have the same sign (α·max of their
+  magnitudes otherwise);
+* the minimum and maximum are kept exactly, and estimates are clamped to them.
+
+Merging adds bucket counts, so a merged sketch is identical to one built
+from all the values in one pass, in any order or sharding. Memory is bounded
+by `max_bins` buckets per sign (by default enough for RANGE, nine orders of
+magnitude below the largest value, ≈ 2,100 at α = 0.5%): past that, the
+buckets nearest zero are folded together. The guarantee holds for every value
+farther from zero than the folded range — the tails are never folded — and
+only inside that range can merged and one-pass sketches differ.
+"""
+
+import os, math
+import numpy as np
+
+ALPHA     = float(os.environ.get("RISKSIGHT_SKETCH_ALPHA", "0.005"))    # relative error bound
+RANGE     = 1e9             # magnitudes (max / min) kept at full accuracy by default
+MIN_VALUE = 1e-12           # |x| below this counts as zero
+
+class _Store:
+    """Bucket counts over a contiguous key range [lo, lo + len(counts))."""
+
+    def __init__(self, max_bins):
+        self.lo, self.counts, self.max_bins, self.floor = 0, np.zeros(0, np.int64), max_bins, None
+
+    def copy(self):
+        s = _Store(self.max_bins)
+        s.lo, s.counts, s.floor = self.lo, self.counts.copy(), self.floor
+        return s
+
+    def _cover(self, kmin, kmax):
+        if self.floor is not None:
+            kmin = max(kmin, self.floor)
+        if not len(self.counts):
+            self.lo, self.counts = kmin, np.zeros(kmax - kmin + 1, np.int64)
+        lo, hi = min(kmin, self.lo), max(kmax, self.lo + len(self.counts) - 1)
+        if (lo, hi) != (self.lo, self.lo + len(self.counts) - 1):
+            c = np.zeros(hi - lo + 1, np.int64)
+            c[self.lo - lo:self.lo - lo + len(self.counts)] = self.counts
+            self.lo, self.counts = lo, c
+        if len(self.counts) > self.max_bins:             # fold the buckets nearest zero
+            cut = len(self.counts) - self.max_bins
+            self.counts[cut] += self.counts[:cut].sum()
+            self.lo, self.counts = self.lo + cut, self.counts[cut:].copy()
+            self.floor = self.lo
+
+    def add(self, keys, counts=None):
+        if not len(keys):
+            return
+        self._cover(int(keys.min()), int(keys.max()))
+        k = keys - self.lo if self.floor is None else np.maximum(keys, self.lo) - self.lo
+        self.counts += np.bincount(k, counts, minlength=len(self.counts)).astype(np.int64)
+
+    def add_one(self, key):
+        self._cover(key, key)
+        self.counts[max(key, self.lo) - self.lo] += 1
+
+    def merge(self, other):
+        if len(other.counts):
+            if other.floor is not None:
+                self.floor = other.floor if self.floor is None else max(self.floor, other.floor)
+            self.add(np.arange(other.lo, other.lo + len(other.counts)), other.counts)
+
+class QuantileSketch:
+    """Relative-error quantile sketch of one numeric column (see module docstring)."""
+
+    def __init__(self, alpha=ALPHA, max_bins=None):
+        if not 0 < alpha < 1:
+            raise ValueError("alpha must be in (0, 1)")
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._lg   = math.log(self.gamma)
+        self.alpha, self.max_bins = alpha, max_bins or math.ceil(math.log(RANGE) / self._lg) + 1
+        self.pos, self.neg = _Store(self.max_bins), _Store(self.max_bins)
+        self.zero, self.n, self.sum = 0, 0, 0.0
+        self.min, self.max = math.inf, -math.inf
+
+    def copy(self):
+        s = QuantileSketch(self.alpha, self.max_bins)
+        s.pos, s.neg = self.pos.copy(), self.neg.copy()
+        s.zero, s.n, s.sum, s.min, s.max = self.zero, self.n, self.sum, self.min, self.max
+        return s
+
+    def __len__(self):
+        return self.n
+
+    def _keys(self, a):
+        return np.ceil(np.log(a) / self._lg).astype(np.int64)
+
+    # ── writes ──────────────────────────────────────────────────────────────────
+    def update(self, values):
+        """Add an array of values (NaN and ±inf are ignored) — one vectorised pass."""
+        x = np.asarray(values, dtype=np.float64).ravel()
+        x = x[np.isfinite(x)]
+        if not len(x):
+            return self
+        pos, neg = x[x >= MIN_VALUE], x[x <= -MIN_VALUE]
+        self.pos.add(self._keys(pos))
+        self.neg.add(self._keys(-neg))
+        self.zero += len(x) - len(pos) - len(neg)
+        self.n += len(x); self.sum += float(x.sum())
+        self.min, self.max = min(self.min, float(x.min())), max(self.max, float(x.max()))
+        return self
+
+    def add(self, v):
+        """Add one value — O(1)."""
+        v = float(v)
+        if not math.isfinite(v):
+            return self
+        if v >= MIN_VALUE:
+            self.pos.add_one(math.ceil(math.log(v) / self._lg))
+        elif v <= -MIN_VALUE:
+            self.neg.add_one(math.ceil(math.log(-v) / self._lg))
+        else:
+            self.zero += 1
+        self.n += 1; self.sum += v
+        self.min, self.max = min(self.min, v), max(self.max, v)
+        return self
+
+    def merge(self, other):
+        """Fold in a sketch of other values (same alpha); the result equals a sketch of both."""
+        if other.alpha != self.alpha:
+            raise ValueError("cannot merge sketches with different alpha")
+        self.pos.merge(other.pos); self.neg.merge(other.neg)
+        self.zero += other.zero; self.n += other.n; self.sum += other.sum
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        return self
+
+    # ── reads ───────────────────────────────────────────────────────────────────
+    def _value(self, keys):
+        return 2 * self.gamma ** keys.astype(np.float64) / (self.gamma + 1)
+
+    def buckets(self):
+        """(values, counts) of the non-empty buckets in ascending value order."""
+        nk = np.arange(self.neg.lo, self.neg.lo + len(self.neg.counts))[::-1]
+        pk = np.arange(self.pos.lo, self.pos.lo + len(self.pos.counts))
+        v = np.concatenate([-self._value(nk), [0.0], self._value(pk)])
+        c = np.concatenate([self.neg.counts[::-1], [self.zero], self.pos.counts])
+        keep = c > 0
+        return np.clip(v[keep], self.min, self.max), c[keep]
+
+    def ranked(self, r):
+        """Estimated value of 0-based rank(s) r in sorted order (exact at 0 and n−1)."""
+        r = np.asarray(r, dtype=np.int64)
+        v, c = self.buckets()
+        out = v[np.minimum(np.searchsorted(np.cumsum(c), r, side="right"), len(v) - 1)]
+        return np.where(r <= 0, self.min, np.where(r >= self.n - 1, self.max, out))
+
+    def quantile(self, q):
+        """np.percentile(x, 100q)-style (linear) quantile(s), q in [0, 1]."""
+        if not self.n:
+            raise ValueError("empty sketch")
+        q = np.asarray(q, dtype=np.float64)
+        if ((q < 0) | (q > 1)).any():
+            raise ValueError("quantiles must be in [0, 1]")
+        pos = q * (self.n - 1)
+        lo, frac = np.floor(pos), pos - np.floor(pos)
+        a, b = self.ranked(lo), self.ranked(np.minimum(lo + 1, self.n - 1))
+        out = a + frac * (b - a)
+        return float(out) if out.ndim == 0 else out
+
+    def rank(self, x):
+        """Estimated number of values ≤ x, for each x (a CDF scaled by n; histogram edges)."""
+        v, c = self.buckets()
+        cum = np.concatenate([[0], np.cumsum(c)])
+        return cum[np.searchsorted(v, np.asarray(x, dtype=np.float64), side="right")]
+
+    def tail_mean(self, q):
+        """Mean of the lowest q·n values (q < 0.5: lower tail, e.g. CVaR on returns)."""
+        if not self.n:
+            raise ValueError("empty sketch")
+        m = max(q * self.n, 1.0)
+        v, c = self.buckets()
+        take = np.minimum(c, np.clip(m - np.concatenate([[0], np.cumsum(c)[:-1]]), 0, None))
+        return float((v * take).sum() / take.sum())
+
+    def mean(self):
+        return self.sum / self.n if self.n else math.nan
+
+    @property
+    def nbytes(self):
+        return self.pos.counts.nbytes + self.neg.counts.nbytes
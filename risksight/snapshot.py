@@ -0,0 +1,134 @@
+"""
+RiskSight Pro — dataset snapshots
+Immutable columnar copies of the dashboard frames that every gunicorn worker
+maps instead of holding its own: each column is one .npy file under
+<root>/<version>/<frame>/ (categoricals as integer codes, derived columns
+included), opened with mmap_mode="r" and wrapped in a DataFrame without
+copying. The pages live once in the page cache (/dev/shm by default, so in
+RAM), are shared by every process, and are read-only — a route that tried to
+write into a frame would fail instead of racing.
+
+Publishing writes a new version directory and then atomically replaces the
+CURRENT pointer, as the model registry does with LATEST; processes notice
+the pointer change and swap their frames. Old versions stay readable for
+processes still mapping them (unlinked files live until unmapped).
+
+Text columns (e.g. transaction ids) cannot be mapped as pandas objects; they
+are stored fixed-width and materialized per process.
+"""
+
+import os, json, time, uuid, shutil, tempfile
+import numpy as np, pandas as pd
+
+from risksight.ingest import CATS
+
+CURRENT = "CURRENT"
+
+def default_base():
+    """Shared memory when there is a writable /dev/shm, else the temp directory."""
+    shm = "/dev/shm"
+    base = shm if os.path.isdir(shm) and os.access(shm, os.W_OK) else tempfile.gettempdir()
+    return os.path.join(base, f"risksight-snapshots-{os.getuid() if hasattr(os, 'getuid') else 0}")
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:                 # exists, owned by someone else
+        pass
+    return True
+
+def session_root(base=None):
+    """<base>/<pid>: snapshots private to this process and the workers forked from it.
+
+    Directories left behind by processes that no longer run are removed.
+    """
+    base = base or default_base()
+    os.makedirs(base, exist_ok=True)
+    for d in os.listdir(base):
+        if d.isdigit() and int(d) != os.getpid() and not _alive(int(d)):
+            shutil.rmtree(os.path.join(base, d), ignore_errors=True)
+    return os.path.join(base, str(os.getpid()))
+
+def _write_frame(df, path):
+    os.makedirs(path)
+    cols = {}
+    for i, (name, s) in enumerate(df.items()):
+        fn = f"{i:03d}.npy"
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(path, fn), s.cat.codes.to_numpy())
+            cols[name] = {"file": fn, "kind": "category", "categories": s.cat.categories.tolist(),
+                          "ordered": bool(s.cat.ordered)}
+        elif s.dtype == object and name in CATS:        # the fixed category columns: codes, not text
+            codes = pd.Categorical(s, categories=CATS[name]).codes
+            np.save(os.path.join(path, fn), codes)
+            cols[name] = {"file": fn, "kind": "category", "categories": CATS[name], "ordered": False}
+        elif s.dtype == object:
+            np.save(os.path.join(path, fn), s.to_numpy().astype(str))
+            cols[name] = {"file": fn, "kind": "text"}
+        else:
+            np.save(os.path.join(path, fn), s.to_numpy())
+            cols[name] = {"file": fn, "kind": "array"}
+    return {"rows": len(df), "columns": cols}
+
+def _read_frame(meta, path):
+    data = {}
+    for name, c in meta["columns"].items():
+        a = np.load(os.path.join(path, c["file"]), mmap_mode="r")
+        if c["kind"] == "category":
+            data[name] = pd.Categorical.from_codes(a, categories=c["categories"], ordered=c["ordered"])
+        elif c["kind"] == "text":
+            data[name] = a.astype(object)
+        else:
+            data[name] = a
+    return pd.DataFrame(data, copy=False)
+
+def publish(frames, root, generations=None, keep=3):
+    """Write {name: DataFrame} as a new version under `root` and point CURRENT at it.
+
+    `generations` ({name: int}) is stored in the manifest so readers can tell which
+    frames changed since the version they hold. Returns the version.
+    """
+    os.makedirs(root, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+    version = f"s{stamp}-{uuid.uuid4().hex[:8]}"
+    tmp = os.path.join(root, f".tmp-{version}")
+    os.makedirs(tmp)
+    meta = {name: _write_frame(df, os.path.join(tmp, name)) for name, df in frames.items()}
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump({"version": version, "frames": meta, "generations": generations or {}}, f)
+    os.replace(tmp, os.path.join(root, version))
+    ptr = os.path.join(root, f".{CURRENT}.{os.getpid()}.tmp")
+    with open(ptr, "w") as f:
+        f.write(version + "\n")
+    os.replace(ptr, os.path.join(root, CURRENT))
+    if keep:
+        for old in versions(root)[:-keep]:
+            if old != version:
+                shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return version
+
+def versions(root):
+    """Published versions, oldest first."""
+    if not os.path.isdir(root):
+        return []
+    return sorted((d for d in os.listdir(root) if os.path.isfile(os.path.join(root, d, "manifest.json"))),
+                  key=lambda d: os.path.getmtime(os.path.join(root, d)))
+
+def current(root):
+    try:
+        with open(os.path.join(root, CURRENT)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def load(root, version=None):
+    """(manifest, {name: read-only DataFrame}) of `version` (default CURRENT), memory-mapped."""
+    version = version or current(root)
+    if not version:
+        raise FileNotFoundError(f"no snapshot under {root}")
+    path = os.path.join(root, version)
+    with open(os.path.join(path, "manifest.json")) as f:
+        m = json.load(f)
+    return m, {name: _read_frame(meta, os.path.join(path, name)) for name, meta in m["frames"].items()}
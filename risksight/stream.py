@@ -0,0 +1,307 @@
+"""
+RiskSight Pro — real-time fraud scoring stream
+Consumes card transactions as NDJSON (stdin, a file or a TCP socket), derives
+velocity and other per-account sliding-window features itself, scores them
+through the fraud model in micro-batches bounded by size and latency, and
+emits the flagged ones as NDJSON. Throughput and p50/p99 latency go to stderr.
+
+    python -m risksight.stream generate -n 200000 | python -m risksight.stream score -
+    python -m risksight.stream score tcp://0.0.0.0:9099 --max-batch 256 --max-latency-ms 10
+    python -m risksight.stream generate --connect 127.0.0.1:9099 --rate 5000
+"""
+
+import sys, json, time, queue, socket, argparse, threading, warnings
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+import numpy as np
+
+from risksight.scoring import fraud_matrix, predict, FRAUD_THRESHOLD
+
+WINDOW       = 24 * 3600.0      # velocity window, seconds
+MAX_ACCOUNTS = 1_000_000        # least-recently-seen accounts beyond this are forgotten
+MAX_BATCH    = 512
+MAX_LATENCY  = 0.020            # seconds a transaction may wait for its batch to fill
+
+_EOF = object()
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  PER-ACCOUNT SLIDING WINDOWS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class AccountWindows:
+    """Trailing-window transaction count / amount per account, O(1) amortised per event.
+
+    Each account keeps a deque of (ts, amount) inside the window plus its running
+    amount sum; accounts are held in LRU order and the stalest are dropped once
+    more than `max_accounts` are live, so memory is bounded for any card base.
+    """
+
+    def __init__(self, window=WINDOW, max_accounts=MAX_ACCOUNTS):
+        self.window, self.max_accounts = window, max_accounts
+        self._acc = OrderedDict()             # account → [deque[(ts, amount)], amount sum, last ts]
+
+    def __len__(self):
+        return len(self._acc)
+
+    def observe(self, account, ts, amount):
+        """Add one transaction; returns (velocity, window amount, seconds since previous)."""
+        a = self._acc.get(account)
+        if a is None:
+            a = self._acc[account] = [deque(), 0.0, None]
+            if len(self._acc) > self.max_accounts:
+                self._acc.popitem(last=False)
+        else:
+            self._acc.move_to_end(account)
+        q, cut = a[0], ts - self.window
+        while q and q[0][0] <= cut:
+            a[1] -= q.popleft()[1]
+        q.append((ts, amount))
+        a[1] += amount
+        gap  = None if a[2] is None else max(ts - a[2], 0.0)
+        a[2] = ts if a[2] is None else max(a[2], ts)
+        return len(q), a[1], gap
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  LATENCY / THROUGHPUT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class StreamStats:
+    """Counters plus a ring buffer of the last `keep` per-transaction latencies."""
+
+    def __init__(self, keep=100_000):
+        self.lat  = np.zeros(keep)
+        self.n = self.flagged = self.errors = self.batches = 0
+        self.t0   = time.perf_counter()
+
+    def record(self, latencies, flagged, errors):
+        k, cap = len(latencies), len(self.lat)
+        idx = (self.n + np.arange(k)) % cap
+        self.lat[idx] = latencies
+        self.n += k; self.flagged += flagged; self.errors += errors; self.batches += 1
+
+    def summary(self):
+        el  = time.perf_counter() - self.t0
+        lat = self.lat[:min(self.n, len(self.lat))] * 1e3
+        p   = np.percentile(lat, [50, 99]) if len(lat) else [np.nan, np.nan]
+        return {"records": self.n, "flagged": self.flagged, "errors": self.errors,
+                "batches": self.batches, "avg_batch": round(self.n / max(self.batches, 1), 1),
+                "seconds": round(el, 3), "records_per_sec": round(self.n / max(el, 1e-9)),
+                "p50_ms": round(float(p[0]), 3), "p99_ms": round(float(p[1]), 3),
+                "max_ms": round(float(lat.max()), 3) if len(lat) else None}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  SCORER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _ts(v, fallback):
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return float(v)
+    if isinstance(v, str):
+        try:
+            d = datetime.fromisoformat(v.replace("Z", "+00:00"))
+            return (d if d.tzinfo else d.replace(tzinfo=timezone.utc)).timestamp()
+        except ValueError:
+            pass
+    return fallback
+
+class StreamScorer:
+    """Feature derivation + micro-batch scoring; `score_batch` is the hot path.
+
+    Records need `account` (or `card_id`), `amount` and the model's categorical
+    fields; `ts` (epoch seconds or ISO-8601) defaults to arrival time and `hour`
+    is derived from it. A caller-supplied `velocity` is only used when there is
+    no account to window on.
+    """
+
+    def __init__(self, scaler, model, cols, threshold=FRAUD_THRESHOLD, window=WINDOW,
+                 max_accounts=MAX_ACCOUNTS, emit_all=False):
+        self.scaler, self.model, self.cols, self.threshold = scaler, model, cols, threshold
+        self.windows, self.emit_all = AccountWindows(window, max_accounts), emit_all
+        self.stats = StreamStats()
+
+    def _features(self, rec, now):
+        acct = rec.get("account", rec.get("card_id"))
+        ts   = _ts(rec.get("ts", rec.get("date")), now)
+        if "hour" not in rec:
+            rec["hour"] = int(ts // 3600 % 24)                 # UTC hour of day
+        if acct is not None and isinstance(rec.get("amount"), (int, float)):
+            v, amt, gap = self.windows.observe(acct, ts, float(rec["amount"]))
+            rec.update(velocity=v, window_amount=round(amt, 2), gap_s=gap)
+        return rec
+
+    def score_batch(self, items):
+        """items: [(arrival perf_counter, raw line)] → list of output dicts to emit."""
+        now, recs = time.time(), []
+        for _, line in items:
+            try:
+                r = json.loads(line)
+            except ValueError:
+                r = None
+            recs.append(self._features(r, now) if isinstance(r, dict) else {"_bad": True})
+        X, ok, err = fraud_matrix(recs, self.cols)
+        prob = predict(self.scaler, self.model, X)
+        done = time.perf_counter()
+        out = []
+        for j, i in enumerate(ok.tolist()):
+            if self.emit_all or prob[j] > self.threshold:
+                r = recs[i]
+                r["fraud_prob"] = round(float(prob[j]), 4)
+                r["fraud_flag"] = bool(prob[j] > self.threshold)
+                r["latency_ms"] = round((done - items[i][0]) * 1e3, 3)
+                out.append(r)
+        lat = done - np.array([t for t, _ in items])
+        self.stats.record(lat, int((prob > self.threshold).sum()), len(items) - len(ok))
+        return out
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  SOURCES + MICRO-BATCH LOOP
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _pump(f, q):
+    for line in f:
+        if line.strip():
+            q.put((time.perf_counter(), line))
+
+def open_source(src, q):
+    """Start reader thread(s) feeding (arrival time, line) into q; `_EOF` marks the end."""
+    if src.startswith("tcp://"):
+        host, port = src[6:].rsplit(":", 1)
+        srv = socket.create_server((host, int(port)))
+        def serve():
+            while True:
+                conn, _ = srv.accept()
+                threading.Thread(target=_pump, args=(conn.makefile("r", encoding="utf-8"), q),
+                                 daemon=True).start()
+        threading.Thread(target=serve, daemon=True).start()
+        return
+    def read():
+        f = sys.stdin if src == "-" else open(src, encoding="utf-8")
+        try:
+            _pump(f, q)
+        finally:
+            q.put(_EOF)
+    threading.Thread(target=read, daemon=True).start()
+
+def run(scorer, q, emit, max_batch=MAX_BATCH, max_latency=MAX_LATENCY, stats_every=None, log=sys.stderr):
+    """Drain q in micro-batches: flush at `max_batch` items or when the oldest has waited `max_latency`."""
+    pending, last = [], time.perf_counter()
+    def flush():
+        if pending:
+            emit(scorer.score_batch(pending))
+            pending.clear()
+    while True:
+        wait = None if not pending else max(0.0, pending[0][0] + max_latency - time.perf_counter())
+        if stats_every:
+            wait = stats_every if wait is None else min(wait, stats_every)
+        try:
+            item = q.get(timeout=wait)
+        except queue.Empty:
+            item = None
+        while item is not None and item is not _EOF:
+            pending.append(item)
+            if len(pending) >= max_batch:
+                flush()
+            try:
+                item = q.get_nowait()
+            except queue.Empty:
+                item = None
+        if item is _EOF:
+            flush()
+            break
+        if pending and time.perf_counter() - pending[0][0] >= max_latency:
+            flush()
+        if stats_every and time.perf_counter() - last >= stats_every:
+            print(json.dumps(scorer.stats.summary()), file=log, flush=True)
+            last = time.perf_counter()
+    return scorer.stats.summary()
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  LOCAL STAND-IN SOURCE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def generate(n, accounts=5000, seed=7, start=None, tps=50.0):
+    """Synthetic transaction stream (same marginals as the demo data) with card bursts.
+
+    Event time advances by exponential gaps at `tps` transactions per second; ~2%
+    of events start a burst of rapid follow-ups on the same card.
+    """
+    rng  = np.random.default_rng(seed)
+    ts   = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp() if start is None else start
+    cats = {"merch_risk": (["Low","Medium","High"], [.6,.3,.1]),
+            "channel": (["Online","POS","ATM","Mobile"], None)}
+    burst, i = [], 0
+    while i < n:
+        ts += rng.exponential(1 / tps)
+        acct = burst.pop() if burst else int(rng.integers(accounts))
+        if not burst and rng.random() < .02:
+            burst = [acct] * int(rng.integers(5, 25))
+        yield {"txn_id": f"TXN{i:08d}", "account": f"ACC{acct:06d}", "ts": round(ts, 3),
+               "amount": round(float(rng.lognormal(5, 1.5)), 2),
+               "merch_risk": str(rng.choice(cats["merch_risk"][0], p=cats["merch_risk"][1])),
+               "foreign": int(rng.random() < .15), "channel": str(rng.choice(cats["channel"][0]))}
+        i += 1
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  CLI
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def main(argv=None):
+    ap  = argparse.ArgumentParser(prog="python -m risksight.stream", description=__doc__.split("\n")[1])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("score", help="score an NDJSON transaction stream")
+    s.add_argument("source", nargs="?", default="-", help="'-' (stdin), a file, or tcp://HOST:PORT to listen on")
+    s.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    s.add_argument("--max-latency-ms", type=float, default=MAX_LATENCY * 1e3)
+    s.add_argument("--window", type=float, default=WINDOW, help="velocity window in seconds")
+    s.add_argument("--threshold", type=float, default=FRAUD_THRESHOLD)
+    s.add_argument("--all", action="store_true", help="emit every scored transaction, not only flagged ones")
+    s.add_argument("--stats-every", type=float, default=None, help="print stats to stderr every N seconds")
+    s.add_argument("--quiet", action="store_true", help="do not write scored records (benchmarking)")
+    s.add_argument("--inference", choices=["sklearn", "compiled"], default="sklearn",
+                   help="score with sklearn or with the compiled tree kernel (risksight.compiled)")
+    g = sub.add_parser("generate", help="write a synthetic NDJSON transaction stream")
+    g.add_argument("-n", type=int, default=100_000)
+    g.add_argument("--accounts", type=int, default=5000)
+    g.add_argument("--seed", type=int, default=7)
+    g.add_argument("--rate", type=float, default=0, help="wall-clock records/s (0 = as fast as possible)")
+    g.add_argument("--connect", help="HOST:PORT to send to instead of stdout")
+    a = ap.parse_args(argv)
+
+    if a.cmd == "generate":
+        out = sys.stdout
+        if a.connect:
+            host, port = a.connect.rsplit(":", 1)
+            out = socket.create_connection((host, int(port))).makefile("w", encoding="utf-8")
+        t0 = time.perf_counter()
+        for i, r in enumerate(generate(a.n, a.accounts, a.seed)):
+            out.write(json.dumps(r) + "\n")
+            if a.rate and i % 100 == 0:
+                out.flush()
+                time.sleep(max(0.0, t0 + i / a.rate - time.perf_counter()))
+        out.flush()
+        return 0
+
+    from risksight import registry
+    from risksight.data import synthetic
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    M = registry.load_or_train(*synthetic()[:3])
+    scaler, model = M["sfr"], M["mdl_fr"]
+    if a.inference == "compiled":
+        from risksight.compiled import compile_pair
+        scaler, model = None, compile_pair(scaler, model)
+    scorer = StreamScorer(scaler, model, M["FR_COLS"], a.threshold, a.window, emit_all=a.all)
+    def emit(recs):
+        if recs and not a.quiet:
+            sys.stdout.write("".join(json.dumps(r) + "\n" for r in recs))
+            sys.stdout.flush()
+    q = queue.Queue(maxsize=100_000)
+    open_source(a.source, q)
+    try:
+        summary = run(scorer, q, emit, a.max_batch, a.max_latency_ms / 1e3, a.stats_every)
+    except KeyboardInterrupt:
+        summary = scorer.stats.summary()
+    print(json.dumps({"final": summary, "accounts": len(scorer.windows)}), file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
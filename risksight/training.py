@@ -0,0 +1,169 @@
+"""
+RiskSight Pro — training pipeline
+Fits the three scaler + model pairs the registry publishes. Every fit keeps a
+stratified test split aside and records held-out metrics (ROC AUC, accuracy,
+log loss, Brier score) and timings for the manifest, then refits on all rows
+for serving.
+
+`search` picks the hyperparameters first: each candidate in GRID (including
+histogram-based gradient boosting for fraud) is cross-validated on the
+training split, with every (candidate, fold) fit running in a process pool.
+The best mean CV AUC wins; candidates within TIE of it are ranked by fit time,
+so a faster estimator is preferred when it scores the same.
+
+    python -m risksight.registry train --search [--folds 5] [--workers 4]
+"""
+
+import os, time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+from sklearn.ensemble import (RandomForestClassifier, GradientBoostingClassifier,
+                              HistGradientBoostingClassifier)
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score, accuracy_score, log_loss, brier_score_loss
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from risksight.data import features
+
+# task → (scaler key, model key, columns key) in a registry bundle
+TASKS = {"credit":       ("scr",  "mdl_cr",  "CR_COLS"),
+         "fraud":        ("sfr",  "mdl_fr",  "FR_COLS"),
+         "underwriting": ("sins", "mdl_ins", "INS_COLS")}
+ESTIMATORS = {"rf":     partial(RandomForestClassifier, random_state=42),
+              "gb":     partial(GradientBoostingClassifier, random_state=42),
+              "hgb":    partial(HistGradientBoostingClassifier, random_state=42),
+              "logreg": partial(LogisticRegression, random_state=42)}
+# What `registry train` fits without --search (the dashboard's original models)
+DEFAULTS = {"credit": ("rf", {"n_estimators": 100}),
+            "fraud": ("gb", {"n_estimators": 100}),
+            "underwriting": ("logreg", {})}
+# Candidates per task for --search. Credit stays a random forest (the credit page
+# plots its feature_importances_) and underwriting a logistic regression (its coefficients).
+GRID = {
+    "credit": [("rf", {"n_estimators": n, "max_depth": d, "min_samples_leaf": l})
+               for n in (100, 200) for d in (None, 12) for l in (1, 5)],
+    "fraud": [("gb", {"n_estimators": n, "max_depth": d}) for n in (100, 200) for d in (2, 3)] +
+             [("hgb", {"max_iter": i, "max_leaf_nodes": k, "learning_rate": .1})
+              for i in (100, 200) for k in (15, 31)],
+    "underwriting": [("logreg", {"C": c}) for c in (.01, .1, 1., 10.)],
+}
+TIE       = 0.002       # CV AUC difference treated as a tie (then the faster fit wins)
+TEST_SIZE = 0.2
+_DATA     = {}          # task → (X, y) training split, set once per pool worker
+
+def datasets(cr, fd, ins):
+    """task → (feature frame, target series)."""
+    Xcr, Xfd, Xins = features(cr, fd, ins)
+    return {"credit": (Xcr, cr.default.reset_index(drop=True)),
+            "fraud": (Xfd, fd.fraud.reset_index(drop=True)),
+            "underwriting": (Xins, ins.high_risk.reset_index(drop=True))}
+
+def estimator(name, params):
+    return ESTIMATORS[name](**params)
+
+def _fit(name, params, X, y, n_jobs=None):
+    s = StandardScaler().fit(X)
+    m = estimator(name, params)
+    forest = isinstance(m, RandomForestClassifier)     # the one estimator n_jobs speeds up here
+    if n_jobs and forest:
+        m.set_params(n_jobs=n_jobs)
+    m.fit(s.transform(X), y)
+    if forest:
+        m.set_params(n_jobs=None)         # serving scores single rows; no thread pool per call
+    return s, m
+
+def evaluate(scaler, model, X, y):
+    """Held-out metrics of a fitted pair on (X, y)."""
+    p = model.predict_proba(scaler.transform(X))[:, 1]
+    return {"auc": round(float(roc_auc_score(y, p)), 4),
+            "accuracy": round(float(accuracy_score(y, p >= .5)), 4),
+            "log_loss": round(float(log_loss(y, p, labels=[0, 1])), 4),
+            "brier": round(float(brier_score_loss(y, p)), 4),
+            "test_rows": len(y)}
+
+def _latency_ms(scaler, model, x, runs=50):
+    """Median single-row predict_proba time (the scoring API's unit of work)."""
+    t = []
+    for _ in range(runs):
+        t0 = time.perf_counter(); model.predict_proba(scaler.transform(x)); t.append(time.perf_counter() - t0)
+    return round(float(np.median(t)) * 1e3, 3)
+
+def _split(y, seed):
+    return train_test_split(np.arange(len(y)), test_size=TEST_SIZE, stratify=y, random_state=seed)
+
+def fit(cr, fd, ins, choice=None, seed=42, n_jobs=None):
+    """Fit every task's (estimator, params) from `choice` (default DEFAULTS).
+
+    Returns (bundle entries keyed as in TASKS, metrics per task). Metrics come
+    from a fit on the training split scored on the held-out split; the returned
+    models are refit on all rows.
+    """
+    choice, b, metrics = {**DEFAULTS, **(choice or {})}, {}, {}
+    for task, (X, y) in datasets(cr, fd, ins).items():
+        name, params = choice[task]
+        tr, te = _split(y, seed)
+        s, m = _fit(name, params, X.iloc[tr], y.iloc[tr], n_jobs)
+        held = evaluate(s, m, X.iloc[te], y.iloc[te])
+        t0 = time.perf_counter()
+        s, m = _fit(name, params, X, y, n_jobs)
+        skey, mkey, ckey = TASKS[task]
+        b[skey], b[mkey], b[ckey] = s, m, X.columns.tolist()
+        metrics[task] = {"estimator": type(m).__name__, "params": params, **held,
+                         "fit_seconds": round(time.perf_counter() - t0, 3),
+                         "predict_ms": _latency_ms(s, m, X.iloc[:1])}
+    return b, metrics
+
+def _init(data):
+    _DATA.clear(); _DATA.update(data)
+
+def _cv_fold(job):
+    task, i, name, params, tr, te = job
+    X, y = _DATA[task]
+    t0 = time.perf_counter()
+    s, m = _fit(name, params, X[tr], y[tr])
+    fit_s = time.perf_counter() - t0
+    return task, i, roc_auc_score(y[te], m.predict_proba(s.transform(X[te]))[:, 1]), fit_s
+
+def search(cr, fd, ins, grid=GRID, folds=5, workers=None, seed=42):
+    """Cross-validate `grid` on each task's training split in a process pool.
+
+    Returns (choice for fit(), report for the manifest). The held-out split is
+    never seen here, so fit()'s metrics stay an unbiased check of the winner.
+    """
+    t0 = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    data, jobs = {}, []
+    for task, (X, y) in datasets(cr, fd, ins).items():
+        if task not in grid:
+            continue
+        tr, _ = _split(y, seed)
+        X, y = X.to_numpy(np.float64)[tr], y.to_numpy()[tr]
+        data[task] = (X, y)
+        cv = list(StratifiedKFold(folds, shuffle=True, random_state=seed).split(X, y))
+        jobs += [(task, i, name, params, a, b) for i, (name, params) in enumerate(grid[task]) for a, b in cv]
+    if workers > 1:
+        with ProcessPoolExecutor(workers, initializer=_init, initargs=(data,)) as pool:
+            results = list(pool.map(_cv_fold, jobs))
+    else:
+        _init(data)
+        results = [_cv_fold(j) for j in jobs]
+
+    choice, report = {}, {"folds": folds, "workers": workers, "fits": len(jobs), "candidates": {}}
+    for task in data:
+        rows = []
+        for i, (name, params) in enumerate(grid[task]):
+            auc = [r[2] for r in results if r[0] == task and r[1] == i]
+            sec = [r[3] for r in results if r[0] == task and r[1] == i]
+            rows.append({"estimator": name, "params": params, "cv_auc": round(float(np.mean(auc)), 4),
+                         "cv_auc_std": round(float(np.std(auc)), 4),
+                         "fit_seconds": round(float(np.mean(sec)), 3)})
+        best = max(r["cv_auc"] for r in rows)
+        win  = min((r for r in rows if r["cv_auc"] >= best - TIE), key=lambda r: r["fit_seconds"])
+        win["selected"] = True
+        choice[task] = (win["estimator"], win["params"])
+        report["candidates"][task] = rows
+    report["serial_seconds"] = round(sum(r[3] for r in results), 2)   # sum of fold fits
+    report["wall_seconds"] = round(time.perf_counter() - t0, 2)
+    return choice, report
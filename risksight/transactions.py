@@ -0,0 +1,256 @@
+"""
+RiskSight Pro — transaction explorer
+Columns of the transaction log plus indexes for filtered, paginated queries
+(GET /api/fraud/transactions):
+
+* sorted indexes on date and amount, in (value, row) order, so a range on the
+  sort column is one contiguous slice found by binary search and a keyset
+  cursor (last value, last row) resumes the next page in O(log n);
+* bitmap indexes (packed bits, one per value) on channel, merch_risk, foreign
+  and fraud: an IN-list is the OR of its values' bitmaps, filters on several
+  columns the AND.
+
+A page walks the sort slice in growing blocks, tests each candidate row
+against the combined bitmap and the other range, and stops once it has
+`limit` rows. When the bitmap is selective it starts from the bitmap
+instead: the matching rows are placed in sort order through each index's
+rank array, so a rare combination is not found by walking the whole slice.
+Either way a page is a few vectorised passes, never a per-row loop, and
+result rows are gathered column by column from the row ids.
+
+Appends merge the new rows into the sorted indexes (binary search + insert,
+O(n)) and publish a new snapshot with one assignment; queries never lock.
+"""
+
+import base64, json, threading
+import numpy as np, pandas as pd
+
+from risksight.ingest import CATS
+
+FIELDS = ["txn_id","date","amount","hour","merch_risk","foreign","velocity","channel","fraud","fraud_prob"]
+SORTS  = ("date", "amount")
+FLAGS  = {"channel": CATS["channel"], "merch_risk": CATS["merch_risk"], "foreign": [0, 1], "fraud": [0, 1]}
+LIMIT, MAX_LIMIT = 50, 1000
+SELECTIVE = 16          # bitmap matches × this < rows in range → rank the matches instead of walking
+POPCOUNT  = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+def _columns(df):
+    """Index column arrays for a transaction frame (categoricals as codes into FLAGS, dates as ns)."""
+    c = {"date":       pd.to_datetime(df["date"]).to_numpy("datetime64[ns]").view(np.int64),
+         "amount":     df["amount"].to_numpy(np.float64),
+         "hour":       df["hour"].to_numpy(np.int8),
+         "velocity":   df["velocity"].to_numpy(np.int16),
+         "fraud_prob": (df["fraud_prob"] if "fraud_prob" in df else df["fraud"]).to_numpy(np.float64),
+         "txn_id":     df["txn_id"].to_numpy(object) if "txn_id" in df else np.full(len(df), None, object)}
+    for col, values in FLAGS.items():
+        codes = pd.Categorical(df[col], categories=values).codes
+        if (codes < 0).any():
+            raise ValueError(f"fraud.{col}: values outside {values}")
+        c[col] = codes.astype(np.int8)
+    return c
+
+def _bitmaps(cols):
+    return {col: [np.packbits(cols[col] == i) for i in range(len(values))] for col, values in FLAGS.items()}
+
+def _rows(packed):
+    """Row ids of the set bits, expanding only the non-zero bytes."""
+    nz = np.flatnonzero(packed)
+    byte, bit = np.nonzero(np.unpackbits(packed[nz]).reshape(-1, 8))
+    return nz[byte] * 8 + bit
+
+def _bit(packed, rows):
+    return ((packed[rows >> 3] >> (7 - (rows & 7))) & 1).astype(bool)
+
+def encode_cursor(sort, desc, value, row):
+    raw = json.dumps([sort, desc, value, int(row)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """(sort, desc, value, row); ValueError unless value is an int (date) or a finite number (amount)."""
+    try:
+        sort, desc, value, row = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("invalid cursor") from None
+    num = (int,) if sort == "date" else (int, float)
+    if (sort not in SORTS or not isinstance(desc, bool) or not isinstance(row, int) or isinstance(row, bool)
+            or row < 0 or not isinstance(value, num) or isinstance(value, bool) or not np.isfinite(value)):
+        raise ValueError("invalid cursor")
+    return sort, desc, value, row
+
+def parse_args(args):
+    """query() keyword arguments from request args ({name: string}); ValueError on bad input.
+
+    channel / merch_risk / foreign / fraud take comma-separated values; date_from / date_to
+    (ISO dates or timestamps, inclusive), amount_min / amount_max; sort (date | amount),
+    order (asc | desc), limit, cursor, count (1 → include the total match count).
+    """
+    q = {"where": {}, "ranges": {}}
+    for col, values in FLAGS.items():
+        if args.get(col):
+            raw = [v.strip() for v in args[col].split(",")]
+            want = [v if isinstance(values[0], str) else int(v) if v in ("0", "1") else v for v in raw]
+            bad = [v for v in want if v not in values]
+            if bad:
+                raise ValueError(f"{col}: unknown values {bad} (expected {values})")
+            q["where"][col] = want
+    for col, lo, hi, conv in (("date", "date_from", "date_to", lambda v: pd.Timestamp(v).value),
+                              ("amount", "amount_min", "amount_max", float)):
+        a, b = args.get(lo), args.get(hi)
+        if a or b:
+            q["ranges"][col] = (conv(a) if a else None, conv(b) if b else None)
+    q["sort"] = args.get("sort", "date")
+    if q["sort"] not in SORTS:
+        raise ValueError(f"sort must be one of {SORTS}")
+    if args.get("order", "desc") not in ("asc", "desc"):
+        raise ValueError("order must be asc or desc")
+    q["desc"]   = args.get("order", "desc") == "desc"
+    q["limit"]  = int(args.get("limit", LIMIT))
+    q["cursor"] = args.get("cursor") or None
+    q["count"]  = args.get("count") in ("1", "true")
+    return q
+
+class TransactionIndex:
+    """Indexed transaction columns; `query` filters, sorts and pages over them."""
+
+    def __init__(self, cols):
+        self._lock = threading.Lock()            # serializes appends only
+        self._publish(cols, {s: self._sorted(cols[s]) for s in SORTS})
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        parts = [_columns(df) for df in chunks]
+        if not parts:
+            raise ValueError("no transactions")
+        return cls({k: np.concatenate([p[k] for p in parts]) for k in parts[0]})
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(_columns(df))
+
+    @staticmethod
+    def _sorted(v, rows=None):
+        """(sorted values, row ids, rank of each row); ties stay in row order → (value, row) order."""
+        if rows is None:
+            rows = np.argsort(v, kind="stable")
+            v = v[rows]
+        rank = np.empty(len(rows), np.int64)
+        rank[rows] = np.arange(len(rows))
+        return v, rows, rank
+
+    def _publish(self, cols, order):
+        self.snap = {"cols": cols, "n": len(cols["date"]), "order": order, "bitmaps": _bitmaps(cols)}
+
+    def __len__(self):
+        return self.snap["n"]
+
+    def append(self, df):
+        """Add a frame of transactions, or its already validated _columns (rows numbered after the
+        existing ones)."""
+        new = df if isinstance(df, dict) else _columns(df)
+        with self._lock:
+            s = self.snap
+            cols = {k: np.concatenate([s["cols"][k], new[k]]) for k in s["cols"]}
+            order = {}
+            for key in SORTS:
+                vals, rows, _ = s["order"][key]
+                o = np.argsort(new[key], kind="stable")
+                at = np.searchsorted(vals, new[key][o], side="right")    # after equal values: larger row ids
+                order[key] = self._sorted(np.insert(vals, at, new[key][o]), np.insert(rows, at, s["n"] + o))
+            self._publish(cols, order)
+        return len(new["date"])
+
+    def query(self, where=None, ranges=None, sort="date", desc=True, limit=LIMIT, cursor=None, count=False):
+        """One page of matching rows in (sort value, row) order.
+
+        where  — {flag column: [values]} (values as in FLAGS)
+        ranges — {"date": (ns or None, ns or None), "amount": (min or None, max or None)}, inclusive
+        cursor — the `next` of the previous page (same sort / order)
+        Returns {"rows": [...], "next": cursor or None, "total": int (if count), "scanned": rows tested}.
+        """
+        if sort not in SORTS:
+            raise ValueError(f"sort must be one of {SORTS}")
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be in 1..{MAX_LIMIT}")
+        s, ranges = self.snap, dict(ranges or {})
+        mask = None
+        for col, want in (where or {}).items():
+            if not want:
+                raise ValueError(f"{col}: empty value list")
+            codes = [FLAGS[col].index(v) for v in want]
+            b = np.bitwise_or.reduce([s["bitmaps"][col][c] for c in codes])
+            mask = b if mask is None else mask & b
+        vals, rows, rank = s["order"][sort]
+        a, b = ranges.pop(sort, (None, None))
+        lo = 0 if a is None else int(np.searchsorted(vals, a, "left"))
+        hi = len(vals) if b is None else int(np.searchsorted(vals, b, "right"))
+        other = [(s["cols"][c], x, y) for c, (x, y) in ranges.items()]
+
+        def keep(cand, bits=True):
+            ok = np.ones(len(cand), bool) if mask is None or not bits else _bit(mask, cand)
+            for col, x, y in other:
+                v = col[cand]
+                if x is not None: ok &= v >= x
+                if y is not None: ok &= v <= y
+            return cand[ok]
+
+        lo0, hi0 = lo, hi
+        if cursor is not None:
+            c_sort, c_desc, v, r = decode_cursor(cursor)
+            if (c_sort, c_desc) != (sort, desc):
+                raise ValueError("cursor belongs to a different sort / order")
+            i, j = np.searchsorted(vals, v, "left"), np.searchsorted(vals, v, "right")
+            if desc:
+                hi = min(hi, int(i + np.searchsorted(rows[i:j], r, "left")))
+            else:
+                lo = max(lo, int(i + np.searchsorted(rows[i:j], r, "right")))
+
+        need, total, scanned = limit + 1, None, 0
+        if mask is not None and SELECTIVE * int(POPCOUNT[mask].sum()) < hi0 - lo0:
+            # few matches: start from the bitmap and place them in sort order by rank
+            cand = keep(_rows(mask), bits=False)
+            at = rank[cand]
+            at = np.sort(at[(at >= lo0) & (at < hi0)])
+            total, scanned = len(at), len(cand)
+            at = at[(at >= lo) & (at < hi)]
+            got = [rows[at[::-1][:need] if desc else at[:need]]]
+        else:
+            if count:
+                full = not other and (lo0, hi0) == (0, s["n"])
+                total = (hi0 - lo0 if mask is None and not other else int(POPCOUNT[mask].sum()) if full
+                         else len(keep(rows[lo0:hi0])))
+            got, block = [], max(4 * limit, 256)
+            while need > 0 and lo < hi:
+                if desc:
+                    cand = rows[max(hi - block, lo):hi][::-1]; hi -= len(cand)
+                else:
+                    cand = rows[lo:lo + block]; lo += len(cand)
+                scanned += len(cand)
+                hit = keep(cand)[:need]
+                got.append(hit); need -= len(hit)
+                block *= 4
+        ids = np.concatenate(got) if got else np.empty(0, np.int64)
+        more = len(ids) > limit
+        ids = ids[:limit]
+        nxt = None
+        if more:
+            last = int(ids[-1])
+            v = s["cols"][sort][last].item()
+            nxt = encode_cursor(sort, desc, v, last)
+        out = {"rows": self.rows(ids), "next": nxt, "scanned": scanned}
+        if count:
+            out["total"] = total
+        return out
+
+    def rows(self, ids):
+        """Row dicts for row ids, built column-wise."""
+        c = self.snap["cols"]
+        ids = np.asarray(ids, dtype=np.int64)
+        col = {"date": np.datetime_as_string(c["date"][ids].astype("datetime64[ns]").astype("datetime64[s]")),
+               "amount": c["amount"][ids], "hour": c["hour"][ids], "velocity": c["velocity"][ids],
+               "fraud_prob": c["fraud_prob"][ids].round(4),
+               "txn_id": np.where(pd.isna(c["txn_id"][ids]), np.char.add("#", ids.astype(str)).astype(object),
+                                  c["txn_id"][ids])}
+        for k, values in FLAGS.items():
+            col[k] = np.asarray(values, dtype=object)[c[k][ids]]
+        cols = [col[k].tolist() for k in FIELDS]
+        return [dict(zip(FIELDS, r)) for r in zip(*cols)]
@@ -0,0 +1,100 @@
+"""
+RiskSight Pro — chart transport
+Figure JSON with numeric arrays in Plotly's typed-array form (base64 binary,
+plotly.js >= 2.28) instead of decimal text and without the layout template
+(identical for every figure, sent once), plus response bodies that carry a
+content ETag and are compressed once when built. A figure is then serialized
+and compressed once per data version, served from cache, and revalidated
+with a 304.
+"""
+
+import json, gzip, base64, hashlib
+import numpy as np, plotly
+
+try:
+    import brotli
+except ImportError:                     # optional: gzip only
+    brotli = None
+
+TYPED = {np.dtype(t): c for t, c in (("int8","i1"), ("uint8","u1"), ("int16","i2"), ("uint16","u2"),
+                                     ("int32","i4"), ("uint32","u4"), ("float32","f4"), ("float64","f8"))}
+MIN_TYPED    = 8        # shorter arrays stay JSON lists (base64 framing outweighs the saving)
+MIN_COMPRESS = 1024     # bodies below this are sent as-is
+
+def _typed(a):
+    """Plotly typed-array spec for a 1-/2-D numeric array, or None to leave it as JSON."""
+    if a.dtype == np.bool_:
+        a = a.astype(np.uint8)
+    elif a.dtype.kind in "iu" and a.dtype not in TYPED:            # int64 / uint64
+        a = a.astype(np.int32) if a.size and np.abs(a).max() < 2**31 else a.astype(np.float64)
+    if a.dtype not in TYPED or a.ndim not in (1, 2) or a.size < MIN_TYPED:
+        return None
+    spec = {"dtype": TYPED[a.dtype],
+            "bdata": base64.b64encode(np.ascontiguousarray(a, dtype=a.dtype.newbyteorder("<"))).decode()}
+    if a.ndim == 2:
+        spec["shape"] = f"{a.shape[0]},{a.shape[1]}"
+    return spec
+
+def _pack(v):
+    if isinstance(v, np.ndarray):
+        return _typed(v) or v
+    if isinstance(v, dict):
+        return {k: _pack(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_pack(x) for x in v]
+    return v
+
+def figure_json(fig, template=False):
+    """Figure JSON (data + layout) with numeric arrays base64-encoded.
+
+    The layout template (~8 KB, identical for every figure) is left out unless
+    `template` is set; the client applies the one from template_json().
+    """
+    d = fig.to_plotly_json()
+    if not template:
+        d["layout"].pop("template", None)
+    return json.dumps(_pack(d), cls=plotly.utils.PlotlyJSONEncoder)
+
+def template_json(name=None):
+    """The layout template figures are built with (plotly.io default unless `name`)."""
+    import plotly.io as pio
+    return json.dumps(pio.templates[name or pio.templates.default].to_plotly_json(),
+                      cls=plotly.utils.PlotlyJSONEncoder)
+
+def _accepted(header):
+    """Content codings an Accept-Encoding header allows (q > 0)."""
+    ok = set()
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()[2:] if params.strip().startswith("q=") else "1"
+        try:
+            if float(q) > 0:
+                ok.add(name.strip().lower())
+        except ValueError:
+            pass
+    return ok
+
+class Payload:
+    """A response body with its strong ETag and compressed variants (built once)."""
+
+    def __init__(self, body, mimetype="application/json"):
+        self.body     = body.encode() if isinstance(body, str) else bytes(body)
+        self.mimetype = mimetype
+        self.etag     = hashlib.blake2b(self.body, digest_size=12).hexdigest()
+        self.variants = {}
+        if len(self.body) >= MIN_COMPRESS:
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(self.body, quality=5)
+            self.variants["gzip"] = gzip.compress(self.body, 6, mtime=0)
+
+    @property
+    def nbytes(self):
+        return len(self.body) + sum(len(v) for v in self.variants.values())
+
+    def negotiate(self, accept_encoding):
+        """(content coding or None, body bytes) for a request's Accept-Encoding."""
+        ok = _accepted(accept_encoding)
+        for coding in ("br", "gzip"):
+            if coding in self.variants and (coding in ok or "*" in ok):
+                return coding, self.variants[coding]
+        return None, self.body
@@ -0,0 +1,72 @@
+"""AggStore moments (count, sum, mean, std, min, max) against pandas, after update, add and merge."""
+
+import pickle
+import numpy as np, pandas as pd
+import pytest
+
+from risksight import ingest
+from risksight.aggregates import AggStore
+from risksight.data import synthetic
+
+SPECS = {"total": ((), ["a", "b"]), "g": (("g",), ["a"]), "gh": (("g", "h"), ["b"])}
+RNG = np.random.default_rng(5)
+
+def frame(n):
+    return pd.DataFrame({"g": RNG.choice(["x", "y", "z"], n), "h": RNG.integers(0, 4, n),
+                         "a": RNG.normal(100, 15, n), "b": RNG.lognormal(2, 1, n)})
+
+def expected(df, keys, cols):
+    g = df.groupby(list(keys)) if keys else df.assign(_=0).groupby("_")
+    out = {"n": g.size()}
+    for c in cols:
+        out.update({f"{c}_sum": g[c].sum(), f"{c}_mean": g[c].mean(), f"{c}_std": g[c].std(),
+                    f"{c}_min": g[c].min(), f"{c}_max": g[c].max()})
+    return pd.DataFrame(out)
+
+def check(store, df):
+    for view, (keys, cols) in SPECS.items():
+        got, exp = store.frame(view), expected(df, keys, cols)
+        if keys:
+            got = got.sort_index()
+        assert np.array_equal(got.n.to_numpy(), exp.n.to_numpy())
+        assert np.allclose(got.drop(columns="n").to_numpy(), exp[got.columns.drop("n")].to_numpy(),
+                           rtol=1e-9, atol=1e-9, equal_nan=True)
+
+def test_update_matches_pandas():
+    df = frame(20_000)
+    check(AggStore(SPECS).update(df), df)
+
+def test_add_matches_update():
+    df = frame(500)
+    one = AggStore(SPECS)
+    for rec in df.to_dict("records"):
+        one.add(rec)
+    check(one, df)
+    assert one.snapshot().keys() == AggStore(SPECS).update(df).snapshot().keys()
+
+def test_merge_matches_one_pass():
+    df = frame(30_000)
+    store = AggStore(SPECS)
+    for i in range(0, len(df), 7_000):
+        store.merge(pickle.loads(pickle.dumps(AggStore(SPECS).update(df.iloc[i:i + 7_000]))))
+    check(store, df)
+    with pytest.raises(ValueError):
+        store.merge(AggStore({"total": ((), ["a"])}))
+
+def test_missing_keys_and_empty_views():
+    df = frame(1_000)
+    df.loc[:99, "g"] = None
+    store = AggStore(SPECS).update(df)
+    assert store.frame("g").n.sum() == 900 and store.total().n == 1_000
+    assert AggStore(SPECS).total().n == 0
+
+def test_dataset_totals_match_frames():
+    cr, fd, ins, _ = synthetic()
+    for df, ds in ((cr, "credit"), (fd, "fraud"), (ins, "insurance")):
+        store, full = ingest.aggregate(df, ds), ingest.prepare(df.copy(), ds)
+        for view, (keys, cols) in ingest.AGG_SPECS[ds].items():
+            got = store.frame(view)
+            exp = full.groupby(list(keys), observed=True)[cols].sum() if keys else full[cols].sum().to_frame().T
+            assert got.n.sum() == (full.dropna(subset=list(keys)).shape[0] if keys else len(full))
+            assert np.allclose(got[[f"{c}_sum" for c in cols]].to_numpy(),
+                               exp.reindex(got.index).to_numpy() if keys else exp.to_numpy())
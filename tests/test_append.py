@@ -0,0 +1,47 @@
+"""POST /api/data/<dataset>/append and /api/portfolio/loans: validated as a whole, then applied everywhere."""
+
+import json
+import pytest
+
+@pytest.fixture(scope="module")
+def A():
+    import app
+    return app
+
+@pytest.fixture
+def client(A):
+    return A.app.test_client()
+
+LOAN = {"age": 40, "income": 60_000, "debt_ratio": .3, "credit_score": 700, "emp_years": 5,
+        "loan_amt": 20_000, "purpose": "Auto", "region": "North", "default": 0}
+
+def state(A):
+    return (int(A.AGGS["cr"].total().n), int(A.AGGS["fd"].total().n), len(A.book()), len(A.txns()),
+            dict(A.DATA_VERSION))
+
+@pytest.mark.parametrize("bad", [{"purpose": None}, {"region": "Mars"}, {"credit_score": "n/a"},
+                                 {"loan_id": 1.5}, {"default": None}])
+def test_bad_credit_record_changes_nothing(A, client, bad):
+    before = state(A)
+    r = client.post("/api/data/credit/append", json=[LOAN, {**LOAN, **bad}])
+    assert r.status_code == 400 and "error" in r.get_json()
+    assert state(A) == before
+
+def test_bad_transaction_changes_nothing(A, client):
+    rec = json.loads(A.fd.head(1).assign(date=lambda d: d.date.astype(str)).to_json(orient="records"))[0]
+    before = state(A)
+    assert client.post("/api/data/fraud/append", json=[rec, {**rec, "foreign": 2}]).status_code == 400
+    assert state(A) == before
+    r = client.post("/api/data/fraud/append", json=[rec])
+    assert r.status_code == 200 and len(A.txns()) == before[3] + 1 and A.AGGS["fd"].total().n == before[1] + 1
+
+def test_loan_id_upserts_the_book(A, client):
+    n, book = A.AGGS["cr"].total().n, len(A.book())
+    for amt in (20_000, 30_000):
+        assert client.post("/api/data/credit/append", json=[{**LOAN, "loan_id": 90_001, "loan_amt": amt}]).status_code == 200
+    assert len(A.book()) == book + 1 and A.AGGS["cr"].total().n == n + 2
+    assert A.book().loans([90_001])["ead"][0] == 30_000
+    r = client.post("/api/portfolio/loans", json=[{**LOAN, "loan_id": 90_001}, {**LOAN, "loan_id": 90_001}])
+    assert r.status_code == 400 and A.book().loans([90_001])["ead"][0] == 30_000
+    r = client.post("/api/portfolio/loans", json=[{**LOAN, "loan_id": 90_001, "loan_amt": 40_000}])
+    assert r.get_json()["changed"] == 1 and A.book().loans([90_001])["ead"][0] == 40_000
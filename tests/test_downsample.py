@@ -0,0 +1,88 @@
+"""Payload budgets and shape guarantees of risksight.downsample and the chart helpers built on it."""
+
+import numpy as np, pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from risksight import downsample, transport
+
+RNG = np.random.default_rng(11)
+
+def walk(n):
+    return np.cumsum(RNG.normal(0, 1, n))
+
+@pytest.mark.parametrize("n, budget", [(10_000, 500), (100_000, 500), (5_000, 37), (1_000, 4)])
+def test_lttb_budget_endpoints_extremes(n, budget):
+    x, y = np.arange(n), walk(n)
+    keep = downsample.lttb(x, y, budget)
+    assert len(keep) == budget
+    assert (np.diff(keep) > 0).all()
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert y.argmax() in keep and y.argmin() in keep
+
+def test_lttb_adjacent_extremes_and_gaps():
+    y = np.zeros(1_000); y[2], y[3], y[600] = 5, -5, np.nan
+    keep = downsample.lttb(pd.date_range("2024-01-01", periods=1_000).values, y, 10)
+    assert len(keep) == 10 and {0, 2, 3, 999} <= set(keep) and 600 not in keep
+
+def test_lttb_short_series_untouched():
+    assert downsample.lttb(np.arange(50), walk(50), 500).tolist() == list(range(50))
+
+@pytest.mark.parametrize("n, budget", [(20_000, 500), (200_000, 500), (50_000, 2_000)])
+def test_thin_budget_and_extremes(n, budget):
+    x, y, by = RNG.lognormal(10, 1, n), RNG.normal(0, 1, n), RNG.choice(["a", "b", "c"], n, p=[.8, .15, .05])
+    keep = downsample.thin(x, y, budget, by=by)
+    assert len(keep) <= budget and (np.diff(keep) > 0).all()
+    for g in np.unique(by):
+        rows = np.flatnonzero(by == g)
+        assert {rows[x[rows].argmin()], rows[x[rows].argmax()],
+                rows[y[rows].argmin()], rows[y[rows].argmax()]} <= set(keep)
+    assert set(by[keep]) == set(by)
+    assert np.array_equal(keep, downsample.thin(x, y, budget, by=by))          # stable between renders
+
+def test_box_and_kde_sizes():
+    x = RNG.lognormal(8, 1.2, 50_000)
+    b = downsample.box_stats(x, 50)
+    assert len(b["outliers"]) <= 50 and b["outliers"].max() == x.max()
+    assert np.isclose(b["median"], np.median(x))
+    grid, d = downsample.kde(x, 200)
+    assert len(grid) == len(d) == 200 and grid[0] < x.min() and grid[-1] > x.max()
+
+@pytest.fixture(scope="module")
+def A():
+    import app
+    return app
+
+def values(traces):
+    return sum(len(v) for t in traces for a in ("x", "y") if (v := getattr(t, a, None)) is not None)
+
+def test_chart_payloads_within_budget(A):
+    k = 20
+    cr = pd.concat([A.cr] * k, ignore_index=True)
+    ins = pd.concat([A.ins] * k, ignore_index=True)
+    n = A.CHART_POINTS["income_loan"]
+    sc = A.scatter_traces(cr.income, cr.loan_amt, cr.default, n=n)
+    assert sum(len(t.x) for t in sc) <= n
+    assert max(t.x.max() for t in sc) == cr.income.max() and min(t.y.min() for t in sc) == cr.loan_amt.min()
+    hb = A.hist_bars(ins.loss_ratio, ins.policy_type, 50)
+    assert all(len(t.x) == 50 for t in hb) and sum(t.y.sum() for t in hb) == len(ins)
+    bx = A.box_traces(ins.claim_amt, ins.smoker)
+    assert values(bx) <= 2 * ins.smoker.nunique() * (A.CHART_POINTS["outliers"] + 1)
+    vi = A.violin_traces(ins.claim_amt, ins.smoker)
+    assert values(vi) <= 2 * ins.smoker.nunique() * (2 * A.CHART_POINTS["kde"] + 1)
+    d = pd.date_range("2000-01-01", periods=20_000)
+    s = A.series(d, walk(20_000))
+    assert len(s["x"]) == A.CHART_POINTS["market_ts"] and s["x"][0] == d[0] and s["x"][-1] == d[-1]
+
+FIG_BYTES = 32_000      # serialized figure body for a chart at the default point budgets
+
+def test_large_series_figure_payload(A):
+    n = 200_000
+    d, y = pd.date_range("2000-01-01", periods=n, freq="min"), walk(n)
+    x, v, by = RNG.lognormal(10, 1, n), RNG.normal(0, 1, n), RNG.choice(["a", "b", "c"], n)
+    for fig, raw in ((go.Figure(go.Scatter(mode="lines", **A.series(d, y))), d.values.nbytes + y.nbytes),
+                     (go.Figure(A.scatter_traces(x, v, by)), x.nbytes + v.nbytes)):
+        p = transport.Payload(A.dark_layout(fig))
+        assert len(p.body) < FIG_BYTES and len(p.body) < raw / 50
+        assert len(p.negotiate("gzip")[1]) < len(p.body)
+    assert len(go.Figure(go.Scatter(x=d, y=y)).to_json()) > 100 * FIG_BYTES   # what the chart would send unreduced
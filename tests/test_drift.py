@@ -0,0 +1,52 @@
+"""risksight.drift: processes sharing a directory report their pooled window; expired rings of exited ones go."""
+
+import os
+import multiprocessing as mp
+import numpy as np
+from risksight import drift
+
+NOW = 1_000_000.0
+
+def _monitor(shared=None, window=60):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 2))
+    return drift.Monitor(["a", "b"], X, X.sum(1), window=window, slots=6, shared=shared)
+
+def _observe(shared, n, rejected):
+    X = np.random.default_rng(n).normal(size=(n, 2))
+    _monitor(shared).observe(X, X.sum(1), rejected=rejected, now=NOW)
+
+def test_private_window_expires():
+    m = _monitor()
+    X = np.random.default_rng(1).normal(size=(150, 2))
+    m.observe(X, X.sum(1), rejected=3, now=NOW)
+    assert (m.report(NOW)["records"], m.report(NOW)["rejected"]) == (150, 3)
+    assert m.report(NOW + 59)["records"] == 150 and m.report(NOW + 61)["records"] == 0
+    m.observe(X[:10], X[:10].sum(1), now=NOW + 61)         # a slot reused by a later window starts empty
+    assert m.report(NOW + 61)["records"] == 10
+
+def test_shared_rings_pool_across_processes(tmp_path):
+    shared = str(tmp_path)
+    p = mp.get_context("fork").Process(target=_observe, args=(shared, 120, 2))
+    p.start(); p.join()
+    m = _monitor(shared)
+    X = np.random.default_rng(7).normal(size=(30, 2))
+    m.observe(X, X.sum(1), rejected=1, now=NOW)
+    r = m.report(NOW)
+    assert (r["records"], r["rejected"]) == (150, 3)
+    one = _monitor(); one.observe(X, X.sum(1), now=NOW)
+    assert r["score"]["window"] != one.report(NOW)["score"]["window"]
+    other = _monitor(shared)                                  # another monitor reads the same pool
+    assert other.report(NOW)["records"] == 150 and other.version(NOW) == m.version(NOW)
+    [d] = os.listdir(shared)
+    assert len(os.listdir(os.path.join(shared, d))) == 2
+    assert m.report(NOW + 61)["records"] == 0
+    assert os.listdir(os.path.join(shared, d)) == [f"{os.getpid()}.ring"]   # the exited writer's ring is gone
+
+def test_different_bins_do_not_mix(tmp_path):
+    m = _monitor(str(tmp_path))
+    rng = np.random.default_rng(3)
+    X = rng.normal(5, 1, size=(500, 2))
+    n = drift.Monitor(["a", "b"], X, X.sum(1), window=60, slots=6, shared=str(tmp_path))
+    n.observe(X[:200], X[:200].sum(1), now=NOW)
+    assert m.report(NOW)["records"] == 0 and n.report(NOW)["records"] == 200
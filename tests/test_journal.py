@@ -0,0 +1,21 @@
+"""risksight.journal: concurrent writers get distinct, consecutive entries; readers see them in order."""
+
+import multiprocessing as mp
+from risksight import journal
+
+def _write(root, w, n):
+    for i in range(n):
+        journal.append(root, {"w": w, "i": i})
+
+def test_concurrent_writers(tmp_path):
+    root = str(tmp_path / "journal")
+    procs = [mp.get_context("fork").Process(target=_write, args=(root, w, 25)) for w in range(4)]
+    for p in procs: p.start()
+    for p in procs: p.join()
+    got = list(journal.entries(root))
+    assert [s for s, _ in got] == list(range(1, 101))
+    for w in range(4):
+        assert [e["i"] for _, e in got if e["w"] == w] == list(range(25))      # each writer's order kept
+    assert not journal.pending(root, 100) and journal.pending(root, 99)
+    assert [s for s, _ in journal.entries(root, 98)] == [99, 100]
+    assert journal.append(root, {"w": 9}, after=3) == 101
@@ -0,0 +1,22 @@
+"""Market endpoints read parameters the same way: the query string wins over the JSON body."""
+
+import pytest
+
+@pytest.fixture(scope="module")
+def client():
+    import app
+    return app.app.test_client()
+
+def test_rolling_var_precedence(client):
+    r = client.post("/api/market/rolling-var?window=30&levels=0.9", json={"window": 10, "levels": [.99]}).get_json()
+    assert (r["window"], r["levels"]) == (30, [.9])
+    r = client.post("/api/market/rolling-var", json={"window": 10, "levels": [.99]}).get_json()
+    assert (r["window"], r["levels"]) == (10, [.99])
+
+def test_monte_carlo_precedence(client):
+    body = {"horizon": 5, "levels": [.99], "scenarios": 1000}
+    r = client.post("/api/market/monte-carlo?horizon=3&levels=0.9,0.95", json=body).get_json()
+    assert (r["horizon"], r["levels"]) == (3, [.9, .95])
+    r = client.post("/api/market/monte-carlo", json=body).get_json()
+    assert (r["horizon"], r["levels"]) == (5, [.99])
+    assert client.post("/api/market/monte-carlo?scenarios=0", json=body).status_code == 400
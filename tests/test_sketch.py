@@ -0,0 +1,93 @@
+"""Relative-error guarantee of risksight.sketch.QuantileSketch, one-pass and merged."""
+
+import pickle
+import numpy as np, pandas as pd
+import pytest
+
+from risksight.sketch import QuantileSketch, RANGE
+from risksight.aggregates import AggStore
+
+QS  = np.array([0, .001, .01, .05, .1, .25, .5, .75, .9, .95, .99, .999, 1])
+RNG = np.random.default_rng(3)
+
+COLUMNS = {
+    "lognormal": lambda n: RNG.lognormal(9, 1.1, n),
+    "gamma":     lambda n: RNG.gamma(2.5, .4, n),
+    "returns":   lambda n: RNG.standard_t(4, n) * .01 + .0003,     # both signs, fat tails
+    "wide":      lambda n: 10 ** RNG.uniform(-4, 4, n),           # eight orders of magnitude, inside RANGE
+    "ties":      lambda n: RNG.integers(0, 5, n).astype(float),    # zeros and repeated values
+}
+
+def bound(x, alpha, qs=QS):
+    """α·|exact|, or α·max(|neighbours|) where the interpolated ranks straddle zero."""
+    s = np.sort(x)
+    pos = qs * (len(s) - 1)
+    lo, hi = s[np.floor(pos).astype(int)], s[np.ceil(pos).astype(int)]
+    return alpha * np.maximum(np.abs(lo), np.abs(hi)) * (1 + 1e-9) + 1e-15
+
+def check(sk, x):
+    est = sk.quantile(QS)
+    assert (np.abs(est - np.quantile(x, QS)) <= bound(x, sk.alpha)).all()
+    assert est[0] == x.min() and est[-1] == x.max()
+
+@pytest.mark.parametrize("alpha", [.01, .005, .001])
+@pytest.mark.parametrize("name", COLUMNS)
+def test_quantiles_within_alpha(name, alpha):
+    x = COLUMNS[name](50_000)
+    check(QuantileSketch(alpha).update(x), x)
+
+def test_folded_range_keeps_the_tail():
+    x = 10 ** RNG.uniform(-6, 6, 50_000)                          # wider than RANGE: the low buckets fold
+    sk = QuantileSketch(.005).update(x)
+    exact, est = np.quantile(x, QS), sk.quantile(QS)
+    far = exact > x.max() / RANGE * sk.gamma ** 2
+    assert far[-6:].all()
+    assert (np.abs(est - exact)[far] <= bound(x, sk.alpha)[far]).all()
+    assert est[0] == x.min() and est[-1] == x.max()
+
+@pytest.mark.parametrize("name", COLUMNS)
+def test_merge_matches_one_pass(name):
+    x = COLUMNS[name](40_000)
+    whole = QuantileSketch(.005).update(x)
+    merged = QuantileSketch(.005)
+    for part in np.array_split(RNG.permutation(x), 7):
+        merged.merge(QuantileSketch(.005).update(part))
+    check(merged, x)
+    assert np.array_equal(merged.quantile(QS), whole.quantile(QS)) and len(merged) == len(x)
+
+def test_single_adds_match_update():
+    x = COLUMNS["returns"](5_000)
+    one = QuantileSketch()
+    for v in x:
+        one.add(v)
+    assert np.array_equal(one.quantile(QS), QuantileSketch().update(x).quantile(QS))
+    check(one, x)
+
+def test_tail_mean_and_edges():
+    x = COLUMNS["returns"](100_000)
+    sk = QuantileSketch(.005).update(np.r_[x, np.nan, np.inf])
+    exact = np.sort(x)[:1_000].mean()
+    assert abs(sk.tail_mean(.01) - exact) <= .005 * abs(exact)
+    assert len(sk) == len(x)
+    with pytest.raises(ValueError):
+        sk.quantile(1.5)
+    with pytest.raises(ValueError):
+        QuantileSketch().quantile(.5)
+    with pytest.raises(ValueError):
+        sk.merge(QuantileSketch(.01))
+
+def test_aggstore_quantiles_after_merge():
+    df = pd.DataFrame({"g": RNG.choice(["a", "b"], 30_000), "v": COLUMNS["gamma"](30_000)})
+    specs = {"total": ((), ["v"]), "g": (("g",), ["v"])}
+    quantiles = {"total": ["v"], "g": ["v"]}
+    store = AggStore(specs, quantiles=quantiles)
+    for i in range(0, len(df), 6_000):
+        other = AggStore(specs, quantiles=quantiles)
+        other.update(df.iloc[i:i + 6_000])
+        store.merge(other)
+    store = pickle.loads(pickle.dumps(store))
+    est = store.quantile("g", "v", [.5, .95])
+    for g, rows in df.groupby("g"):
+        exact = np.quantile(rows.v, [.5, .95])
+        assert (np.abs(est.loc[g].to_numpy() - exact) <= .005 * exact * (1 + 1e-9)).all()
+    check(store.sketch("total", "v"), df.v.to_numpy())